@@ -17,21 +17,86 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 """
 
-from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QGraphicsPixmapItem, QGraphicsScene, QGraphicsRectItem, QGraphicsLineItem, QGraphicsPolygonItem, QWidget, QVBoxLayout, QLineEdit, QLabel
+from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QGraphicsPixmapItem, QGraphicsScene, QGraphicsRectItem, QGraphicsLineItem, QGraphicsPolygonItem, QGraphicsPathItem, QGraphicsItem, QWidget, QVBoxLayout, QLineEdit, QLabel
 from PyQt5.QtSvg import QSvgGenerator
-from PyQt5.QtGui import QPixmap, QImage, QPolygonF, QBrush, QPen, QColor, QTransform, QPainter, QIntValidator, QDoubleValidator
-from PyQt5.QtCore import QPointF, QLineF, Qt, pyqtSignal
-from PyQt5.uic import loadUi # For loading ui files
+from PyQt5.QtGui import QPixmap, QImage, QImageReader, QImageIOHandler, QPolygonF, QBrush, QPen, QColor, QTransform, QPainter, QPainterPath, QIntValidator, QDoubleValidator
+from PyQt5.QtCore import QPointF, QLineF, QRectF, QRect, QPoint, QSize, Qt, pyqtSignal, QThread, QFile, QIODevice, QTimer, QMutex, QWaitCondition
+from PyQt5.uic import compileUi # For loading ui files
 from sys import argv, exit, modules
 import importlib
 import importlib.util
 import os
+import io
 import math
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+from core import Planner, PlannerError, getPlanner
+from core.paths import PathRuns, RUN_ADDED, RUN_REMOVED
+from core.selection import Selection
+from core.optimizer import PathOptimizer, RouteUpdater, TWO_OPT
+from core.report import writeReport
+from core.columns import writeColumns
+from core.svg import writeFlightPaths, getImageHref
+from core.languages import getRegistry
 
 
 # Absolute path to the program directory. Needed for loading some files.
 programPath = os.path.dirname(os.path.abspath(__file__))
 
+# Grids with more cells than this are drawn as one item by default. Check AerialWareWidget.setLightweightGrid().
+LIGHTWEIGHT_GRID_CELLS = 10000
+# Images from files with more pixels than this are decoded tile by tile only when tiles become visible. Check _QTiledImageItem.
+TILED_IMAGE_PIXELS = 50000000
+
+def setupUi(widget, name):
+	"""Builds form from ui/<name>.ui on given widget. Works like PyQt5.uic.loadUi(), i.e. child widgets become fields of given widget.
+	Parsing XML is slow, so form is compiled to Python code. Code is kept in ui/__pycache__ and compiled again only when .ui file changes.
+	"""
+	ui = _getUiClass(name)()
+	ui.setupUi(widget)
+	widget.__dict__.update(ui.__dict__)
+
+@lru_cache(maxsize=None)
+def _getUiClass(name):
+	"""Returns class generated from ui/<name>.ui. Classes are cached within the process too.
+	"""
+	uiPath = os.path.join(programPath, "ui", name + ".ui")
+	cachePath = os.path.join(programPath, "ui", "__pycache__", name + "_ui.py")
+	stat = os.stat(uiPath)
+	stamp = f"# Generated from {name}.ui, size: {stat.st_size}, modified: {stat.st_mtime_ns}\n"
+
+	try:
+		with open(cachePath, encoding="utf-8") as file:
+			isValid = file.readline() == stamp
+	except OSError:
+		isValid = False
+
+	if not isValid:
+		code = io.StringIO()
+		code.write(stamp)
+		compileUi(uiPath, code)
+		try:
+			os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+			with open(cachePath, "w", encoding="utf-8") as file:
+				file.write(code.getvalue())
+		# I.e. when program directory is read-only. Just use generated code without caching it.
+		except OSError:
+			module = {}
+			exec(compile(code.getvalue(), uiPath, "exec"), module)
+			return _findUiClass(module)
+
+	# Import generated module, so Python will cache its bytecode too
+	spec = importlib.util.spec_from_file_location("ui_" + name, cachePath)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return _findUiClass(vars(module))
+
+def _findUiClass(module):
+	"""Returns generated class from given namespace. It's named after top-level widget, i.e. Ui_Form.
+	"""
+	return next(value for key, value in module.items() if key.startswith("Ui_"))
+
 # Main window of application
 class Window(QMainWindow):
 	"""Places AerialWare into QMainWindow. Uses predefined .ui file.
@@ -39,7 +104,7 @@ class Window(QMainWindow):
 	def __init__(self):
 		super().__init__()
 		# Load UI from file
-		loadUi(programPath + "/ui/mainwindow.ui", self)
+		setupUi(self, "mainwindow")
 		# Add AerialWare
 		self.content = AerialWareWidget()
 		self.centralWidget().layout().addWidget(self.content)
@@ -51,16 +116,20 @@ class AerialWareWidget(QWidget):
 		getResultsAfterCompletion -- signifies if it's needed to get results. Already set to True if you use AerialWare as a module.
 	Signals:
 		done -- emitted when user is done with the program.
+		exportProgress(int) -- emitted while SVG is being exported with percent of painted squares.
+		exported(str) -- emitted with path to SVG when it has been exported.
 	"""
 	
 	done = pyqtSignal()
+	exportProgress = pyqtSignal(int)
+	exported = pyqtSignal(str)
 
 	def __init__(self, getResultsAfterCompletion = False):
 		super().__init__()
 		# Set flag to return results after user is done with the program.
 		self.getResultsAfterCompletion = getResultsAfterCompletion
 		# Load UI from file
-		loadUi(programPath + "/ui/form.ui", self)
+		setupUi(self, "form")
 		# Create scene
 		self.scene = _QCustomScene()
 		self.Image.setScene(self.scene)
@@ -69,6 +138,22 @@ class AerialWareWidget(QWidget):
 
 		# Values from step 4. We need to set up something to change languages.
 		self.maxHorizontal = self.maxVertical = 0
+		# Planner of the grid on the scene and codes of the error on step 3. Check __stepThree().
+		self.planner = None
+		self.dataErrorCodes = []
+		# Check setLightweightGrid()
+		self.lightweightGrid = None
+		# Check setPathOptimization()
+		self.optimizationMethod, self.optimizationTime = TWO_OPT, 0.2
+		# Image which is being decoded in background, item which displays it and path to its file, if any. Check __loadFile().
+		self.imageLoader = None
+		self.imageItem = None
+		self.imagePath = None
+		# Thread which exports SVG. Check __save().
+		self.svgExporter = None
+		# Check setSvgPrecision()
+		self.svgPrecision = 2
+		self.__setLoadingVisible(False)
 
 		# Set validators
 		v = QDoubleValidator()
@@ -77,16 +162,13 @@ class AerialWareWidget(QWidget):
 		v2 = QDoubleValidator()
 		v2.setNotation(QDoubleValidator.StandardNotation)
 
-		for k in self.__dict__:
-			obj = self.__dict__[k]
-			tp = type(obj)
-			if tp == QLineEdit:
-				obj.setValidator(v2)
-			# And set font size of labels
-			elif tp == QLabel:
-				font = obj.font()
-				font.setPointSize(11)
-				obj.setFont(font)
+		for obj in self.findChildren(QLineEdit):
+			obj.setValidator(v2)
+		# And set font size of labels
+		for obj in self.findChildren(QLabel):
+			font = obj.font()
+			font.setPointSize(11)
+			obj.setFont(font)
 
 		self.editZoom.setValidator(v)
 		self.editRes.setValidator(v)
@@ -96,38 +178,40 @@ class AerialWareWidget(QWidget):
 
 		# Connect events
 		self.btnOpenImage.clicked.connect(self.__loadImage)
+		self.btnCancelLoading.clicked.connect(self.cancelImageLoading)
+		# Threads can't be destroyed while they're running
+		QApplication.instance().aboutToQuit.connect(self.__stopThreads)
 		self.btnNext.clicked.connect(self.__stepTwo)
 		self.btnIncreaseZoom.clicked.connect(self.__increaseZoom)
 		self.btnDecreaseZoom.clicked.connect(self.__decreaseZoom)
 		self.editZoom.textEdited.connect(self.__setZoom)
 
-		# Load languages
+		# Load names of languages. Languages themselves are loaded by the registry when they're selected and shared by every widget.
 		langDir = programPath + "/lang/"
 		self.lastLang = langDir + ".LastLang"
-		for lang in os.listdir(langDir):
-			ext = os.path.splitext(lang)
-			if os.path.isfile(langDir + lang) and ext[1] == ".py":
-				spec = importlib.util.spec_from_file_location("lang", langDir + lang)
-				lang = importlib.util.module_from_spec(spec)
-				spec.loader.exec_module(lang)
-				
-				name = lang.name
-				self.comboLang.addItem(name, lang)
+		self.savedLang = None # Language in .LastLang file
+		self.langSaver = QTimer(self)
+		self.langSaver.setSingleShot(True)
+		self.langSaver.setInterval(1000)
+		self.langSaver.timeout.connect(self.__saveLanguage)
+		self.languages = getRegistry(langDir)
+		self.comboLang.addItems(self.languages.getNames())
 		self.comboLang.currentIndexChanged.connect(self.__changeLanguage)
 		
 		# Try to use previously selected language or English.
 		# English is a fallback language. If it's not found, display error message and exit.
-		index = self.comboLang.findText("English")
+		index = self.comboLang.findText(self.languages.getFallbackName() or "")
 		if index == -1:
 			QMessageBox(QMessageBox.Critical, "AerialWare - Error", "English localization not found. It should be in file " + langDir + "english.py. AerialWare uses it as base localization. Please, download AerialWare again.").exec()
 			exit()
 
 		self.comboLang.setCurrentIndex(index)
-		self.lang = _LanguageChanger(self.comboLang.currentData()) # Create language changer
+		self.lang = self.languages.get(self.comboLang.currentText())
 		
 		try:
 			file = open(self.lastLang, "r")
-			index = self.comboLang.findText(file.readline())
+			self.savedLang = file.readline()
+			index = self.comboLang.findText(self.savedLang)
 			file.close()
 			if index != -1:
 				self.comboLang.setCurrentIndex(index)
@@ -150,10 +234,10 @@ class AerialWareWidget(QWidget):
 			self.__loadImage(programPath + "/ui/img/logo.png")
 
 	def loadImageFromFile(self, path: str):
-		"""Loads image from given path and jumps to Step 2
+		"""Loads image from given path and jumps to Step 2.
+		Only header of the image is read here, image itself is decoded in background. Huge images are decoded only when they're displayed.
 		"""
-		img = QPixmap(path)
-		self.__loadQPixmap(img)
+		self.__loadFile(path)
 		self.__stepTwo()
 	
 	def loadImageFromQImage(self, image: QImage):
@@ -175,27 +259,127 @@ class AerialWareWidget(QWidget):
 		else:
 			file = path
 
-		# Create a pixmap from file
-		img = QPixmap(file)
-		self.__loadQPixmap(img)
+		# User has closed the dialog
+		if file == "":
+			return
+		self.__loadFile(file)
+
+	def cancelImageLoading(self):
+		"""Stops decoding of image loaded from file. Already decoded preview stays on the scene.
+		"""
+		if self.imageLoader == None:
+			return
+		self.imageLoader.requestInterruption()
+		self.imageLoader.wait()
+		self.imageLoader = None
+		self.__setLoadingVisible(False)
+
+	def __loadFile(self, path):
+		"""Draws image from file or raises an error message.
+		Only header is read here, so user can go to the next steps right away. Huge images are drawn by _QTiledImageItem which decodes only visible parts of them.
+		Other images are decoded by _QImageLoader in background. Until then the scene displays empty rect of the same size.
+		"""
+		size = QImageReader(path).size()
+		# Some formats don't store size in the header. Let's just decode them.
+		if not size.isValid():
+			self.__loadQPixmap(QPixmap(path), path)
+			return
 
-	def __loadQPixmap(self, img: QPixmap):
+		if size.width() * size.height() > TILED_IMAGE_PIXELS:
+			self.__setImageItem(_QTiledImageItem(path, size), size.width(), size.height(), path)
+			return
+
+		placeholder = QGraphicsRectItem(0, 0, size.width(), size.height())
+		placeholder.setPen(QPen(Qt.NoPen))
+		self.__setImageItem(placeholder, size.width(), size.height(), path)
+
+		self.imageLoader = _QImageLoader(path, size)
+		self.imageLoader.progress.connect(self.progressImage.setValue)
+		self.imageLoader.loaded.connect(self.__showLoadedImage)
+		self.imageLoader.failed.connect(self.__showFailedImage)
+		self.imageLoader.finished.connect(self.__finishImageLoading)
+		self.progressImage.setValue(0)
+		self.__setLoadingVisible(True)
+		self.imageLoader.start()
+
+	def __showLoadedImage(self, image: QImage):
+		"""Replaces image item with decoded image or its preview
+		"""
+		if not self.__isCurrentLoader():
+			return
+		item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+		# Preview is smaller than the image
+		item.setScale(self.width / image.width())
+		# Image should stay below the grid
+		item.setZValue(self.imageItem.zValue())
+		self.scene.addItem(item)
+		self.scene.removeItem(self.imageItem)
+		self.imageItem = item
+
+	def __showFailedImage(self):
+		"""Displays error message when image has a valid header but can't be decoded
+		"""
+		if not self.__isCurrentLoader():
+			return
+		# Nothing has been done yet, so there's no reason to go on
+		if self.Steps.currentIndex() == 0:
+			self.__disableItems()
+		self.__showInvalidImageMessage()
+
+	def __finishImageLoading(self):
+		if self.__isCurrentLoader():
+			self.imageLoader = None
+			self.__setLoadingVisible(False)
+
+	def __isCurrentLoader(self):
+		"""Checks if signal has been emitted by current image loader. Signals of cancelled loaders may still be in the queue.
+		"""
+		return self.imageLoader != None and self.sender() is self.imageLoader
+
+	def __setLoadingVisible(self, visible):
+		"""Shows or hides progress of image loading
+		"""
+		self.progressImage.setVisible(visible)
+		self.btnCancelLoading.setVisible(visible)
+
+	def __loadQPixmap(self, img: QPixmap, path = None):
 		"""Draws QPixmap or raises an error message
 		"""
 		if not img.isNull():
-			self.scene.clear()
-			item = QGraphicsPixmapItem(img)
-			self.height = img.height()
-			self.width = img.width()
-			self.scene.addItem(item)
-			self.__enableItems()
-		elif file != "":
+			self.__setImageItem(QGraphicsPixmapItem(img), img.width(), img.height(), path)
+		else:
+			self.cancelImageLoading()
 			self.__disableItems()
-			msg = QMessageBox()
-			msg.setIcon(QMessageBox.Critical)
-			msg.setWindowTitle(self.lang.invalidImageTitle)
-			msg.setText(self.lang.invalidImage)
-			msg.exec_()
+			self.__showInvalidImageMessage()
+
+	def __showInvalidImageMessage(self):
+		msg = QMessageBox()
+		msg.setIcon(QMessageBox.Critical)
+		msg.setWindowTitle(self.lang.invalidImageTitle)
+		msg.setText(self.lang.invalidImage)
+		msg.exec_()
+
+	def __stopTileDecoding(self):
+		if isinstance(self.imageItem, _QTiledImageItem):
+			self.imageItem.stopDecoding()
+
+	def __setImageItem(self, item, width, height, path = None):
+		"""Replaces everything on the scene with given item representing an image
+		Args:
+			item -- item to add.
+			width, height -- size of the image.
+			path -- path to the image file or None, if image hasn't been loaded from file.
+		"""
+		self.cancelImageLoading()
+		self.__stopTileDecoding()
+		self.scene.clear()
+		self.height = height
+		self.width = width
+		self.imagePath = path
+		item.setZValue(-1)
+		self.scene.addItem(item)
+		self.imageItem = item
+		self.__enableItems()
 
 	##################
 
@@ -211,120 +395,43 @@ class AerialWareWidget(QWidget):
 	def __stepThree(self):
 		"""Step 3 -- Do basically everything.
 		"""
-		# Validate data
-		def setError(e):
-			"""Displays string e.
-			"""
-			self.lblDataError.setText("<html><head/><body><div>" + self.lang.errData + e + "</div></body></html>")
-
-		# Try to read data. We need to create fields, because this will be used later in other functions.
-		self.xTL = self.__sfloat(self.xTopLeft.text())
-		self.xTR = self.__sfloat(self.xTopRight.text())
-		self.xBL = self.__sfloat(self.xBottomLeft.text())
-		self.xBR = self.__sfloat(self.xBottomRight.text())
-
-		self.yTL = self.__sfloat(self.yTopLeft.text())
-		self.yTR = self.__sfloat(self.yTopRight.text())
-		self.yBL = self.__sfloat(self.yBottomLeft.text())
-		self.yBR = self.__sfloat(self.yBottomRight.text())
-
-		self.xD = self.__sfloat(self.xDelimiter.text())
-		self.yD = self.__sfloat(self.yDelimiter.text())
-
-		# Convert delimiters to pixels.
-		# Value of another coordinate doesn't matter.
-		# If you'll draw a random line and draw crossing lines parallel to one of axes with same distance between these lines by another axis, you'll split your random line into equal pieces.
-		# See for yourself:
-		# Y
-		# ^ ___\_____
-		# | ____\____
-		# | _____\___
-		# |       \
-		# |-----------> X
-		# You can try it on paper or prove this "theorem" doing some math.
+		# Try to read data
+		corners = (
+			(self.__sfloat(self.xTopLeft.text()), self.__sfloat(self.yTopLeft.text())),
+			(self.__sfloat(self.xTopRight.text()), self.__sfloat(self.yTopRight.text())),
+			(self.__sfloat(self.xBottomLeft.text()), self.__sfloat(self.yBottomLeft.text())),
+			(self.__sfloat(self.xBottomRight.text()), self.__sfloat(self.yBottomRight.text()))
+		)
+		delimiters = (self.__sfloat(self.xDelimiter.text()), self.__sfloat(self.yDelimiter.text()))
+
+		# Planner does all the math. We only need to display errors.
+		# Planners are cached, so grid for the same data won't be generated again.
 		try:
-			self.xDTop = self.width / abs(self.xTL - self.xTR) * self.xD
-			self.xDBottom = self.width / abs(self.xBL - self.xBR) * self.xD
-			self.yDLeft = self.height / abs(self.yTL - self.yBL) * self.yD
-			self.yDRight = self.height / abs(self.yTR - self.yBR) * self.yD
-		except ZeroDivisionError:
-			setError(self.lang.errCorners)
+			planner = getPlanner(corners, delimiters, self.width, self.height)
+		except PlannerError as e:
+			self.dataErrorCodes = e.codes
+			self.__showDataError()
 			return
-		
-		# Now do the same stuff, but find how much pixels in one degree.
-		# We won't find absolute value for subtraction because axes of image in geographic system may be not codirectional to axes of image in Qt system.
-		self.topX = (self.xTR - self.xTL) / self.width
-		self.bottomX = (self.xBR - self.xBL) / self.width
-		self.leftY = (self.yTL - self.yBL) / self.height
-		self.rightY = (self.yTR - self.yBR) / self.height
-
-		# Sides of image in geographic system
-		self.top = QLineF(self.xTL, self.yTL, self.xTR, self.yTR)
-		self.bottom = QLineF(self.xBL, self.yBL, self.xBR, self.yBR)
-		self.left = QLineF(self.xTL, self.yTL, self.xBL, self.yBL)
-		self.right = QLineF(self.xTR, self.yTR, self.xBR, self.yBR)
-
-		errors = ""
-		if self.xDTop > self.width:
-			errors += self.lang.errLongTop + "<br>"
-		if self.xDBottom > self.width:
-			errors += self.lang.errLongBottom + "<br>"
-		if self.yDLeft > self.height:
-			errors += self.lang.errLatLeft + "<br>"
-		if self.yDRight > self.height:
-			errors += self.lang.errLatRight + "<br>"
-
-		if errors != "":
-			setError(self.lang.errSides + "<br>" + errors)
-			return
-		
+		self.dataErrorCodes = []
+		self.lblDataError.setText("")
+
 		# Check if given coordinates form 8-shaped figure
-		if (self.xTL > self.xTR and self.xBL < self.xBR) or (self.xTL < self.xTR and self.xBL > self.xBR) or (self.yTL > self.yBL and self.yTR < self.yBR) or (self.yTL < self.yBL and self.yTR > self.yTL):
+		if planner.isEightShaped():
 			choice = QMessageBox(QMessageBox.Warning, "AerialWare", self.lang.warningCoordinates, QMessageBox.Yes | QMessageBox.No).exec()
 			if choice == QMessageBox.No:
 				return
+		# Grid for this data is already on the scene
+		if planner is self.planner and self.scene.planner is planner:
+			self.__turnPage()
+			self.btnNext.disconnect()
+			self.btnNext.clicked.connect(self.__stepFour)
+			return
 
-		# Draw grid
+		self.planner = planner
+		self.scene.setPlanner(planner)
+		self.scene.setOptimizer(PathOptimizer(planner, self.optimizationMethod, self.optimizationTime))
 
-		# Set points for grid
-		# Points will look like:
-		# [point, point, ...],
-		# [point, point, ...], ...
-		pointRows = []
-		# Let x1, y1; x2, y2 be vertical line
-		# and x3, y3; x4, y4 be horizontal line.
-		# Thus, y1 and y2 should be always on top and bottom;
-		# x3, x4 -- on left and right
-		y1, y2, x3, x4 = 0, self.height, 0, self.width
-		# So we have to change:
-		#	for vertical line: x1, x2
-		#	for horizontal line: y3, y4
-		
-		y3 = y4 = 0 # Initial values for horizontal line
-		# Move horizontal line
-		while y3 <= self.height + self.yDLeft / 2 or y4 <= self.height + self.yDRight / 2:
-			x1 = x2 = 0 # Initial values for vertical line
-			# Move vertical line
-			points = []
-			while x1 <= self.width + self.xDTop / 2 or x2 <= self.width + self.xDBottom / 2:
-				point = QPointF()
-				QLineF.intersect(
-					QLineF(x1, y1, x2, y2),
-					QLineF(x3, y3, x4, y4),
-					point
-				)
-				points.append(point)
-				x1 += self.xDTop
-				x2 += self.xDBottom
-			if points != []:
-				pointRows.append(points)
-			y3 += self.yDLeft
-			y4 += self.yDRight
-		
-		# If nothing has been added
-		if points == []:
-			setError(self.lang.errPoints)
-			return
+		# Draw grid
 
 		# Get scene geometry to preserve scene expanding
 		rect = self.scene.sceneRect()
@@ -332,24 +439,24 @@ class AerialWareWidget(QWidget):
 		self.bounds = QGraphicsRectItem(rect)
 		self.bounds.setFlag(self.bounds.ItemClipsChildrenToShape)
 		self.scene.addItem(self.bounds)
-		# Create polygons from points
-		# We'll recheck previous item
-		i = 1 # Rows
-		while i < len(pointRows):
-			j = 1 # Points
-			while j < len(pointRows[i]):
-				# Add points in following order: top left, top right, bottom right, bottom left
-				points = [
-					pointRows[i - 1][j - 1],
-					pointRows[i - 1][j],
-					pointRows[i][j],
-					pointRows[i][j - 1]
-				]
-				# We're assigning self.bounds as parent implicitly, so we shouldn't add polygon to scene by ourselves.
-				poly = _QCustomGraphicsPolygonItem(QPolygonF(points), self.bounds)
-				poly.setRowCol(i - 1, j - 1)
-				j += 1
-			i += 1
+		rows, cols = planner.getShape()
+		lightweight = self.lightweightGrid
+		if lightweight == None:
+			lightweight = rows * cols > LIGHTWEIGHT_GRID_CELLS
+		if lightweight:
+			# Whole grid is one item which paints only visible cells
+			self.scene.setGridItem(_QGridItem(planner, self.scene.selection, self.bounds))
+		else:
+			# Create polygons from points
+			points = [[QPointF(*point) for point in pointRow] for pointRow in planner.getGrid().tolist()]
+			for row in range(rows):
+				for col in range(cols):
+					# Add points in following order: top left, top right, bottom right, bottom left
+					polygon = QPolygonF([points[row][col], points[row][col + 1], points[row + 1][col + 1], points[row + 1][col]])
+					# We're assigning self.bounds as parent implicitly, so we shouldn't add polygon to scene by ourselves.
+					poly = _QCustomGraphicsPolygonItem(polygon, self.bounds)
+					poly.setRowCol(row, col)
+					self.scene.addCell(poly)
 		# Restore scene geometry
 		self.scene.setSceneRect(rect)
 
@@ -363,7 +470,7 @@ class AerialWareWidget(QWidget):
 		"""Step 4 -- Do hardware calculations.
 		"""
 		# If nothing has been selected, display error message.
-		if self.scene.selectedItems() == []:
+		if self.scene.selectedCells() == []:
 			msg = QMessageBox()
 			msg.setIcon(QMessageBox.Warning)
 			msg.setWindowTitle("AerialWare")
@@ -375,22 +482,9 @@ class AerialWareWidget(QWidget):
 		self.scene.setEnabled(False)
 		
 		# Find biggest vertical and horizontal lines of bounding rect of every polygon
-		for square in self.scene.selectedItems():
-			pointsOrig = square.polygon()
-			pointsConv = []
-			for point in pointsOrig:
-				pointsConv.append(self.pxToDeg(point.x(), point.y()))
-			points = QPolygonF(QPolygonF(pointsConv).boundingRect())
-			
-			# Because top = bottom and left = right we can use only one of each side for comparison.
-			# Points of polygon goes clockwise from top left corner.
-			lenTop = self.__lenMeters(points[0], points[1])
-			lenRight = self.__lenMeters(points[1], points[2])
+		self.maxHorizontal, self.maxVertical = self.planner.getMaxArea(self.scene.selectedCells())
 
-			self.maxHorizontal = max(self.maxHorizontal, lenTop)
-			self.maxVertical = max(self.maxVertical, lenRight)
-
-		self.__changeLanguage() # Need to change language because we need to insert max values into caption
+		self.__showMaxArea()
 
 		# Connect slots for calculations
 		self.editRes.textEdited.connect(self.__calculateResolution)
@@ -413,22 +507,14 @@ class AerialWareWidget(QWidget):
 		"""Calculates camera resolution based on given deg/px ratio.
 		"""
 		self.camRatio = self.__sfloat(self.editRes.text())
-		try:
-			self.camWidth = int(self.maxHorizontal / self.camRatio)
-			self.camHeight = int(self.maxVertical / self.camRatio)
-		except ZeroDivisionError:
-			self.camWidth = 0
-			self.camHeight = 0
+		self.camWidth, self.camHeight = Planner.getCameraResolution(self.maxHorizontal, self.maxVertical, self.camRatio)
 		self.lblCamRes.setText(f"{self.camWidth}x{self.camHeight}")
 
 	def __calculateFocalLength(self):
 		"""Calculates focal length based on given flight height.
 		"""
 		self.flightHeight = self.__sfloat(self.editHeight.text())
-		try:
-			self.focalLength = self.flightHeight / (self.camRatio * 1000)
-		except ZeroDivisionError:
-			self.focalLength = 0
+		self.focalLength = Planner.getFocalLength(self.flightHeight, self.camRatio)
 		self.lblFocalResult.setText(str(self.focalLength))
 
 	##################
@@ -436,131 +522,21 @@ class AerialWareWidget(QWidget):
 	def __save(self):
 		"""If AerialWare has been used as a module, emits signal 'done'. Saves user results into SVG and makes report otherwise.
 		"""
-		# Variables for report
-		self.pointsMeridian = ""
-		self.pointsHorizontal = ""
-
-		# Total lengths of paths. Used in report and methods.
-		self.lenMeridian = 0
-		self.lenMeridianWithTurns = 0
-		self.lenHorizontal = 0
-		self.lenHorizontalWithTurns = 0
-
-		# Fields for methods
-		self.pathMeridianPointsPx = []
-		self.pathMeridianPointsDeg = []
-		self.pathMeridianLinesPx = []
-		self.pathMeridianLinesWithTurnsPx = []
-		self.pathMeridianLinesDeg = []
-		self.pathMeridianLinesWithTurnsDeg = []
-
-		self.pathHorizontalPointsPx = []
-		self.pathHorizontalPointsDeg = []
-		self.pathHorizontalLinesPx = []
-		self.pathHorizontalLinesWithTurnsPx = []
-		self.pathHorizontalLinesDeg = []
-		self.pathHorizontalLinesWithTurnsDeg = []
-
-		# Process each line
-		def processLines(lines, isMeridian=False):
-			i = 2 # Counter for report
-			isEven = False # If current line is even we must swap it's points.
-			for line in lines:
-				linePx = line.line()
-				p1 = linePx.p1()
-				p2 = linePx.p2()
-				p1Deg = self.pxToDeg(p1.x(), p1.y())
-				p2Deg = self.pxToDeg(p2.x(), p2.y())
-				lineDeg = QLineF(p1Deg, p2Deg)
-				lineLength = self.__lenMeters(p1Deg, p2Deg)
-
-				if isMeridian:
-					self.pathMeridianLinesWithTurnsPx.append(linePx)
-					self.pathMeridianLinesWithTurnsDeg.append(lineDeg)
-					self.lenMeridianWithTurns += lineLength
-				else:
-					self.pathHorizontalLinesWithTurnsPx.append(linePx)
-					self.pathHorizontalLinesWithTurnsDeg.append(lineDeg)
-					self.lenHorizontalWithTurns += lineLength
-
-				if line.pen().style() == Qt.SolidLine:  # Check if current line doesn't represent turn
-					if isEven:
-						p1, p2, p1Deg, p2Deg = p2, p1, p2Deg, p1Deg
-					
-					point = f'"{i - 1}","{p1Deg.x()}","{p1Deg.y()}"\n' + f'"{i}","{p2Deg.x()}","{p2Deg.y()}"\n'
-					if isMeridian:
-						self.pointsMeridian += point
-						self.pathMeridianPointsPx.extend([p1, p2])
-						self.pathMeridianPointsDeg.extend([p1Deg, p2Deg])
-						self.pathMeridianLinesPx.append(linePx)
-						self.pathMeridianLinesDeg.append(lineDeg)
-						self.lenMeridian += lineLength
-					else:
-						self.pointsHorizontal += point
-						self.pathHorizontalPointsPx.extend([p1, p2])
-						self.pathHorizontalPointsDeg.extend([p1Deg, p2Deg])
-						self.pathHorizontalLinesPx.append(linePx)
-						self.pathHorizontalLinesDeg.append(lineDeg)
-						self.lenHorizontal += lineLength
-					isEven = not isEven
-					i += 2
-
-		processLines(self.scene.getMeridianLines(), True)
-		processLines(self.scene.getHorizontalLines())
-		
+		plan = self.planner.plan(self.scene.selectedCells(), self.camRatio, self.flightHeight)
+		self.plan = plan
+		# Qt objects for getters are created on first call
+		self.planViews = {}
+
 		if self.getResultsAfterCompletion:
 			self.done.emit()
 			return
 
 		self.__disableItems()
 
-		# Make report
-		pointHeader = f'"{self.lang.repPoint}","{self.lang.lblLatitude}","{self.lang.lblLongitude}"\n'
-		
-		if self.lenHorizontalWithTurns > self.lenMeridianWithTurns:
-			directionWithTurns = self.lang.repFlyMeridians
-		elif self.lenHorizontalWithTurns < self.lenMeridianWithTurns:
-			directionWithTurns = self.lang.repFlyHorizontals
-		else:
-			directionWithTurns = self.lang.repFlyEqual
-
-		if self.lenHorizontal > self.lenMeridian:
-			directionWithoutTurns = self.lang.repFlyMeridians
-		elif self.lenHorizontal < self.lenMeridian:
-			directionWithoutTurns = self.lang.repFlyHorizontals
-		else:
-			directionWithoutTurns = self.lang.repFlyEqual
-
-		report = (
-		f'"{self.lang.repCornersDescription}"\n'
-		f'"{self.lang.lblCorner}","{self.lang.lblLongitude}","{self.lang.lblLatitude}"\n'
-		f'"{self.lang.lblTopLeft}","{self.xTL}","{self.yTL}"\n'
-		f'"{self.lang.lblTopRight}","{self.xTR}","{self.yTR}"\n'
-		f'"{self.lang.lblBottomLeft}","{self.xBL}","{self.yBL}"\n'
-		f'"{self.lang.lblBottomRight}","{self.xBR}","{self.yBR}"\n'
-		f'"{self.lang.lblDelimiters}","{self.xD}","{self.yD}"\n\n'
-		f'"{self.lang.repTotalWithTurns}"\n'
-		f'"{self.lang.repByMeridians}","{self.lenMeridianWithTurns}"\n'
-		f'"{self.lang.repByHorizontals}","{self.lenHorizontalWithTurns}"\n'
-		f'"{self.lang.repBetterFlyBy}","{directionWithTurns}"\n\n'
-		f'"{self.lang.repTotalWithoutTurns}"\n'
-		f'"{self.lang.repByMeridians}","{self.lenMeridian}"\n'
-		f'"{self.lang.repByHorizontals}","{self.lenHorizontal}"\n'
-		f'"{self.lang.repBetterFlyBy}","{directionWithoutTurns}"\n\n'
-		f'"{self.lang.repAerialParams}"\n'
-		f'"{self.lang.repArea}","{self.maxHorizontal}","x","{self.maxVertical}"\n'
-		f'"{self.lang.lblDesiredRes}","{self.camRatio}"\n'
-		f'"{self.lang.lblRes}","{self.camWidth}","x","{self.camHeight}"\n'
-		f'"{self.lang.lblHeight}","{self.flightHeight}"\n'
-		f'"{self.lang.lblFocal}","{self.focalLength}"\n\n'
-		f'"{self.lang.repMeridianPoints}"\n'
-		+ pointHeader + self.pointsMeridian + 
-		f'\n"{self.lang.repHorizontalPoints}"\n'
-		+ pointHeader + self.pointsHorizontal)
-
 		# Save image
 		self.__disableItems()
-		file = QFileDialog.getSaveFileName(self, self.lang.saveFile, "", self.lang.vectorImage + " (*.svg)")[0]
+		vectorOnlyFilter = self.lang.vectorImageOnly + " (*.svg)"
+		file, chosenFilter = QFileDialog.getSaveFileName(self, self.lang.saveFile, "", self.lang.vectorImage + " (*.svg);;" + vectorOnlyFilter)
 		if file == "":
 			self.__enableItems()
 			return
@@ -576,26 +552,51 @@ class AerialWareWidget(QWidget):
 				msg.exec_()
 
 
-		rect = self.scene.sceneRect()
-		gen = QSvgGenerator()
-		gen.setFileName(file)
-		gen.setSize(rect.size().toSize())
-		gen.setViewBox(rect)
-		gen.setTitle("Flight paths generated by AerialWare")
-		gen.setDescription(gen.title())
+		# QGraphicsScene::render is not thread safe, so exporter paints a copy of what's on the scene
+		self.svgExporter = _QSvgExporter(file, self.__getSnapshot(), chosenFilter == vectorOnlyFilter, self.svgPrecision)
+		self.svgExporter.progress.connect(self.progressImage.setValue)
+		self.svgExporter.progress.connect(self.exportProgress)
+		self.svgExporter.finished.connect(self.__finishExport)
+		self.progressImage.setValue(0)
+		self.progressImage.setVisible(True)
+		self.svgExporter.start()
 
-		# Notice: painting will temporarily freeze application because QGraphicsScene::render is not thread safe.
-		# Don't try putting this into python's threads and QThread, doesn't work, I've tried, trust me XD
-		painter = QPainter(gen)
-		self.scene.render(painter)
-		painter.end()
+		# Save report while SVG is being exported
+		with open(reportName, "w") as reportFile:
+			writeReport(reportFile, self.planner, plan, self.lang, self.getOptimizedRoute())
 
-		# Save report
-		reportFile = open(reportName, "w")
-		reportFile.write(report)
-		reportFile.close()
+	def setSvgPrecision(self, precision: int):
+		"""Sets number of digits after decimal point in coordinates of SVG exported without raster. Default is 2.
+		"""
+		self.svgPrecision = precision
 
+	def __getSnapshot(self):
+		"""Copies everything that is drawn on the scene to _SceneSnapshot
+		"""
+		image = None
+		# Exporter will decode the file by itself
+		if self.imagePath == None:
+			image = self.imageItem.pixmap().toImage()
+		return _SceneSnapshot(self.scene.sceneRect(), image, self.imagePath, (self.width, self.height), self.planner.getGrid(), self.scene.selection.mask,
+			self.scene.rowPath, self.scene.colPath)
+
+	def __finishExport(self):
+		path = self.svgExporter.path
+		self.svgExporter = None
+		self.progressImage.setVisible(False)
 		self.__enableItems()
+		self.exported.emit(path)
+
+	def __stopThreads(self):
+		"""Waits for background threads and saves language before exit
+		"""
+		self.cancelImageLoading()
+		self.__stopTileDecoding()
+		self.scene.stopOptimizer()
+		if self.langSaver.isActive():
+			self.__saveLanguage()
+		if self.svgExporter != None:
+			self.svgExporter.wait()
 
 	##################
 
@@ -605,91 +606,120 @@ class AerialWareWidget(QWidget):
 		"""Returns list with points in pixels representing flight path by meridians.
 		Please note: all points are sorted as a plane should fly.
 		"""
-		return self.pathMeridianPointsPx
+		return self.__getPlanView("meridianPointsPx", self.__toQPoints)
 
 	def getPathByMeridiansPointsDeg(self):
 		"""Returns list with points in geographic coordinate system representing flight path by meridians.
 		Please note: all points are sorted as a plane should fly.
 		Looks like: [QPointF(long, lat), QPointF(long, lat), ...]
 		"""
-		return self.pathMeridianPointsDeg
+		return self.__getPlanView("meridianPointsDeg", self.__toQPoints)
 
 	def getPathByMeridiansLinesPx(self):
 		"""Returns list with lines in pixels coordinates without turns representing flight path by meridians.
 		Please note: all points of lines are sorted as a plane should fly.
 		"""
-		return self.pathMeridianLinesPx
+		return self.__getPlanView("meridianLinesPx", self.__toQLines)
 	
 	def getPathByMeridiansLinesWithTurnsPx(self):
 		"""Returns list with lines in pixels with turns representing flight path by meridians.
 		Please note: points of lines are NOT sorted as a plane should fly. You can use even lines, as they're representing turns, to sort things out. Or just get path without turns.
 		"""
-		return self.pathMeridianLinesWithTurnsPx
+		return self.__getPlanView("meridianLinesWithTurnsPx", self.__toQLines)
 
 	def getPathByMeridiansLinesDeg(self):
 		"""Returns list with lines in degrees without turns representing flight path by meridians.
 		Please note: all points of lines are sorted as a plane should fly.
 		"""
-		return self.pathMeridianLinesDeg
+		return self.__getPlanView("meridianLinesDeg", self.__toQLines)
 
 	def getPathByMeridiansLinesWithTurnsDeg(self):
 		"""Returns list with lines in degrees with turns representing flight path by meridians.
 		Please note: points of lines are NOT sorted as a plane should fly. You can use even lines, as they're representing turns, to sort things out. Or just get path without turns.
 		"""
-		return self.pathMeridianLinesWithTurnsDeg
+		return self.__getPlanView("meridianLinesWithTurnsDeg", self.__toQLines)
 
 	# Horizontals
 	def getPathByHorizontalsPointsPx(self):
 		"""Returns list with points in pixels representing flight path by horizontals.
 		"""
-		return self.pathHorizontalPointsPx
+		return self.__getPlanView("horizontalPointsPx", self.__toQPoints)
 
 	def getPathByHorizontalsPointsDeg(self):
 		"""Returns list with points in geographic coordinate system representing flight path by horizontals.
 		Looks like: [QPointF(long, lat), QPointF(long, lat), ...]
 		"""
-		return self.pathHorizontalPointsDeg
+		return self.__getPlanView("horizontalPointsDeg", self.__toQPoints)
 
 	def getPathByHorizontalsLinesPx(self):
 		"""Returns list with lines in pixels coordinates without turns representing flight path by horizontals.
 		"""
-		return self.pathHorizontalLinesPx
+		return self.__getPlanView("horizontalLinesPx", self.__toQLines)
 
 	def getPathByHorizontalsLinesWithTurnsPx(self):
 		"""Returns list with lines in pixels with turns representing flight path by horizontals.
 		"""
-		return self.pathHorizontalLinesWithTurnsPx
+		return self.__getPlanView("horizontalLinesWithTurnsPx", self.__toQLines)
 
 	def getPathByHorizontalsLinesDeg(self):
 		"""Returns list with lines in degrees without turns representing flight path by horizontals.
 		"""
-		return self.pathHorizontalLinesDeg
+		return self.__getPlanView("horizontalLinesDeg", self.__toQLines)
 
 	def getPathByHorizontalsLinesWithTurnsDeg(self):
 		"""Returns list with lines in degrees with turns representing flight path by horizontals.
 		"""
-		return self.pathHorizontalLinesWithTurnsDeg
+		return self.__getPlanView("horizontalLinesWithTurnsDeg", self.__toQLines)
 
 	# Lengths
 	def getPathLengthByMeridians(self):
 		"""Returns length of path by meridians without turns in meters.
 		"""
-		return self.lenMeridian
+		return self.plan.lenMeridian
 	
 	def getPathLengthByMeridiansWithTurns(self):
 		"""Returns length of path by meridians with turns in meters. This value is approximate.
 		"""
-		return self.lenMeridianWithTurns
+		return self.plan.lenMeridianWithTurns
 
 	def getPathLengthByHorizontals(self):
 		"""Returns length of path by horizontal without turns in meters.
 		"""
-		return self.lenHorizontal
+		return self.plan.lenHorizontal
 
 	def getPathLengthByHorizontalsWithTurns(self):
 		"""Returns length of path by horizontal with turns in meters. This value is approximate.
 		"""
-		return self.lenHorizontalWithTurns
+		return self.plan.lenHorizontalWithTurns
+
+	def __getPlanView(self, name, convert):
+		"""Converts field of the plan with given function on first call and caches the result
+		"""
+		view = self.planViews.get(name)
+		if view == None:
+			view = self.planViews[name] = convert(getattr(self.plan, name))
+		return view
+
+	@staticmethod
+	def __toQPoints(points):
+		return [QPointF(*point) for point in points]
+
+	@staticmethod
+	def __toQLines(lines):
+		return [QLineF(QPointF(*p1), QPointF(*p2)) for p1, p2 in lines]
+
+	# Arrays
+
+	def getPathArrays(self):
+		"""Returns read-only NumPy arrays of both paths without copying them. It's much faster than getting lists of points and lines.
+		Check core.Plan.getArrays() for description of arrays.
+		"""
+		return self.plan.getArrays()
+
+	def savePathArrays(self, directory: str):
+		"""Saves paths to given directory as columns in .npy files which can be memory-mapped. Check core.columns.writeColumns() for details.
+		"""
+		writeColumns(directory, self.plan)
 
 	# Aerial parameters
 
@@ -724,6 +754,36 @@ class AerialWareWidget(QWidget):
 		"""
 		return self.focalLength
 
+	def setPathOptimization(self, method, timeBudget = 0.2):
+		"""Sets how getOptimizedRoute() finds route. Call it before Step 3.
+		Args:
+			method -- core.BOUSTROPHEDON, core.GREEDY or core.TWO_OPT. TWO_OPT is used by default.
+			timeBudget -- maximum time in seconds for TWO_OPT for each direction.
+		"""
+		self.optimizationMethod, self.optimizationTime = method, timeBudget
+
+	def getOptimizedRoute(self):
+		"""Returns the shortest route with turns over selected squares as core.Route. It may go by rows or by columns, fly runs in any order and doesn't fly over unselected squares.
+		Paths by meridians and horizontals are always flown row by row or column by column, so this route is usually shorter. It's drawn on the scene while user selects squares.
+		Route is updated only when selection changes, so you can call it after every change. Returns None before Step 3 or if nothing is selected.
+		"""
+		return self.scene.getRoute()
+
+	def setLightweightGrid(self, lightweight):
+		"""Sets how to draw the grid. Call it before Step 3.
+		Args:
+			lightweight:
+				True -- draw whole grid as one item. It takes much less memory and time on big grids, but there's no item for each square.
+				False -- draw every square as separate item.
+				None -- draw as one item only grids with more than LIGHTWEIGHT_GRID_CELLS squares. Used by default.
+		"""
+		self.lightweightGrid = lightweight
+
+	def getTransform(self):
+		"""Returns CornersTransform used to transform coordinates. It's immutable and can be pickled, so you can pass it to worker processes.
+		"""
+		return self.planner.transform
+
 	def pxToDeg(self, x, y):
 		"""Transforms pixel coordinates of point to Geographic coordinate system.
 		Args:
@@ -731,76 +791,34 @@ class AerialWareWidget(QWidget):
 		Returns:
 			QPointF(long, lat) -- longitude and latitude coordinates of given point
 		"""
-		# Please check comments in __stepThree() where we converting step in degrees to pixels in order to understand what we're doing here.
-		# Convert given coordinates to degrees relative to the sides.
-		topX = self.xTL + self.topX * x
-		bottomX = self.xBL + self.bottomX * x
-		# We subtract because Y and lat are not codirectional by default
-		leftY = self.yTL - self.leftY * y
-		rightY = self.yTR - self.rightY * y
-
-		# Find another coordinate for each side by drawing straight line with calculated coordinate for both points.
-		# Intersection of this line and side will give needed point.
-		# Looks like this:
-		# Y
-		# ^
-		# | \ <- This is side
-		# |  \
-		# |---*-----  <- This line is crossing point relative to the side
-		# |    \
-		# |     \
-		# |------------------> X
-		# Containers for points and result.
-		top, bottom, left, right, res = QPointF(), QPointF(), QPointF(), QPointF(), QPointF()
-
-		QLineF.intersect(
-			QLineF(topX, 0, topX, 1),
-			self.top,
-			top
-		)
-		QLineF.intersect(
-			QLineF(bottomX, 0, bottomX, 1),
-			self.bottom,
-			bottom
-		)
-		QLineF.intersect(
-			QLineF(0, leftY, 1, leftY),
-			self.left,
-			left
-		)
-		QLineF.intersect(
-			QLineF(0, rightY, 1, rightY),
-			self.right,
-			right
-		)
+		return QPointF(*self.planner.pxToDeg(x, y))
 
-		# We've got coordinates for each side where given point should lie.
-		# Let's draw lines throgh them like this:
-		#  ________________________
-		# |    \                   |
-		# |_____\__________________|
-		# |      \                 |
-		# |_______\________________|
-		# Lines are drawn in geographic system, not in pixels.
-		# Their intersection will return given point in geographic system.
-		QLineF.intersect(
-			QLineF(top, bottom),
-			QLineF(left, right),
-			res
-		)
-		return res
+	def pxToDegArray(self, xy):
+		"""Transforms pixel coordinates of many points to Geographic coordinate system at once.
+		Args:
+			xy -- array of shape (..., 2) with (x, y) of points.
+		Returns:
+			Array of the same shape with (long, lat) of points.
+		"""
+		return self.planner.pxToDegArray(xy)
+
+	def degToPx(self, long, lat):
+		"""Transforms point in Geographic coordinate system to pixel coordinates.
+		Args:
+			long, lat -- longitude and latitude of point to process.
+		Returns:
+			QPointF(x, y) -- pixel coordinates of given point
+		"""
+		return QPointF(*self.planner.degToPx(long, lat))
 
-	def __lenMeters(self, p1, p2):
-		"""Calculates length in meters of line in geographic system using haversine formula.
+	def degToPxArray(self, deg):
+		"""Transforms many points in Geographic coordinate system to pixel coordinates at once.
 		Args:
-			QPointF p1, p2 -- points of line.
+			deg -- array of shape (..., 2) with (long, lat) of points.
+		Returns:
+			Array of the same shape with (x, y) of points.
 		"""
-		f1, f2 = math.radians(p1.y()), math.radians(p2.y())
-		df = f2 - f1
-		dl = math.radians(p2.x() - p1.x())
-		a = math.sin(df / 2) ** 2 + math.cos(f1) * math.cos(f2) * math.sin(dl / 2) ** 2
-		# First value is radius of Earth
-		return 6371000 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+		return self.planner.degToPxArray(deg)
 
 	##################
 	
@@ -825,88 +843,112 @@ class AerialWareWidget(QWidget):
 		self.btnNext.setEnabled(False)
 
 	def __changeLanguage(self):
-		"""Changes app language. Uses _LanguageChanger, check it's description for more.
+		"""Changes app language. Languages are taken from LanguageRegistry, check it's description for more.
 		"""
-		# Get language
-		self.lang.setLanguage(self.comboLang.currentData())
+		self.lang = self.languages.get(self.comboLang.currentText())
+		# Language is saved a bit later, so switching it many times in a row writes file only once
+		self.langSaver.start()
+		self.__retranslate()
+
+	def __saveLanguage(self):
+		"""Saves current language to file, if it has been changed
+		"""
+		self.langSaver.stop()
 		langName = self.comboLang.currentText()
+		if langName == self.savedLang:
+			return
+		try:
+			with open(self.lastLang, "w") as file:
+				file.write(langName)
+			self.savedLang = langName
+		# I.e. when program directory is read-only
+		except OSError:
+			pass
 
-		# Save this language to file
-		file = open(self.lastLang, "w")
-		file.write(langName)
-		file.close()
+	def __retranslate(self):
+		"""Sets text of every label and button in current language. Widget is repainted only once, when everything is set.
+		"""
+		self.setUpdatesEnabled(False)
+		for name, text in self.__getTexts(self.lang, self.getResultsAfterCompletion):
+			getattr(self, name).setText(text)
+
+		if self.Steps.currentIndex() == self.Steps.count() - 1:
+			self.btnNext.setText(self.lang.done if self.getResultsAfterCompletion else self.lang.save)
+		else:
+			self.btnNext.setText(self.lang.btnNext)
+		self.__showMaxArea()
+		
+		# On Step 3 there are dynamically outputed errors. Errors are stored as codes, so we only need to display them again.
+		if self.dataErrorCodes:
+			self.__showDataError()
+		self.setUpdatesEnabled(True)
+
+	@staticmethod
+	@lru_cache(maxsize=None)
+	def __getTexts(lang, getResultsAfterCompletion):
+		"""Returns (name of widget, text) for every label and button which text depends only on language.
+		Building rich text takes time, so texts are cached for every language.
+		"""
+		texts = [(name, getattr(lang, name)) for name in ("lblZoom", "lblCorner", "lblLongitude", "lblLatitude", "lblTopLeft", "lblTopRight", "lblBottomLeft",
+			"lblBottomRight", "lblDelimiters", "lblRes", "lblDesiredRes", "lblHeight", "lblFocal", "btnOpenImage", "btnCancelLoading")]
 
-		# Change text of labels and buttons
-		self.lblZoom.setText(self.lang.lblZoom)
-		self.lblCorner.setText(self.lang.lblCorner)
-		self.lblLongitude.setText(self.lang.lblLongitude)
-		self.lblLatitude.setText(self.lang.lblLatitude)
-		self.lblTopLeft.setText(self.lang.lblTopLeft)
-		self.lblTopRight.setText(self.lang.lblTopRight)
-		self.lblBottomLeft.setText(self.lang.lblBottomLeft)
-		self.lblBottomRight.setText(self.lang.lblBottomRight)
-		self.lblDelimiters.setText(self.lang.lblDelimiters)
-		self.lblRes.setText(self.lang.lblRes)
-		self.lblDesiredRes.setText(self.lang.lblDesiredRes)
-		self.lblHeight.setText(self.lang.lblHeight)
-		self.lblFocal.setText(self.lang.lblFocal)
-		self.btnOpenImage.setText(self.lang.btnOpenImage)
-
-		# Change text of task labels
+		# Text of task labels
 		start = "<html><head/><body>"
 		end = "</body></html>"
 		
-		self.lblTask1.setText(start + f"""
-			<p style='text-align: center;'><b>{self.lang.heading}</b></p>
-			<p><b>{self.lang.headingAbout}</b></p>
-			<p>{self.lang.about1}</p>
-			<p>{self.lang.about2}</p>
-			<p><b>{self.lang.workingTitle}</b></p>
-			<p>{self.lang.working}</p>
-			<p><b>{self.lang.thisStepBold}</b>{self.lang.thisStep}</p>
-			<p><b>{self.lang.noteStep1Bold}</b>{self.lang.noteStep1}</p>
-			""" + end)
+		texts.append(("lblTask1", start + f"""
+			<p style='text-align: center;'><b>{lang.heading}</b></p>
+			<p><b>{lang.headingAbout}</b></p>
+			<p>{lang.about1}</p>
+			<p>{lang.about2}</p>
+			<p><b>{lang.workingTitle}</b></p>
+			<p>{lang.working}</p>
+			<p><b>{lang.thisStepBold}</b>{lang.thisStep}</p>
+			<p><b>{lang.noteStep1Bold}</b>{lang.noteStep1}</p>
+			""" + end))
 			
-		self.lblTask2.setText(start + f"""
-			<p><b>{self.lang.setTitle}</b></p>
+		texts.append(("lblTask2", start + f"""
+			<p><b>{lang.setTitle}</b></p>
 			<ul>
-				<li>{self.lang.coordinates}</li>
-				<li>{self.lang.delimiters}</li>
+				<li>{lang.coordinates}</li>
+				<li>{lang.delimiters}</li>
 			</ul>
-		""" + end)
+		""" + end))
 
-		self.lblTask3.setText(start + f"""
-			<p>{self.lang.intro}<b>{self.lang.clickBold}</b></p>
-			<p>{self.lang.path}</p>
-			<p><b>{self.lang.legendTitle}</b></p>
+		texts.append(("lblTask3", start + f"""
+			<p>{lang.intro}<b>{lang.clickBold}</b></p>
+			<p>{lang.path}</p>
+			<p><b>{lang.legendTitle}</b></p>
 			<ul>
-				<li><span style="color: red;">{self.lang.red}</span>{self.lang.line1}<span style="color: green;">{self.lang.green}</span>{self.lang.line2}</li>
-				<li><b>{self.lang.dashedBold}</b>{self.lang.line3}</li>
+				<li><span style="color: red;">{lang.red}</span>{lang.line1}<span style="color: green;">{lang.green}</span>{lang.line2}</li>
+				<li><b>{lang.dashedBold}</b>{lang.line3}</li>
 			</ul>
-		""" + end)
+		""" + end))
 
-		if self.getResultsAfterCompletion:
-			btnText = self.lang.done
-			s4Text = self.lang.s4Done
+		if getResultsAfterCompletion:
+			s4Text = lang.s4Done
 		else:
-			btnText = self.lang.save
 			s4Text = start + f"""
-			<p>{self.lang.s4Save}</p>
-			<p><b>{self.lang.noteStep4Bold}</b>{self.lang.noteStep4} ¯\_(ツ)_/¯</p>
+			<p>{lang.s4Save}</p>
+			<p><b>{lang.noteStep4Bold}</b>{lang.noteStep4} ¯\_(ツ)_/¯</p>
 			""" + end
+		texts.append(("lblTask4_2", lang.s4Text2))
+		texts.append(("lblTask4_3", s4Text))
+		return tuple(texts)
 
-		if self.Steps.currentIndex() == self.Steps.count():
-			self.btnNext.setText(btnText)
-		else:
-			self.btnNext.setText(self.lang.btnNext)
-
+	def __showMaxArea(self):
+		"""Displays size of the biggest area on Step 4
+		"""
 		self.lblTask4_1.setText(f"{self.lang.s4Text1P1}{self.maxHorizontal}x{self.maxVertical}{self.lang.s4Text1P2}")
-		self.lblTask4_2.setText(self.lang.s4Text2)
-		self.lblTask4_3.setText(s4Text)
-		
-		# On Step 3 there are dynamically outputed errors. In order to update it we can manually reset it or just kill two birds with one stone by recalling this step in cost of couple milliseconds.
-		if self.Steps.currentIndex() == 1 and self.lblDataError.text() != "":
-			self.__stepThree()
+
+	def __showDataError(self):
+		"""Displays error which occurred on Step 3 in current language.
+		"""
+		texts = [getattr(self.lang, code) for code in self.dataErrorCodes]
+		error = texts[0]
+		if len(texts) > 1:
+			error += "<br>" + "".join(text + "<br>" for text in texts[1:])
+		self.lblDataError.setText("<html><head/><body><div>" + self.lang.errData + error + "</div></body></html>")
 		
 	def __turnPage(self):
 		"""Turns page of "Steps"
@@ -952,40 +994,97 @@ class AerialWareWidget(QWidget):
 
 # Custom classes
 
-class _LanguageChanger():
-	"""Class for loading languages.
-	Please set fallback language or this won't work.
-	Please refer to any default language as an example if you want to make translations.
-	"""
-	def __init__(self, fallback = None):
-		self.fallback = fallback
-
-	def setFallback(self, fallback):
-		"""Sets fallback language.
-		"""
-		self.fallback = fallback
-
-	def setLanguage(self, lang):
-		"""Sets current language.
-		Basically writes variables from file to it's fields. If given language is different from fallback, sets fallback first to prevent any errors.
-		"""
-		if lang.name != self.fallback.name:
-			self.setLanguage(self.fallback)
-		vs = lang.__dict__
-		for k in vs:
-			if k[0] != "_":
-				setattr(self, k, vs[k])
-
 class _QCustomScene(QGraphicsScene):
 	"""Subclass of QGraphicsScene. Does a lot of program-specific stuff.
 	Works with custom polygons, re-implements selection, draws paths.
 	"""
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs) 
-		self.customSelectedItems = []
-		self.rowLines = []
-		self.colLines = []
 		self.enabled = True
+		self.planner = None
+		self.selection = None
+		self.cellItems = {}
+		self.gridItem = None
+		self.rowPath = self.colPath = None
+		self.routeOptimizer = self.routeItem = None
+		self.routeCells = None # Squares toggled since route has been requested last time or None, if selection has been changed in bulk
+		# Route is requested when user stops clicking, so selection isn't copied on every click
+		self.routeTimer = QTimer(self)
+		self.routeTimer.setSingleShot(True)
+		self.routeTimer.setInterval(300)
+		self.routeTimer.timeout.connect(self.__requestRoute)
+
+	def setPlanner(self, planner):
+		"""Sets Planner which will generate paths and find cells.
+		"""
+		self.planner = planner
+		self.selection = Selection(*planner.getShape())
+		self.cellItems = {}
+		self.gridItem = None
+		# Column path is drawn above row path
+		self.rowPath = _QFlightPath(self, PathRuns(planner, self.selection, True), QColor(255, 10, 10), 1)
+		self.colPath = _QFlightPath(self, PathRuns(planner, self.selection, False), QColor(10, 255, 10), 2)
+		self.stopOptimizer()
+		self.routeItem = None
+
+	def setOptimizer(self, optimizer):
+		"""Sets PathOptimizer which finds recommended route in background. Call it after setPlanner().
+		"""
+		self.stopOptimizer()
+		self.routeOptimizer = _QRouteOptimizer(optimizer, self.planner.getShape(), self)
+		self.routeOptimizer.optimized.connect(self.__drawRoute)
+		self.routeCells = None
+		# Route is drawn under the paths as a wide translucent line, so they're still visible
+		pen = QPen(QColor(255, 170, 0, 150))
+		pen.setWidth(6)
+		pen.setCosmetic(True)
+		pen.setJoinStyle(Qt.RoundJoin)
+		self.routeItem = QGraphicsPathItem()
+		self.routeItem.setPen(pen)
+		self.routeItem.setZValue(0.5)
+		self.addItem(self.routeItem)
+		self.routeTimer.start()
+
+	def clear(self):
+		"""Removes every item and forgets the grid.
+		"""
+		super().clear()
+		self.planner = None
+		self.selection = None
+		self.cellItems = {}
+		self.gridItem = None
+		self.rowPath = self.colPath = None
+		self.stopOptimizer()
+		self.routeItem = None
+
+	def stopOptimizer(self):
+		"""Stops finding route and waits for the optimizer thread
+		"""
+		self.routeTimer.stop()
+		if self.routeOptimizer != None:
+			self.routeOptimizer.requestInterruption()
+			self.routeOptimizer.wait()
+			self.routeOptimizer = None
+
+	def getRoute(self):
+		"""Waits until route over current selection is found and returns it. Returns None if optimizer isn't set or nothing is selected.
+		"""
+		if self.routeOptimizer == None:
+			return None
+		if self.routeTimer.isActive():
+			self.routeTimer.stop()
+			self.__requestRoute()
+		return self.routeOptimizer.getRoute()
+
+	def addCell(self, item):
+		"""Registers square, so it can be found by its row and column.
+		"""
+		self.cellItems[(item.row, item.col)] = item
+
+	def setGridItem(self, item):
+		"""Sets _QGridItem which draws all squares instead of separate items.
+		"""
+		self.gridItem = item
 
 	def setEnabled(self, enabled):
 		"""Enables or disables scene from responding to mouse events.
@@ -1001,178 +1100,839 @@ class _QCustomScene(QGraphicsScene):
 		if event.button() != Qt.RightButton:
 			return
 
+		if self.planner == None:
+			return
+
 		# Find item at selected position. QGraphicsScene::itemAt() uses bounding rectangle instead of shape. And if user clicks on line, it'll return the line.
-		# So the only solution is to parse all objects and find which one contains point user clicked at.
-		selected = None
+		# Grid is regular, so planner can find the cell without checking every item.
 		click = event.scenePos()
-		for item in self.items():
-			if isinstance(item, _QCustomGraphicsPolygonItem) and item.shape().contains(click):
-				selected = item
-				break
-
-		if selected == None:
+		cell = self.planner.getCellAt(click.x(), click.y())
+		if cell == None:
 			return
+		self.selection.toggle(*cell)
+		self.__updateCell(*cell)
+		# Only the row and the column of this square are changed
+		self.rowPath.update(*cell)
+		self.colPath.update(*cell)
+		if self.routeOptimizer != None:
+			if self.routeCells != None:
+				self.routeCells.add(cell)
+			self.routeTimer.start()
 
-		if item in self.customSelectedItems:
-			index = self.customSelectedItems.index(item)
-			self.customSelectedItems.pop(index)
-			item.setBrush(item.uncheckBrush)
-		else:
-			self.customSelectedItems.append(item)
+	def selectedItems(self):
+		"""Returns every selected square sorted by rows, then by columns.
+		If grid is drawn by _QGridItem, there are no separate squares, so new items are created from the selection. They aren't added to the scene, and changing them doesn't change the grid.
+		Use selectedCells() for big grids, it doesn't create items.
+		"""
+		if self.gridItem == None:
+			return [self.cellItems[cell] for cell in self.selectedCells()]
+		items = []
+		for row, col in self.selectedCells():
+			item = _QCustomGraphicsPolygonItem(QPolygonF([QPointF(*point) for point in self.planner.getCellPolygon(row, col)]))
+			item.setRowCol(row, col)
 			item.setBrush(item.checkBrush)
+			items.append(item)
+		return items
+
+	def selectedCells(self):
+		"""Returns (row, col) of every selected square sorted by rows, then by columns.
+		"""
+		if self.selection == None:
+			return []
+		return self.selection.getCells()
+
+	def selectAll(self):
+		"""Selects every square.
+		"""
+		self.__applySelection(self.selection.selectAll())
+
+	def deselectAll(self):
+		"""Deselects every square.
+		"""
+		self.__applySelection(self.selection.clear())
+
+	def invertSelection(self):
+		"""Selects every deselected square and deselects every selected one.
+		"""
+		self.__applySelection(self.selection.invert())
+
+	def selectRect(self, row1, col1, row2, col2, select = True):
+		"""Selects or deselects every square in rectangle between given squares, including them.
+		"""
+		self.__applySelection(self.selection.selectRect(row1, col1, row2, col2, select))
+
+	def __applySelection(self, changed):
+		"""Updates squares after bulk change of the selection and redraws paths.
+		Args:
+			changed -- mask of changed squares.
+		"""
+		if self.gridItem != None:
+			self.gridItem.update()
+		else:
+			for row, col in np.argwhere(changed).tolist():
+				self.__updateCell(row, col)
 		self.drawPaths()
 
-	def selectedItems(self):
-		return self.customSelectedItems
+	def __updateCell(self, row, col):
+		"""Shows if square is selected or not.
+		"""
+		if self.gridItem != None:
+			self.gridItem.updateCell(row, col)
+			return
+		item = self.cellItems[(row, col)]
+		if self.selection.isSelected(row, col):
+			item.setBrush(item.checkBrush)
+		else:
+			item.setBrush(item.uncheckBrush)
 
 	def getMeridianLines(self):
-		return self.colLines
+		return self.colPath.getItems()
 	
 	def getHorizontalLines(self):
-		return self.rowLines
+		return self.rowPath.getItems()
 
 	def drawPaths(self):
-		"""Draws both flight path
-		"""
-		# Remove existing lines
-		for item in self.items():
-			if isinstance(item, QGraphicsLineItem):
-				self.removeItem(item)
-		self.rowLines, self.colLines = [], []
-		# Draw paths
-		items = self.selectedItems()
-		self.drawPath(items, True)
-		self.drawPath(items, False)
+		"""Redraws both flight paths from scratch
+		"""
+		self.rowPath.redraw()
+		self.colPath.redraw()
+		if self.routeOptimizer != None:
+			self.routeCells = None
+			self.routeTimer.start()
 		self.update()
 
-	def drawPath(self, items, useRows):
-		"""Draws one flight path
-		Args
-		items -- squares.
-		useRows:
-			True -- go by rows
-			False -- go by cols
-		"""
-		if useRows:
-			way = "row"
-			sortFirst = "col"
-			oldSide = "left"
-			newSide = "right"
-			color = QColor(255, 10, 10)
-		else:
-			way = "col"
-			sortFirst = "row"
-			oldSide = "top"
-			newSide = "bottom"
-			color = QColor(10, 255, 10)
-		
+	def __requestRoute(self):
+		"""Sends current selection to the optimizer thread
+		"""
+		self.routeOptimizer.update(self.selection.mask, self.routeCells)
+		self.routeCells = set()
+
+	def __drawRoute(self, route):
+		"""Draws route found by optimizer
+		"""
+		# Routes of stopped optimizers may still be in the queue
+		if self.routeOptimizer == None or self.sender() is not self.routeOptimizer:
+			return
+		path = QPainterPath()
+		if route != None:
+			points = route.pointsPx.tolist()
+			path.moveTo(*points[0])
+			for point in points[1:]:
+				path.lineTo(*point)
+		self.routeItem.setPath(path)
+
+
+class _QFlightPath():
+	"""Line items of one flight path. When a square is toggled, only changed lines are updated and existing items are reused.
+	"""
+	def __init__(self, scene, runs, color, z):
+		"""Args:
+			scene -- scene to draw path on.
+			runs -- PathRuns of this path.
+			color -- color of the path.
+			z -- Z value of lines.
+		"""
+		self.scene = scene
+		self.runs = runs
+		self.z = z
+		self.lineItems = [] # Line of each run
+		self.turnItems = [] # Turn k is at k - 1
+
 		# Pen for main lines
-		pen = QPen(color)
-		pen.setWidth(2)
-		pen.setCosmetic(True)
+		self.pen = QPen(color)
+		self.pen.setWidth(2)
+		self.pen.setCosmetic(True)
 		# Pen for turning lines
-		pen2 = QPen(color)
-		pen2.setWidth(2)
-		pen2.setStyle(Qt.DashLine)
-		pen2.setDashOffset(2)
-		pen2.setCosmetic(True)
-
-		# Sort selected items
-		items.sort(key=lambda item: item.getRowCol()[sortFirst])
-		items.sort(key=lambda item: item.getRowCol()[way])
-
-		def addItem(item):
-			self.addItem(item)
-			if useRows:
-				self.rowLines.append(item)
+		self.turnPen = QPen(color)
+		self.turnPen.setWidth(2)
+		self.turnPen.setStyle(Qt.DashLine)
+		self.turnPen.setDashOffset(2)
+		self.turnPen.setCosmetic(True)
+
+	def redraw(self):
+		"""Recreates all lines from the selection.
+		"""
+		for item in self.lineItems + self.turnItems:
+			self.scene.removeItem(item)
+		self.runs.reset()
+		self.lineItems = [self.__newItem(line, self.pen) for line in self.runs.lines]
+		self.turnItems = [self.__newItem(self.runs.getTurn(k), self.turnPen) for k in range(1, len(self.runs.lines))]
+
+	def update(self, row, col):
+		"""Updates path after square has been checked or unchecked.
+		"""
+		change = self.runs.update(row, col)
+		if change == None:
+			return
+		k, kind = change
+		count = len(self.runs.lines)
+
+		if kind == RUN_ADDED:
+			self.lineItems.insert(k, self.__newItem(self.runs.lines[k], self.pen))
+			if count > 1:
+				self.turnItems.append(self.__newItem(((0, 0), (0, 0)), self.turnPen))
+		elif kind == RUN_REMOVED:
+			self.scene.removeItem(self.lineItems.pop(k))
+			if self.turnItems:
+				self.scene.removeItem(self.turnItems.pop())
+		else:
+			self.lineItems[k].setLine(self.__line(self.runs.lines[k]))
+			# Only turns to and from this run are changed
+			for turn in range(max(k, 1), min(k + 2, count)):
+				self.turnItems[turn - 1].setLine(self.__line(self.runs.getTurn(turn)))
+			return
+
+		# Runs after k have been shifted, so every turn after k goes the other way now
+		for turn in range(max(k, 1), count):
+			self.turnItems[turn - 1].setLine(self.__line(self.runs.getTurn(turn)))
+
+	def getItems(self):
+		"""Returns line items in the same order as Planner.getPath() returns lines.
+		"""
+		items = []
+		for k in range(len(self.lineItems)):
+			items.append(self.lineItems[k])
+			if k > 0:
+				items.append(self.turnItems[k - 1])
+		return items
+
+	def __newItem(self, line, pen):
+		item = QGraphicsLineItem(self.__line(line))
+		item.setPen(pen)
+		item.setZValue(self.z)
+		self.scene.addItem(item)
+		return item
+
+	def __line(self, line):
+		return QLineF(QPointF(*line[0]), QPointF(*line[1]))
+
+
+class _QRouteOptimizer(QThread):
+	"""Keeps route over selected squares up to date in background, so optimization doesn't block GUI. Works with its own copy of the selection, which is updated by update().
+	Thread is started by update() and finishes when there're no more requests, so it doesn't run while user doesn't change the selection. Use requestInterruption() and wait() to stop it.
+
+	Constructor args:
+		optimizer -- PathOptimizer which finds route. Only this thread should use it after start.
+		shape -- (rows, cols) of the grid.
+	Signals:
+		optimized(object) -- emitted with the shortest Route or None, if nothing is selected.
+	"""
+	optimized = pyqtSignal(object)
+
+	def __init__(self, optimizer, shape, parent = None):
+		super().__init__(parent)
+		self.selection = Selection(*shape)
+		self.updater = RouteUpdater(optimizer, self.selection)
+		self.request = None # (mask, toggled cells or None) which hasn't been processed yet
+		self.isBusy = False
+		self.isStarted = False
+		self.route = None
+		self.mutex = QMutex()
+		self.condition = QWaitCondition()
+
+	def update(self, mask, cells = None):
+		"""Requests route over given selection. Requests which haven't been processed yet are merged.
+		Args:
+			mask -- mask of the selection. It's copied.
+			cells -- set of (row, col) of squares toggled since previous request or None, if selection has been changed in bulk.
+		"""
+		self.mutex.lock()
+		if self.request != None and cells != None:
+			cells = None if self.request[1] == None else self.request[1] | cells
+		self.request = (mask.copy(), cells)
+		if not self.isStarted:
+			# Thread may still be finishing after its last request
+			self.wait()
+			self.isStarted = True
+			self.start()
+		self.mutex.unlock()
+
+	def getRoute(self):
+		"""Waits until every requested route is found and returns the last one
+		"""
+		self.mutex.lock()
+		while (self.request != None or self.isBusy) and not self.isInterruptionRequested():
+			self.condition.wait(self.mutex)
+		route = self.route
+		self.mutex.unlock()
+		return route
+
+	def requestInterruption(self):
+		super().requestInterruption()
+		self.mutex.lock()
+		self.condition.wakeAll()
+		self.mutex.unlock()
+
+	def run(self):
+		while True:
+			self.mutex.lock()
+			if self.request == None or self.isInterruptionRequested():
+				self.isStarted = False
+				self.mutex.unlock()
+				return
+			(mask, cells), self.request = self.request, None
+			self.isBusy = True
+			self.mutex.unlock()
+
+			self.selection.setMask(mask)
+			if cells == None:
+				self.updater.reset()
 			else:
-				self.colLines.append(item)
-
-		# Draw lines
-		newPos = True # Shows if we're will be at new col/row at next iteration
-		prevLine = None # Previously drawn line
-		isLastPointReversed = False # Shows from which end draw turning line
-		for i in range(len(items)):
-			item = items[i]
-			if newPos:
-				side1 = item.getSides()[oldSide]
-				newPos = False
-			pos = item.getRowCol()[way]
-			try:
-				nextPos = items[i + 1].getRowCol()[way]
-			except:
-				nextPos = pos + 1
-			if pos != nextPos:
-				side2 = item.getSides()[newSide]
-				lineF = QLineF(side1, side2)
-				line = QGraphicsLineItem(lineF)
-				line.setPen(pen)
-				addItem(line)
-				newPos = True
-				if prevLine != None:
-					if isLastPointReversed:
-						start = prevLine.p2()
-						end = side2
-					else:
-						start = prevLine.p1()
-						end = side1
-					newLine = QGraphicsLineItem(QLineF(start, end))
-					newLine.setPen(pen2)
-					addItem(newLine)
-				isLastPointReversed = not isLastPointReversed
-				prevLine = lineF
+				for cell in cells:
+					self.updater.update(*cell)
+			route = self.updater.optimize()
+			# Signal is queued before getRoute() returns, so route is drawn by then
+			self.optimized.emit(route)
+			self.mutex.lock()
+			self.route, self.isBusy = route, False
+			self.condition.wakeAll()
+			self.mutex.unlock()
 
 
 class _QCustomGraphicsPolygonItem(QGraphicsPolygonItem):
 	"""Represents cell of a grid. Contains program-specific methods.
+	There may be hundreds of thousands of cells, so pen and brushes are shared between all of them instead of being created for every cell.
 	"""
+
+	# Appearance
+	pen = QPen(QColor(30, 30, 255))
+	pen.setWidth(2)
+	pen.setCosmetic(True)
+	checkBrush = QBrush(QColor(130, 130, 255, 100))
+	uncheckBrush = QBrush(QColor(0, 0, 0, 0))
+
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
-		# Set appearance
-		pen = QPen(QColor(30, 30, 255))
-		pen.setWidth(2)
-		pen.setCosmetic(True)
-		self.setPen(pen)
-		self.checkBrush = QBrush(QColor(130, 130, 255, 100))
-		self.uncheckBrush = QBrush(QColor(0, 0, 0, 0))
-
-		# Calculate centers of polygon's sides
-		def getSide(p1, p2):
-			x1, x2, y1, y2 = p1.x(), p2.x(), p1.y(), p2.y()
-			return QPointF(
-				min(x1, x2) + abs((x1 - x2) / 2),
-				min(y1, y2) + abs((y1 - y2) / 2)
-			)
-		points = self.polygon()
-		# Check Step 3 to understand magic numbers below
-		self.left = getSide(points[0], points[3])
-		self.right = getSide(points[1], points[2])
-		self.top = getSide(points[0], points[1])
-		self.bottom = getSide(points[3], points[2])
-
-	def getSides(self):
-		"""Returns dictionary of sides
-		"""
-		return {
-			"left": self.left,
-			"right": self.right,
-			"top": self.top,
-			"bottom": self.bottom
-		}
-	
+		self.setPen(self.pen)
+
 	def setRowCol(self, row, col):
 		"""Sets row and column of square in a grid
 		"""
 		self.row = row
 		self.col = col
 
-	def getRowCol(self):
-		"""Returns dictionary with row and column
-		"""
-		return {
-			"row": self.row,
-			"col": self.col
+
+class _SceneSnapshot():
+	"""Copy of everything drawn on the scene which doesn't depend on the scene itself, so it can be painted in another thread.
+
+	Constructor args:
+		rect -- scene rect.
+		image -- QImage to draw or None, if it should be read from imagePath.
+		imagePath -- path to image file or None.
+		imageSize -- (width, height) of the image.
+		points -- grid points from Planner.getGrid().
+		mask -- selection mask.
+		rowPath, colPath -- _QFlightPath by rows and by columns.
+	"""
+	def __init__(self, rect, image, imagePath, imageSize, points, mask, rowPath, colPath):
+		self.rect = QRectF(rect)
+		self.image = image
+		self.imagePath = imagePath
+		self.imageSize = imageSize
+		self.points = points.copy()
+		self.mask = mask.copy()
+		# Path by columns is drawn above path by rows. Each path is (lines, pen, turn pen).
+		self.paths = [(path.runs.getLines(), QPen(path.pen), QPen(path.turnPen)) for path in (rowPath, colPath)]
+
+
+class _QSvgExporter(QThread):
+	"""Paints _SceneSnapshot to SVG in background. Looks like the scene.
+
+	Constructor args:
+		path -- path to SVG file.
+		snapshot -- _SceneSnapshot to paint.
+		vectorOnly -- if True, image is referenced instead of being embedded. Every layer is written as one <path> without QPainter, so file is much smaller.
+			Images bigger than TILED_IMAGE_PIXELS are embedded tile by tile, so they're never decoded whole. If their format can't read parts of the image, they're always referenced.
+		precision -- number of digits after decimal point when vectorOnly is True.
+	Signals:
+		progress(int) -- percent of painted squares or of written shapes, if layers are written as paths.
+	"""
+	# Size of tiles of huge images in pixels
+	tileSize = 4096
+
+	progress = pyqtSignal(int)
+
+	def __init__(self, path, snapshot, vectorOnly = False, precision = 2, parent = None):
+		super().__init__(parent)
+		self.path = path
+		self.snapshot = snapshot
+		self.vectorOnly = vectorOnly
+		self.precision = precision
+
+	def run(self):
+		snapshot = self.snapshot
+		width, height = snapshot.imageSize
+		isTiled = snapshot.image == None and snapshot.imagePath != None and width * height > TILED_IMAGE_PIXELS
+		# Huge image which can't be read by parts would be decoded whole, so it's referenced instead
+		if self.vectorOnly or (isTiled and not QImageReader(snapshot.imagePath).supportsOption(QImageIOHandler.ClipRect)):
+			self.__writeVector()
+		else:
+			self.__paint(isTiled)
+		self.progress.emit(100)
+
+	def __writeVector(self):
+		snapshot = self.snapshot
+		rect = snapshot.rect
+		image = None
+		if snapshot.imagePath != None:
+			image = (getImageHref(snapshot.imagePath, self.path), *snapshot.imageSize)
+		brush = _QCustomGraphicsPolygonItem.checkBrush.color()
+		# Layers look like the scene, so their style is taken from pens and brushes
+		style = {
+			"bounds": self.__stroke(QPen()),
+			"cells": {"fill": brush.name(), "fill_opacity": self.__opacity(brush)},
+			"grid": self.__stroke(_QCustomGraphicsPolygonItem.pen),
+			"paths": [(self.__stroke(pen), self.__stroke(turnPen)) for lines, pen, turnPen in snapshot.paths],
 		}
+		paths = [([line[:2] for line in lines], [line[2] for line in lines]) for lines, pen, turnPen in snapshot.paths]
+		with open(self.path, "w", encoding="utf-8") as file:
+			writeFlightPaths(file, (rect.left(), rect.top(), rect.width(), rect.height()), snapshot.points, snapshot.mask, paths, image, self.precision, style, self.progress.emit)
+
+	def __stroke(self, pen):
+		"""Returns SVG attributes of the pen
+		"""
+		width = max(pen.widthF(), 1)
+		attributes = {"stroke": pen.color().name(), "stroke_width": f"{width:g}"}
+		if pen.color().alpha() != 255:
+			attributes["stroke_opacity"] = self.__opacity(pen.color())
+		if pen.isCosmetic():
+			attributes["vector_effect"] = "non-scaling-stroke"
+		if pen.style() != Qt.SolidLine:
+			# Dashes are measured in widths of the pen
+			attributes["stroke_dasharray"] = " ".join(f"{dash * width:g}" for dash in pen.dashPattern())
+			attributes["stroke_dashoffset"] = f"{pen.dashOffset() * width:g}"
+		return attributes
+
+	def __opacity(self, color):
+		return round(color.alphaF(), 3)
+
+	def __paint(self, isTiled):
+		snapshot = self.snapshot
+		rect = snapshot.rect
+		gen = QSvgGenerator()
+		gen.setFileName(self.path)
+		gen.setSize(rect.size().toSize())
+		gen.setViewBox(rect)
+		gen.setTitle("Flight paths generated by AerialWare")
+		gen.setDescription(gen.title())
+
+		painter = QPainter(gen)
+		image = snapshot.image
+		if isTiled:
+			self.__paintTiles(painter)
+		elif image == None and snapshot.imagePath != None:
+			image = QImageReader(snapshot.imagePath).read()
+		if image != None and not image.isNull():
+			painter.drawImage(QRectF(0, 0, image.width(), image.height()), image)
+
+		# Bounds of the grid
+		painter.setPen(QPen())
+		painter.setBrush(Qt.NoBrush)
+		painter.drawRect(rect)
+		painter.setClipRect(rect)
+		self.__paintGrid(painter)
+
+		painter.setClipping(False)
+		for lines, pen, turnPen in snapshot.paths:
+			for p1, p2, isTurn in lines:
+				painter.setPen(turnPen if isTurn else pen)
+				painter.drawLine(QLineF(QPointF(*p1), QPointF(*p2)))
+		painter.end()
+
+	def __paintTiles(self, painter):
+		"""Paints image from file tile by tile, so only one tile is decoded at a time
+		"""
+		width, height = self.snapshot.imageSize
+		for y in range(0, height, self.tileSize):
+			for x in range(0, width, self.tileSize):
+				source = QRect(x, y, min(self.tileSize, width - x), min(self.tileSize, height - y))
+				reader = QImageReader(self.snapshot.imagePath)
+				reader.setClipRect(source)
+				tile = reader.read()
+				if not tile.isNull():
+					painter.drawImage(QRectF(source), tile)
+
+	def __paintGrid(self, painter):
+		"""Paints squares row by row the same way as _QGridItem does
+		"""
+		points, mask = self.snapshot.points, self.snapshot.mask
+		rows, cols = mask.shape
+		percent = 0
+		for row in range(rows):
+			painter.setPen(Qt.NoPen)
+			painter.setBrush(_QCustomGraphicsPolygonItem.checkBrush)
+			for col in np.flatnonzero(mask[row]).tolist():
+				polygon = points[row:row + 2, col:col + 2][[0, 0, 1, 1], [0, 1, 1, 0]].tolist()
+				painter.drawPolygon(QPolygonF([QPointF(*point) for point in polygon]))
+
+			# Top line of the row and parts of vertical lines inside it
+			painter.setPen(_QCustomGraphicsPolygonItem.pen)
+			painter.setBrush(Qt.NoBrush)
+			vertical = np.concatenate((points[row], points[row + 1]), axis=1).tolist()
+			painter.drawLines([QLineF(*points[row, 0].tolist(), *points[row, -1].tolist())] + [QLineF(*line) for line in vertical])
+
+			newPercent = (row + 1) * 99 // rows
+			if newPercent != percent:
+				percent = newPercent
+				self.progress.emit(percent)
+
+		painter.drawLine(QLineF(*points[-1, 0].tolist(), *points[-1, -1].tolist()))
+
+
+class _QImageLoader(QThread):
+	"""Decodes image from file in background, so GUI won't freeze.
+	If format can decode scaled images fast (i.e. JPEG), emits scaled down preview first.
+	Progress is measured by the part of the file read by the decoder. Use requestInterruption() to cancel loading.
+
+	Constructor args:
+		path -- path to image.
+		size -- QSize of image read from its header.
+	Signals:
+		progress(int) -- percent of the file that has been read.
+		loaded(QImage) -- emitted with preview and then with the whole image.
+		failed -- emitted when image can't be decoded.
+	"""
+	# Maximum size of preview
+	previewSize = 1024
+
+	progress = pyqtSignal(int)
+	loaded = pyqtSignal(QImage)
+	failed = pyqtSignal()
+
+	def __init__(self, path, size, parent = None):
+		super().__init__(parent)
+		self.path = path
+		self.size = size
+
+	def run(self):
+		if max(self.size.width(), self.size.height()) > self.previewSize and QImageReader(self.path).supportsOption(QImageIOHandler.ScaledSize):
+			preview = self.__read(self.size.scaled(self.previewSize, self.previewSize, Qt.KeepAspectRatio), False)
+			if preview == None:
+				return
+			self.loaded.emit(preview)
+
+		image = self.__read(None, True)
+		if image != None:
+			self.progress.emit(100)
+			self.loaded.emit(image)
+
+	def __read(self, scaledSize, reportProgress):
+		"""Decodes image.
+		Args:
+			scaledSize -- QSize to scale image to or None.
+			reportProgress -- whether to emit progress.
+		Returns:
+			QImage or None, if loading has been cancelled or image can't be decoded.
+		"""
+		file = _QProgressFile(self.path, self, reportProgress)
+		if not file.open(QIODevice.ReadOnly):
+			self.failed.emit()
+			return None
+		reader = QImageReader(file)
+		if scaledSize != None:
+			reader.setScaledSize(scaledSize)
+		image = reader.read()
+		file.close()
+
+		# Interrupted decoders may return partially decoded image
+		if self.isInterruptionRequested():
+			return None
+		if image.isNull():
+			self.failed.emit()
+			return None
+		return image
+
+
+class _QProgressFile(QFile):
+	"""File which reports to _QImageLoader how much of it has been read. Stops reading when loading has been cancelled.
+	"""
+	def __init__(self, path, loader, reportProgress):
+		super().__init__(path)
+		self.loader = loader
+		self.reportProgress = reportProgress
+		self.bytesRead = 0
+		self.percent = 0
+
+	def readData(self, maxlen):
+		# Decoder will stop on read error
+		if self.loader.isInterruptionRequested():
+			return None
+		data = super().readData(maxlen)
+		if data and self.reportProgress:
+			self.bytesRead += len(data)
+			percent = min(99, self.bytesRead * 100 // max(self.size(), 1))
+			if percent != self.percent:
+				self.percent = percent
+				self.loader.progress.emit(percent)
+		return data
+
+
+class _QTiledImageItem(QGraphicsItem):
+	"""Draws huge image. Only visible tiles are decoded at resolution needed for current zoom.
+	Every next level of the pyramid is twice smaller than previous one. Decoded tiles are kept in LRU cache.
+	Tiles are decoded by _QTileDecoder in background. Until tile is decoded, part of a smaller level is drawn instead. The smallest level is one tile which is never removed from cache.
+	Formats which can't read parts of the image (i.e. PNG) are decoded whole only once at reduced resolution, see _QTileDecoder.
+	"""
+	# Size of tile on the screen
+	tileSize = 512
+	# Maximum memory of all cached tiles in bytes
+	cacheSize = 256 * 1024 * 1024
+
+	def __init__(self, path, size, parent = None):
+		"""Args:
+			path -- path to image.
+			size -- QSize of image. Read it with QImageReader, so image won't be decoded.
+			parent -- parent item.
+		"""
+		super().__init__(parent)
+		self.path = path
+		self.size = size
+		self.tiles = OrderedDict() # (level, x, y): QImage
+		self.tilesBytes = 0
+		self.maxLevel = max(0, math.ceil(math.log2(max(size.width(), size.height()) / self.tileSize)))
+		# We need exposed rect to decode only visible tiles
+		self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+		self.decoder = _QTileDecoder(path, size)
+		self.decoder.decoded.connect(self.__addTile)
+		self.decoder.start()
+		# The smallest level is drawn when nothing else has been decoded
+		self.__requestTile(self.maxLevel, 0, 0)
+
+	def boundingRect(self):
+		return QRectF(0, 0, self.size.width(), self.size.height())
+
+	def stopDecoding(self):
+		"""Stops background decoding of tiles. Call it before removing item from the scene.
+		"""
+		self.decoder.requestInterruption()
+		self.decoder.wait()
+
+	def paint(self, painter, option, widget = None):
+		# Find level where one pixel of the tile is not less than one pixel of the screen
+		lod = option.levelOfDetailFromTransform(painter.worldTransform())
+		level = min(max(math.floor(math.log2(1 / lod)), 0), self.maxLevel) if lod > 0 else self.maxLevel
+		# Tile size in pixels of the image
+		size = self.tileSize * 2 ** level
+
+		# Exposed rect may be the whole item, i.e. when scene is rendered to a painter. So also crop it by what painter can actually draw.
+		rect = option.exposedRect.intersected(self.boundingRect())
+		if painter.hasClipping():
+			rect = rect.intersected(painter.clipBoundingRect())
+		for y in range(math.floor(rect.top() / size), math.ceil(rect.bottom() / size)):
+			for x in range(math.floor(rect.left() / size), math.ceil(rect.right() / size)):
+				source = self.__getSource(level, x, y)
+				key = (level, x, y)
+				tile = self.tiles.get(key)
+				if tile != None:
+					self.tiles.move_to_end(key)
+					painter.drawImage(QRectF(source), tile)
+					continue
+				self.__requestTile(level, x, y)
+				self.__paintSmallerTile(painter, level, source)
+
+	def __paintSmallerTile(self, painter, level, source):
+		"""Paints part of the nearest smaller level which has been decoded
+		"""
+		for smallerLevel in range(level + 1, self.maxLevel + 1):
+			size = self.tileSize * 2 ** smallerLevel
+			x, y = source.left() // size, source.top() // size
+			tile = self.tiles.get((smallerLevel, x, y))
+			if tile == None:
+				continue
+			scale = 2 ** smallerLevel
+			painter.drawImage(QRectF(source), tile, QRectF((source.left() - x * size) / scale, (source.top() - y * size) / scale, source.width() / scale, source.height() / scale))
+			return
+
+	def __getSource(self, level, x, y):
+		"""Returns QRect of tile in pixels of the image
+		"""
+		size = self.tileSize * 2 ** level
+		return QRect(x * size, y * size, size, size).intersected(QRect(QPoint(0, 0), self.size))
+
+	def __requestTile(self, level, x, y):
+		self.decoder.request((level, x, y), self.__getSource(level, x, y))
+
+	def __addTile(self, key, tile):
+		"""Caches decoded tile and repaints the item
+		"""
+		if key in self.tiles:
+			return
+		self.tiles[key] = tile
+		self.tilesBytes += tile.sizeInBytes()
+		# Remove least recently used tiles except the smallest level
+		smallest = (self.maxLevel, 0, 0)
+		for oldKey in list(self.tiles):
+			if self.tilesBytes <= self.cacheSize or len(self.tiles) <= 2:
+				break
+			if oldKey != smallest and oldKey != key:
+				self.tilesBytes -= self.tiles.pop(oldKey).sizeInBytes()
+				self.decoder.forget(oldKey)
+		self.update(QRectF(self.__getSource(*key)))
+
+
+class _QTileDecoder(QThread):
+	"""Decodes tiles of _QTiledImageItem in background. The most recently requested tiles are decoded first, so visible tiles don't wait for the ones user has scrolled away from.
+	Only formats which can read parts of the image, i.e. JPEG, are really decoded tile by tile. Other formats are decoded whole only once, scaled down to the first level which has no more than maxPixels pixels.
+	That level and all smaller ones are kept in memory, so they take up to 4/3 * maxPixels * 4 bytes. Tiles of bigger levels are upscaled from it, so they're blurry.
+	Formats which can't scale while decoding, i.e. TIFF and BMP, still need memory for the whole image while it's being decoded.
+	Use requestInterruption() and wait() to stop it.
+
+	Constructor args:
+		path -- path to image.
+		size -- QSize of image.
+	Signals:
+		decoded(tuple, QImage) -- emitted with (level, x, y) of tile and the tile.
+	"""
+	# Maximum number of waiting requests. The oldest ones are dropped, they'll be requested again if they're still visible.
+	maxRequests = 64
+	# Maximum number of pixels of the level decoded from formats which can't read parts of the image
+	maxPixels = 16 * 1024 * 1024
+
+	decoded = pyqtSignal(tuple, QImage)
+
+	def __init__(self, path, size, parent = None):
+		super().__init__(parent)
+		self.path = path
+		self.size = size
+		self.canClip = QImageReader(path).supportsOption(QImageIOHandler.ClipRect)
+		# If format can't read parts of the image, it's decoded at this level, and it and smaller levels are kept in memory
+		self.firstLevel = 0
+		while self.__getLevelSize(self.firstLevel).width() * self.__getLevelSize(self.firstLevel).height() > self.maxPixels:
+			self.firstLevel += 1
+		self.levels = []
+		self.requests = OrderedDict() # (level, x, y): QRect of tile in pixels of the image
+		self.decodedKeys = set() # Tiles which item has or will receive. Item may request them again before it receives them.
+		self.mutex = QMutex()
+		self.condition = QWaitCondition()
+
+	def request(self, key, source):
+		"""Requests tile. If it has already been requested, moves it to the front of the queue.
+		Args:
+			key -- (level, x, y) of tile.
+			source -- QRect of tile in pixels of the image.
+		"""
+		self.mutex.lock()
+		self.requests[key] = source
+		self.requests.move_to_end(key)
+		if len(self.requests) > self.maxRequests:
+			self.requests.popitem(last=False)
+		self.condition.wakeOne()
+		self.mutex.unlock()
+
+	def forget(self, key):
+		"""Allows to decode tile again. Call it when tile is removed from cache.
+		"""
+		self.mutex.lock()
+		self.decodedKeys.discard(key)
+		self.mutex.unlock()
+
+	def requestInterruption(self):
+		super().requestInterruption()
+		self.mutex.lock()
+		self.condition.wakeOne()
+		self.mutex.unlock()
+
+	def run(self):
+		while True:
+			self.mutex.lock()
+			while not self.requests and not self.isInterruptionRequested():
+				self.condition.wait(self.mutex)
+			if self.isInterruptionRequested():
+				self.mutex.unlock()
+				return
+			key, source = self.requests.popitem()
+			isDecoded = key in self.decodedKeys
+			self.decodedKeys.add(key)
+			self.mutex.unlock()
+			if not isDecoded:
+				self.decoded.emit(key, self.__decode(key[0], source))
+
+	def __decode(self, level, source):
+		scale = 2 ** level
+		size = QSize(math.ceil(source.width() / scale), math.ceil(source.height() / scale))
+		if self.canClip:
+			reader = QImageReader(self.path)
+			reader.setClipRect(source)
+			reader.setScaledSize(size)
+			return reader.read()
+		# Bigger levels than the first one aren't kept, so tile is taken from the first level and upscaled
+		decodedLevel = max(level, self.firstLevel)
+		scale = 2 ** decodedLevel
+		tile = self.__getLevel(decodedLevel).copy(QRect(source.left() // scale, source.top() // scale, math.ceil(source.width() / scale), math.ceil(source.height() / scale)))
+		if tile.size() != size:
+			tile = tile.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+		return tile
+
+	def __getLevel(self, level):
+		"""Returns whole level of the pyramid, level should be not less than the first level. Image is decoded only once, each next level is downscaled from the previous one.
+		"""
+		while len(self.levels) <= level - self.firstLevel:
+			if not self.levels:
+				reader = QImageReader(self.path)
+				reader.setScaledSize(self.__getLevelSize(self.firstLevel))
+				self.levels.append(reader.read())
+				continue
+			image = self.levels[-1]
+			self.levels.append(image.scaled(math.ceil(image.width() / 2), math.ceil(image.height() / 2), Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
+		return self.levels[level - self.firstLevel]
+
+	def __getLevelSize(self, level):
+		scale = 2 ** level
+		return QSize(math.ceil(self.size.width() / scale), math.ceil(self.size.height() / scale))
+
+
+class _QGridItem(QGraphicsItem):
+	"""Whole grid as one item. Used instead of _QCustomGraphicsPolygonItem for big grids.
+	Paints only visible squares right from planner's and selection's arrays, so it doesn't need any Qt objects for each square.
+	"""
+	def __init__(self, planner, selection, parent = None):
+		"""Args:
+			planner -- Planner which generated the grid.
+			selection -- Selection of squares.
+			parent -- parent item.
+		"""
+		super().__init__(parent)
+		self.planner = planner
+		self.selection = selection
+		# We need exposed rect to paint only visible squares
+		self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+		points = planner.getGrid()
+		left, top = points.min(axis=(0, 1)).tolist()
+		right, bottom = points.max(axis=(0, 1)).tolist()
+		self.rect = QRectF(left, top, right - left, bottom - top)
+
+	def boundingRect(self):
+		return self.rect
+
+	def updateCell(self, row, col):
+		"""Repaints given square.
+		"""
+		self.update(self.__polygon(row, col).boundingRect())
+
+	def paint(self, painter, option, widget = None):
+		rect = option.exposedRect
+		row1, col1, row2, col2 = self.planner.getCellRange(rect.left(), rect.top(), rect.right(), rect.bottom())
+		if row1 == row2 or col1 == col2:
+			return
+
+		# Selected squares. Appearance is the same as of _QCustomGraphicsPolygonItem.
+		painter.setPen(Qt.NoPen)
+		painter.setBrush(_QCustomGraphicsPolygonItem.checkBrush)
+		for row, col in np.argwhere(self.selection.mask[row1:row2, col1:col2]).tolist():
+			painter.drawPolygon(self.__polygon(row + row1, col + col1))
+
+		# Lines of the grid are straight, so we need only their ends
+		points = self.planner.getGrid()
+		vertical = np.concatenate((points[row1, col1:col2 + 1], points[row2, col1:col2 + 1]), axis=1).tolist()
+		horizontal = np.concatenate((points[row1:row2 + 1, col1], points[row1:row2 + 1, col2]), axis=1).tolist()
+		painter.setPen(_QCustomGraphicsPolygonItem.pen)
+		painter.setBrush(Qt.NoBrush)
+		painter.drawLines([QLineF(*line) for line in vertical + horizontal])
+
+	def __polygon(self, row, col):
+		return QPolygonF([QPointF(*point) for point in self.planner.getCellPolygon(row, col)])
 
 
 class AerialWare():
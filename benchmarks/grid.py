@@ -0,0 +1,68 @@
+"""
+Benchmark of grid generation. Shows how generateGrid() scales from 10x10 to 2000x2000 cells compared to the old point-by-point loop.
+
+Run from the program directory:
+	python benchmarks/grid.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.grid import generateGrid
+
+# Old loop is too slow for big grids
+LOOP_LIMIT = 500
+
+def _intersect(x1, y1, x2, y2, x3, y3, x4, y4):
+	"""Finds intersection of two infinite lines: (x1, y1)-(x2, y2) and (x3, y3)-(x4, y4). Works just like QLineF.intersect().
+	Returns:
+		(x, y) -- point of intersection or (0, 0), if lines are parallel.
+	"""
+	ax, ay = x2 - x1, y2 - y1
+	bx, by = x3 - x4, y3 - y4
+	denominator = ay * bx - ax * by
+	if denominator == 0:
+		return (0.0, 0.0)
+	cx, cy = x1 - x3, y1 - y3
+	na = (by * cx - bx * cy) / denominator
+	return (x1 + ax * na, y1 + ay * na)
+
+def loopGrid(width, height, xDTop, xDBottom, yDLeft, yDRight):
+	"""Point-by-point grid generation as it was done before generateGrid().
+	"""
+	pointRows = []
+	y3 = y4 = 0
+	while y3 <= height + yDLeft / 2 or y4 <= height + yDRight / 2:
+		x1 = x2 = 0
+		points = []
+		while x1 <= width + xDTop / 2 or x2 <= width + xDBottom / 2:
+			points.append(_intersect(x1, 0, x2, height, 0, y3, width, y4))
+			x1 += xDTop
+			x2 += xDBottom
+		pointRows.append(points)
+		y3 += yDLeft
+		y4 += yDRight
+	return pointRows
+
+def measure(function, *args):
+	"""Returns time in seconds of the fastest of 3 runs.
+	"""
+	best = None
+	for i in range(3):
+		start = time.perf_counter()
+		function(*args)
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+if __name__ == '__main__':
+	width, height = 40000, 30000
+	print(f"{'Cells':>12} {'generateGrid, s':>16} {'Loop, s':>10}")
+	for n in (10, 100, 500, 1000, 2000):
+		# Slightly skewed delimiters, just like on a real image
+		args = (width, height, width / n, width / n * 1.01, height / n, height / n * 0.99)
+		vectorized = measure(generateGrid, *args)
+		loop = f"{measure(loopGrid, *args):10.4f}" if n <= LOOP_LIMIT else f"{'-':>10}"
+		print(f"{f'{n}x{n}':>12} {vectorized:16.4f} {loop}")
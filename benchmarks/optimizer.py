@@ -0,0 +1,44 @@
+"""
+Benchmark of path optimization. Compares lengths with turns and time of every method on selections of different shapes.
+
+Run from the program directory:
+	python benchmarks/optimizer.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import Planner, Selection, PathOptimizer, BOUSTROPHEDON, GREEDY, TWO_OPT
+
+# Time budget of 2-opt for each direction in seconds
+TIME_BUDGET = 1
+
+def blobs(selection, count, rnd):
+	"""Selects some rectangles
+	"""
+	for i in range(count):
+		row, col = rnd.randrange(selection.rows), rnd.randrange(selection.cols)
+		selection.selectRect(row, col, min(selection.rows - 1, row + rnd.randrange(5, 30)), min(selection.cols - 1, col + rnd.randrange(5, 30)))
+
+def scattered(selection, count, rnd):
+	"""Selects random cells
+	"""
+	for i in range(count):
+		selection.toggle(rnd.randrange(selection.rows), rnd.randrange(selection.cols))
+
+if __name__ == '__main__':
+	planner = Planner(((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05)), (0.005, 0.005), 4000, 3000)
+	print(f"Grid: {planner.rows}x{planner.cols}")
+	print(f"{'Selection':>20} {'Method':>14} {'Length with turns, km':>22} {'Time, s':>8}")
+	for name, select, count in (("8 rectangles", blobs, 8), ("500 random cells", scattered, 500), ("3000 random cells", scattered, 3000)):
+		selection = Selection(planner.rows, planner.cols)
+		select(selection, count, random.Random(0))
+		for method in (BOUSTROPHEDON, GREEDY, TWO_OPT):
+			optimizer = PathOptimizer(planner, method, TIME_BUDGET)
+			start = time.perf_counter()
+			route = optimizer.optimize(selection)
+			elapsed = time.perf_counter() - start
+			print(f"{name:>20} {method:>14} {route.lengthWithTurns / 1000:22.1f} {elapsed:8.3f}")
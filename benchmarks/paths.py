@@ -0,0 +1,74 @@
+"""
+Benchmark of flight path updates. Compares rebuilding whole path on every click with PathRuns.update() and checks that both give the same lines.
+Line items drawn by the program are tested in tests/test_paths.py.
+
+Run from the program directory:
+	python benchmarks/paths.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import Planner
+from core.paths import PathRuns
+from core.selection import Selection
+
+# How many clicks to do on each grid
+CLICKS = 2000
+# Check equivalence after every n-th click. Checking is as slow as full rebuild, so don't do it too often.
+CHECK_EVERY = 50
+
+def clicks(planner, count, seed = 0):
+	"""Generates random clicks. Some of them deselect previously selected cells.
+	"""
+	rnd = random.Random(seed)
+	selected = []
+	for i in range(count):
+		if selected and rnd.random() < 0.2:
+			yield selected.pop(rnd.randrange(len(selected)))
+		else:
+			cell = (rnd.randrange(planner.rows), rnd.randrange(planner.cols))
+			selected.append(cell)
+			yield cell
+
+if __name__ == '__main__':
+	print(f"{'Cells':>12} {'Full rebuild, ms/click':>24} {'Incremental, ms/click':>24}")
+	for n in (10, 100, 500):
+		planner = Planner(((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05)), (1 / n, 1 / n), 4000, 3000)
+		clicked = list(clicks(planner, CLICKS))
+
+		# Full rebuild on every click
+		selection = Selection(planner.rows, planner.cols)
+		start = time.perf_counter()
+		for cell in clicked:
+			selection.toggle(*cell)
+			cells = selection.getCells()
+			for useRows in (True, False):
+				planner.getPath(cells, useRows)
+		full = (time.perf_counter() - start) / CLICKS * 1000
+
+		# Incremental updates
+		selection = Selection(planner.rows, planner.cols)
+		runs = (PathRuns(planner, selection, True), PathRuns(planner, selection, False))
+		start = time.perf_counter()
+		for cell in clicked:
+			selection.toggle(*cell)
+			for path in runs:
+				path.update(*cell)
+		incremental = (time.perf_counter() - start) / CLICKS * 1000
+
+		# Check that both ways give the same paths
+		selection = Selection(planner.rows, planner.cols)
+		runs = (PathRuns(planner, selection, True), PathRuns(planner, selection, False))
+		for i, cell in enumerate(clicked, 1):
+			selection.toggle(*cell)
+			for path in runs:
+				path.update(*cell)
+				if i % CHECK_EVERY == 0 or i == CLICKS:
+					if path.getLines() != planner.getPath(selection.getCells(), path.useRows):
+						sys.exit(f"Paths differ after click {i} on {n}x{n} grid")
+
+		print(f"{f'{planner.rows}x{planner.cols}':>12} {full:24.3f} {incremental:24.3f}")
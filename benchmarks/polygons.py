@@ -0,0 +1,86 @@
+"""
+Benchmark of grid squares. Compares memory and time needed to create squares with their own pens, brushes and sides, as it was done before, and with shared appearance.
+Each measurement runs in a separate process, so results don't affect each other.
+
+Run from the program directory:
+	python benchmarks/polygons.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+programPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, programPath)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+def rss():
+	"""Returns resident memory of this process in bytes or 0, if it can't be found.
+	"""
+	try:
+		with open("/proc/self/statm") as file:
+			return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except (OSError, ValueError, AttributeError):
+		return 0
+
+def measure(size, legacy):
+	"""Creates grid of size x size squares and prints time in seconds, Python memory and total memory in bytes.
+	"""
+	from PyQt5.QtWidgets import QApplication, QGraphicsScene, QGraphicsRectItem, QGraphicsPolygonItem
+	from PyQt5.QtGui import QPolygonF, QPen, QBrush, QColor
+	from PyQt5.QtCore import QPointF, QRectF
+	from AerialWare import _QCustomGraphicsPolygonItem
+
+	class LegacyItem(QGraphicsPolygonItem):
+		"""Square as it was created before: with its own appearance and sides.
+		"""
+		def __init__(self, *args, **kwargs):
+			super().__init__(*args, **kwargs)
+			pen = QPen(QColor(30, 30, 255))
+			pen.setWidth(2)
+			pen.setCosmetic(True)
+			self.setPen(pen)
+			self.checkBrush = QBrush(QColor(130, 130, 255, 100))
+			self.uncheckBrush = QBrush(QColor(0, 0, 0, 0))
+			points = self.polygon()
+			self.left = (points[0] + points[3]) / 2
+			self.right = (points[1] + points[2]) / 2
+			self.top = (points[0] + points[1]) / 2
+			self.bottom = (points[3] + points[2]) / 2
+
+		def setRowCol(self, row, col):
+			self.row = row
+			self.col = col
+
+	app = QApplication([])
+	scene = QGraphicsScene()
+	bounds = QGraphicsRectItem(QRectF(0, 0, size * 10, size * 10))
+	scene.addItem(bounds)
+	itemClass = LegacyItem if legacy else _QCustomGraphicsPolygonItem
+
+	startMemory = rss()
+	tracemalloc.start()
+	start = time.perf_counter()
+	for row in range(size):
+		for col in range(size):
+			x, y = col * 10, row * 10
+			item = itemClass(QPolygonF([QPointF(x, y), QPointF(x + 10, y), QPointF(x + 10, y + 10), QPointF(x, y + 10)]), bounds)
+			item.setRowCol(row, col)
+	elapsed = time.perf_counter() - start
+	python = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	print(elapsed, python, rss() - startMemory)
+
+if __name__ == '__main__':
+	if len(sys.argv) == 3:
+		measure(int(sys.argv[1]), sys.argv[2] == "legacy")
+		sys.exit()
+
+	print(f"{'Cells':>12} {'Mode':>8} {'Time, s':>10} {'Python, MB':>12} {'Total, MB':>12}")
+	for size in (10, 50, 100, 200):
+		for mode in ("legacy", "shared"):
+			output = subprocess.run([sys.executable, __file__, str(size), mode], capture_output=True, text=True, check=True).stdout
+			elapsed, python, total = output.split()
+			print(f"{f'{size}x{size}':>12} {mode:>8} {float(elapsed):10.3f} {int(python) / 2 ** 20:12.1f} {int(total) / 2 ** 20:12.1f}")
@@ -0,0 +1,390 @@
+"""
+Benchmark suite. Drives AerialWareWidget through the offscreen Qt platform on synthetic images with grids from 10x10 to 1000x1000 cells
+and records time and peak memory of every stage. Results are saved as JSON, so versions can be compared.
+
+Every grid is measured in new processes: one measures time, another one measures peak memory allocated by Python and NumPy with tracemalloc.
+Peak RSS is given for the whole process which measures time, because OS only counts it since process start. It's not split by stages.
+Use --program to measure another copy of AerialWare, i.e. older version. Stages are done through the widget and the scene, so they work with the first versions too:
+	- Squares are found on the scene, if there's no planner.
+	- Older scenes can select squares only by clicks, so selectAll selects them the same way clicks do, but draws paths once.
+	- Older versions paint SVG only when saving results, so svg renders the scene to QSvgGenerator the same way.
+	- Older versions make report while saving results, so it's measured by save.
+Stages which older version doesn't have at all (pxToDegArray, report, svgVector) are reported as not supported and aren't compared.
+Grid of 1000x1000 cells takes a few minutes, use --sizes 10 100 for a quick run.
+
+Run from the program directory:
+	python benchmarks/run.py --output new.json
+	python benchmarks/run.py --program ../AerialWare-old --output old.json
+	python benchmarks/run.py --compare old.json new.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+programPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Set in a child process which does the measurements
+CHILD_VARIABLE = "AERIALWARE_BENCHMARK"
+SIZES = (10, 100, 1000)
+# Stages in the order they're done
+STAGES = ("load", "grid", "pxToDeg", "pxToDegArray", "clicks", "selectAll", "stepFour", "save", "report", "svgVector", "svg")
+# Number of clicks on random cells and of points transformed one by one
+CLICKS = 1000
+POINTS = 10000
+# Differences below these are considered noise when comparing
+MIN_TIME = 0.005
+MIN_MEMORY = 1024 * 1024
+
+class _Unsupported(Exception):
+	"""Raised by stages which measured version of AerialWare doesn't have
+	"""
+
+
+def measure(program, size, traceMemory):
+	"""Goes through every stage on grid of size x size cells. Should be run in a new process.
+	Returns:
+		Dict where keys are stages and values are dicts with "time" or "memory" and "error", if stage has failed.
+		Also has "cells" with number of cells and "peakRss" with peak RSS of the process in bytes or None, if it's unknown.
+	"""
+	import io
+	import random
+	import tempfile
+	import traceback
+	import numpy as np
+	os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+	sys.path.insert(0, program)
+	from PyQt5.QtWidgets import QApplication
+	from PyQt5.QtGui import QImage
+	from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer
+	from PyQt5.QtTest import QTest
+	app = QApplication([])
+	import AerialWare
+
+	# Image with a pattern, so it doesn't compress to nothing
+	side = max(800, 2 * size)
+	x = np.arange(side, dtype=np.uint32)
+	pixels = np.ascontiguousarray(((x[:, None] ^ x[None, :]) & 0xff) * 0x010101 | 0xff000000)
+	image = QImage(pixels.data, side, side, QImage.Format_RGB32).copy()
+	# Corners span about 1 degree, so delimiter of 1 / size degree gives about size x size cells
+	corners = ((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05))
+	delimiter = 1 / size
+	temp = tempfile.mkdtemp()
+
+	widget = AerialWare.AerialWareWidget(True)
+	# Older versions load images synchronously
+	cancelLoading = getattr(widget, "cancelImageLoading", lambda: None)
+	cancelLoading()
+	widget.resize(1280, 900)
+	widget.show()
+	app.processEvents()
+	view, scene = widget.Image, widget.scene
+	clicks = []
+
+	# Dialogs would wait for user forever, so they're closed and reported as errors
+	dialogs = []
+	def closeDialogs():
+		dialog = app.activeModalWidget()
+		if dialog != None:
+			dialogs.append(dialog.text() if hasattr(dialog, "text") else dialog.windowTitle())
+			dialog.close()
+	timer = QTimer()
+	timer.timeout.connect(closeDialogs)
+	timer.start(100)
+
+	def load():
+		widget.loadImageFromQImage(image)
+
+	def grid():
+		for name, (long, lat) in zip(("TopLeft", "TopRight", "BottomLeft", "BottomRight"), corners):
+			getattr(widget, "x" + name).setText(str(long))
+			getattr(widget, "y" + name).setText(str(lat))
+		widget.xDelimiter.setText(str(delimiter))
+		widget.yDelimiter.setText(str(delimiter))
+		widget._AerialWareWidget__stepThree()
+
+	def getPolygons():
+		"""Returns dict where keys are (row, col) of squares and values are their points
+		"""
+		planner = getattr(widget, "planner", None)
+		if planner != None:
+			rows, cols = planner.getShape()
+			return {(row, col): planner.getCellPolygon(row, col) for row in range(min(rows, 40)) for col in range(min(cols, 40))}
+		# Older versions have a polygon item for each square
+		return {(item.row, item.col): [(point.x(), point.y()) for point in item.polygon()] for item in getSquareItems()}
+
+	def getSquareItems():
+		return [item for item in scene.items() if isinstance(item, AerialWare._QCustomGraphicsPolygonItem)]
+
+	def prepareClicks():
+		# Clicks go to random cells of the top left block, so cells are big enough to be hit on the screen
+		polygons = getPolygons()
+		block = min(40, max(row for row, col in polygons) + 1, max(col for row, col in polygons) + 1)
+		view.fitInView(QRectF(0, 0, *polygons[(block - 1, block - 1)][2]), Qt.KeepAspectRatio)
+		rnd = random.Random(0)
+		for i in range(CLICKS):
+			polygon = polygons[(rnd.randrange(block), rnd.randrange(block))]
+			center = np.mean(polygon, axis=0)
+			clicks.append(view.mapFromScene(QPointF(*center)))
+
+	def pxToDeg():
+		for i in range(POINTS):
+			widget.pxToDeg(i % side, i * 7 % side)
+
+	def pxToDegArray():
+		if getattr(widget, "planner", None) == None:
+			raise _Unsupported("there's no Planner")
+		widget.planner.pxToDegArray(widget.planner.getGrid())
+
+	def click():
+		for pos in clicks:
+			QTest.mouseClick(view.viewport(), Qt.RightButton, Qt.NoModifier, pos)
+
+	def selectAll():
+		if hasattr(scene, "selectAll"):
+			scene.selectAll()
+			return
+		for item in getSquareItems():
+			if item not in scene.customSelectedItems:
+				scene.customSelectedItems.append(item)
+				item.setBrush(item.checkBrush)
+		scene.drawPaths()
+
+	def stepFour():
+		widget._AerialWareWidget__stepFour()
+		widget.editRes.setText("0.5")
+		widget._AerialWareWidget__calculateResolution()
+		widget.editHeight.setText("1000")
+		widget._AerialWareWidget__calculateFocalLength()
+
+	def save():
+		# Results are taken by getters after "done" is emitted
+		widget._AerialWareWidget__save()
+		for name in dir(widget):
+			if name.startswith("getPath") and name != "getPathArrays":
+				getattr(widget, name)()
+
+	def report():
+		if not hasattr(AerialWare, "writeReport"):
+			raise _Unsupported("report is made by save")
+		AerialWare.writeReport(io.StringIO(), widget.planner, widget.plan, widget.lang)
+
+	def svg(vectorOnly):
+		path = os.path.join(temp, "paths.svg")
+		if hasattr(AerialWare, "_QSvgExporter"):
+			AerialWare._QSvgExporter(path, widget._AerialWareWidget__getSnapshot(), vectorOnly, 2).run()
+			return
+		if vectorOnly:
+			raise _Unsupported("there's no vector export")
+		# The same as older __save() does
+		from PyQt5.QtSvg import QSvgGenerator
+		from PyQt5.QtGui import QPainter
+		rect = scene.sceneRect()
+		generator = QSvgGenerator()
+		generator.setFileName(path)
+		generator.setSize(rect.size().toSize())
+		generator.setViewBox(rect)
+		painter = QPainter(generator)
+		scene.render(painter)
+		painter.end()
+
+	functions = {"load": load, "grid": grid, "pxToDeg": pxToDeg, "pxToDegArray": pxToDegArray, "clicks": click, "selectAll": selectAll,
+		"stepFour": stepFour, "save": save, "report": report, "svgVector": lambda: svg(True), "svg": lambda: svg(False)}
+
+	# These are done before stages and are not measured
+	preparations = {"clicks": prepareClicks}
+
+	if traceMemory:
+		tracemalloc.start()
+	results = {}
+	for stage in STAGES:
+		result = results[stage] = {}
+		try:
+			if stage in preparations:
+				preparations[stage]()
+			if traceMemory:
+				tracemalloc.reset_peak()
+				before = tracemalloc.get_traced_memory()[0]
+			start = time.perf_counter()
+			functions[stage]()
+			app.processEvents()
+			if dialogs:
+				raise RuntimeError(f"Dialog has been shown: {dialogs[0]}")
+		except _Unsupported as e:
+			result["unsupported"] = str(e)
+			continue
+		except Exception:
+			dialogs.clear()
+			result["error"] = traceback.format_exc(limit=2).strip().splitlines()[-1]
+			continue
+		if traceMemory:
+			result["memory"] = tracemalloc.get_traced_memory()[1] - before
+		else:
+			result["time"] = time.perf_counter() - start
+	planner = getattr(widget, "planner", None)
+	results["cells"] = {"count": int(np.prod(planner.getShape())) if planner != None else len(getSquareItems())}
+	cancelLoading()
+	results["peakRss"] = _getPeakRss()
+	return results
+
+def run(program, sizes, repeat):
+	"""Measures every size in new processes.
+	Returns:
+		Results in the format saved to JSON.
+	"""
+	results = {}
+	for size in sizes:
+		name = f"{size}x{size}"
+		print(f"Measuring {name}...", file=sys.stderr, flush=True)
+		# Failed processes are skipped. Stages which haven't been measured by any process are marked as failed.
+		runs = [run for run in (_runChild(program, size, False) for i in range(repeat)) if run != None]
+		memory = _runChild(program, size, True) or {stage: {} for stage in STAGES}
+		stages = results[name] = {"cells": runs[0].pop("cells")["count"] if runs else 0}
+		# Peak RSS of the whole process, not of any stage
+		stages["peakRss"] = max((run.pop("peakRss") or 0 for run in runs), default=0) or None
+		for stage in STAGES:
+			times = [run[stage]["time"] for run in runs if "time" in run[stage]]
+			result = stages[stage] = {}
+			if times:
+				result["time"] = min(times)
+			if "memory" in memory[stage]:
+				result["memory"] = memory[stage]["memory"]
+			errors = [run[stage]["error"] for run in runs + [memory] if "error" in run[stage]]
+			unsupported = [run[stage]["unsupported"] for run in runs + [memory] if "unsupported" in run[stage]]
+			if unsupported:
+				result["unsupported"] = unsupported[0]
+			elif errors:
+				result["error"] = errors[0]
+			elif not result:
+				result["error"] = "Process has failed"
+	return {"info": _getInfo(program, repeat), "results": results}
+
+def compare(old, new, threshold):
+	"""Prints difference between two results.
+	Returns:
+		Number of regressions, i.e. stages which are slower or use more memory by more than threshold.
+	"""
+	regressions = 0
+	print(f"{'Grid':>10} {'Stage':>13} {'Old time, s':>12} {'New time, s':>12} {'Ratio':>6} {'Old mem, MB':>12} {'New mem, MB':>12} {'Ratio':>6}")
+	for name, stages in new["results"].items():
+		oldStages = old["results"].get(name)
+		if oldStages == None:
+			continue
+		for stage in STAGES:
+			oldResult, newResult = oldStages.get(stage, {}), stages.get(stage, {})
+			row = [f"{name:>10}", f"{stage:>13}"]
+			isRegression = False
+			for key, scale, minimum in (("time", 1, MIN_TIME), ("memory", 1024 * 1024, MIN_MEMORY)):
+				oldValue, newValue = oldResult.get(key), newResult.get(key)
+				if oldValue == None or newValue == None:
+					row.append(f"{'-':>12} {'-':>12} {'-':>6}")
+					continue
+				ratio = newValue / oldValue if oldValue else float("inf") if newValue else 1
+				row.append(f"{oldValue / scale:>12.3f} {newValue / scale:>12.3f} {ratio:>6.2f}")
+				isRegression |= newValue - oldValue > minimum and ratio > 1 + threshold
+			regressions += isRegression
+			print(" ".join(row) + (" <- regression" if isRegression else ""))
+	return regressions
+
+def printResults(results):
+	print(f"{'Grid':>10} {'Cells':>8} {'Stage':>13} {'Time, s':>9} {'Memory, MB':>11}")
+	for name, stages in results["results"].items():
+		for stage in STAGES:
+			result = stages[stage]
+			time = f"{result['time']:.3f}" if "time" in result else "-"
+			memory = f"{result['memory'] / 1024 / 1024:.1f}" if "memory" in result else "-"
+			note = ""
+			if "error" in result:
+				note = f"  {result['error']}"
+			elif "unsupported" in result:
+				note = f"  not supported: {result['unsupported']}"
+			print(f"{name:>10} {stages['cells']:>8} {stage:>13} {time:>9} {memory:>11}" + note)
+		if stages.get("peakRss"):
+			print(f"{name:>10} {stages['cells']:>8} {'Peak RSS of process, MB':>35} {stages['peakRss'] / 1024 / 1024:.0f}")
+
+
+def _runChild(program, size, traceMemory):
+	"""Runs measure() in a new process. Returns None, if process has failed. Its errors are printed to stderr.
+	"""
+	env = dict(os.environ, **{CHILD_VARIABLE: json.dumps((program, size, traceMemory))})
+	process = subprocess.run([sys.executable, os.path.abspath(__file__)], env=env, cwd=program, stdout=subprocess.PIPE)
+	if process.returncode != 0:
+		return None
+	return json.loads(process.stdout.decode().splitlines()[-1])
+
+def _getPeakRss():
+	"""Returns peak resident set size of this process in bytes or None, if it's unknown
+	"""
+	try:
+		import resource
+	except ImportError:
+		return None
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux gives kilobytes, macOS gives bytes
+	return rss if sys.platform == "darwin" else rss * 1024
+
+def _getInfo(program, repeat):
+	import numpy
+	from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+	try:
+		commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=program, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout.decode().strip()
+	except OSError:
+		commit = ""
+	return {
+		"date": datetime.datetime.now().isoformat(timespec="seconds"),
+		"program": os.path.abspath(program),
+		"commit": commit,
+		"repeat": repeat,
+		"python": platform.python_version(),
+		"qt": QT_VERSION_STR,
+		"pyqt": PYQT_VERSION_STR,
+		"numpy": numpy.__version__,
+		"platform": platform.platform(),
+		"processor": platform.processor()
+	}
+
+if __name__ == '__main__':
+	if os.environ.get(CHILD_VARIABLE):
+		# AerialWare opens image given in command line, so parameters are passed in environment
+		print(json.dumps(measure(*json.loads(os.environ[CHILD_VARIABLE]))))
+		sys.exit()
+
+	parser = argparse.ArgumentParser(description="Measures time and memory of every stage of AerialWare.")
+	parser.add_argument("--sizes", type=int, nargs="+", help="sizes of grids in cells, 10 100 1000 by default or the same as in old results")
+	parser.add_argument("--repeat", type=int, default=1, help="number of time measurements of each grid, the best one is saved")
+	parser.add_argument("--program", default=programPath, help="directory of AerialWare to measure")
+	parser.add_argument("--output", help="JSON file to save results to")
+	parser.add_argument("--compare", nargs="+", metavar="JSON", help="compare old results with new ones. If only old results are given, new ones are measured.")
+	parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown or memory growth considered as regression, 0.2 by default")
+	args = parser.parse_args()
+
+	if args.compare and len(args.compare) > 2:
+		parser.error("--compare takes old and, optionally, new results")
+	old = None
+	if args.compare:
+		with open(args.compare[0], encoding="utf-8") as file:
+			old = json.load(file)
+
+	if args.compare and len(args.compare) == 2:
+		with open(args.compare[1], encoding="utf-8") as file:
+			results = json.load(file)
+	else:
+		sizes = args.sizes
+		if sizes == None:
+			sizes = [int(name.split("x")[0]) for name in old["results"]] if old != None else SIZES
+		results = run(os.path.abspath(args.program), sizes, args.repeat)
+		printResults(results)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as file:
+			json.dump(results, file, indent="\t")
+
+	if old != None:
+		print()
+		regressions = compare(old, results, args.threshold)
+		print(f"{regressions} regressions")
+		sys.exit(1 if regressions else 0)
@@ -0,0 +1,70 @@
+"""
+Benchmark of startup. Measures cold construction of AerialWareWidget in a new process with and without compiled forms in ui/__pycache__,
+and warm construction of more widgets in the same process. Also measures PyQt5.uic.loadUi() which parses form at runtime.
+
+Run from the program directory:
+	python benchmarks/startup.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+programPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Set in a child process which does the measurements
+CHILD_VARIABLE = "AERIALWARE_STARTUP_BENCHMARK"
+# Number of widgets created in a warm process
+WIDGETS = 20
+
+def measure():
+	"""Creates widgets and returns timings in seconds
+	"""
+	os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+	sys.path.insert(0, programPath)
+	from PyQt5.QtWidgets import QApplication, QWidget
+	from PyQt5.uic import loadUi
+	app = QApplication([])
+
+	t = time.perf_counter()
+	import AerialWare
+	timings = {"import": time.perf_counter() - t}
+
+	widgets = []
+	def create():
+		t = time.perf_counter()
+		widget = AerialWare.AerialWareWidget()
+		elapsed = time.perf_counter() - t
+		widget.cancelImageLoading()
+		widgets.append(widget)
+		return elapsed
+
+	timings["cold"] = create()
+	timings["warm"] = sum(create() for i in range(WIDGETS)) / WIDGETS
+
+	t = time.perf_counter()
+	for i in range(WIDGETS):
+		widgets.append(loadUi(programPath + "/ui/form.ui", QWidget()))
+	timings["loadUi"] = (time.perf_counter() - t) / WIDGETS
+	return timings
+
+def run(clearCache):
+	"""Measures startup in a new process
+	"""
+	if clearCache:
+		shutil.rmtree(os.path.join(programPath, "ui", "__pycache__"), ignore_errors=True)
+	env = dict(os.environ, **{CHILD_VARIABLE: "1"})
+	output = subprocess.run([sys.executable, os.path.abspath(__file__)], env=env, cwd=programPath, stdout=subprocess.PIPE, check=True).stdout
+	return json.loads(output.decode().splitlines()[-1])
+
+if __name__ == '__main__':
+	if os.environ.get(CHILD_VARIABLE):
+		print(json.dumps(measure()))
+		exit()
+
+	print(f"{'Run':>16} {'Import, ms':>11} {'Cold widget, ms':>16} {'Warm widget, ms':>16} {'loadUi(), ms':>13}")
+	for name, clearCache in (("Without cache", True), ("With cache", False)):
+		timings = run(clearCache)
+		print(f"{name:>16} {timings['import'] * 1000:>11.1f} {timings['cold'] * 1000:>16.1f} {timings['warm'] * 1000:>16.1f} {timings['loadUi'] * 1000:>13.1f}")
@@ -0,0 +1,29 @@
+"""
+AerialWare core -- everything that doesn't need Qt.
+Use it to plan flights without GUI, i.e. in batch jobs on servers without displays.
+
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+from .planner import Planner, PlannerError, Plan, getPlanner
+from .transform import CornersTransform, getTransform
+from .geo import lenMeters, lineLengths, pathLengths, HAVERSINE, EQUIRECTANGULAR
+from .selection import Selection
+from .paths import PathRuns
+from .optimizer import PathOptimizer, RouteUpdater, Route, BOUSTROPHEDON, GREEDY, TWO_OPT
+from .imageinfo import getImageSize
+from .languages import Language, LanguageRegistry, getRegistry
@@ -0,0 +1,315 @@
+"""
+AerialWare batch planning
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+Plans many sheets without GUI. Run from the program directory:
+	python -m core.batch manifest.csv output
+
+Manifest is CSV or JSON with one sheet per row or object. Fields:
+	id -- name of directory with results. Number of the sheet by default.
+	image -- path to image relative to the manifest. Only its header is read to find out size of the image.
+	width, height -- size of image in pixels, if there's no image.
+	xTL, yTL, xTR, yTR, xBL, yBL, xBR, yBR -- longitude and latitude of corners. In JSON may be given as "corners": [[xTL, yTL], ...].
+	xD, yD -- delimiters. In JSON may be given as "delimiters": [xD, yD].
+	select -- cells to plan flight over: "all" (default) or rectangles "row1 col1 row2 col2" separated by ";". In JSON may be list of [row1, col1, row2, col2].
+	camRatio -- m/px ratio of camera. 0 by default.
+	flightHeight -- flight height in meters. 0 by default.
+	lengthMethod -- "haversine" (default) or "equirectangular".
+
+For every sheet output/<id>/ will contain report.csv with recommended route from PathOptimizer, paths/ with arrays of paths and the route written by writeColumns() and, if asked, paths.svg.
+output/summary.csv lists every sheet in the order of the manifest with its status, timings and error, if any.
+One bad sheet doesn't stop the others, even if it crashes the worker process.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .planner import Planner, PlannerError
+from .selection import Selection
+from .optimizer import PathOptimizer, BOUSTROPHEDON, GREEDY, TWO_OPT
+from .geo import HAVERSINE
+from .imageinfo import getImageSize
+from .report import writeReport
+from .columns import writeColumns
+from .svg import writeFlightPaths, getImageHref
+from .languages import getRegistry
+
+# Stages of planning of a sheet in the order they're done
+STAGES = ("grid", "paths", "route", "report", "arrays", "svg")
+
+
+class SheetResult():
+	"""Result of planning of one sheet.
+
+	Fields:
+		id -- id of the sheet.
+		error -- text of the error or None, if sheet has been planned.
+		timings -- dict where keys are stages from STAGES and values are time of each stage in seconds. Only finished stages are present.
+	"""
+	def __init__(self, id, error, timings):
+		self.id = id
+		self.error = error
+		self.timings = timings
+
+	def getTotalTime(self):
+		"""Returns time of all finished stages in seconds.
+		"""
+		return sum(self.timings.values())
+
+
+def readManifest(path):
+	"""Reads sheets from CSV or JSON manifest. Values are checked only when sheets are planned, so one bad sheet won't stop the others.
+	Returns:
+		List of dicts with fields of sheets. Every sheet has "id" and paths to images are made absolute.
+	"""
+	with open(path, encoding="utf-8", newline="") as file:
+		if os.path.splitext(path)[1].lower() == ".json":
+			sheets = json.load(file)
+			if isinstance(sheets, dict):
+				sheets = sheets["sheets"]
+		else:
+			sheets = list(csv.DictReader(file))
+
+	directory = os.path.dirname(os.path.abspath(path))
+	for i, sheet in enumerate(sheets):
+		# Empty cells of CSV are the same as missing fields
+		for k in [k for k, v in sheet.items() if v == "" or v == None]:
+			del sheet[k]
+		sheet["id"] = str(sheet.get("id", i + 1))
+		if "image" in sheet:
+			sheet["image"] = os.path.join(directory, sheet["image"])
+	return sheets
+
+def runBatch(sheets, directory, jobs = None, svg = False, langName = "English", precision = 2, optimization = TWO_OPT):
+	"""Plans sheets in parallel and writes results of every sheet to its own directory.
+	Args:
+		sheets -- sheets from readManifest().
+		directory -- output directory.
+		jobs -- number of processes. Number of CPUs by default. If it's 1, sheets are planned in this process.
+			If a process crashes, only the sheet which has crashed it is failed, other sheets are planned again.
+		svg -- whether to write SVG.
+		langName -- name of language of reports.
+		precision -- number of digits after decimal point in SVG.
+		optimization -- method of PathOptimizer which finds recommended route.
+	Yields:
+		SheetResult for every sheet in the same order as sheets.
+	"""
+	os.makedirs(directory, exist_ok=True)
+	args = []
+	ids = set()
+	for sheet in sheets:
+		args.append((sheet, directory, svg, langName, precision, optimization, sheet["id"] in ids))
+		ids.add(sheet["id"])
+
+	if jobs == 1:
+		for arg in args:
+			yield _planSheet(*arg)
+		return
+
+	# When worker process crashes, its pool is broken and every unfinished sheet fails with it.
+	# So unfinished sheets are split in halves and planned again in new pools until the sheet which crashes the worker is alone.
+	groups = [list(range(len(args)))]
+	results = {}
+	nextIndex = 0
+	while groups:
+		group = groups.pop(0)
+		unfinished = []
+		with ProcessPoolExecutor(min(jobs or os.cpu_count() or 1, len(group))) as executor:
+			futures = [(i, executor.submit(_planSheet, *args[i])) for i in group]
+			for i, future in futures:
+				# Worker catches everything, so we get exceptions only if it has crashed
+				try:
+					results[i] = future.result()
+				except BrokenProcessPool as e:
+					if len(group) > 1:
+						unfinished.append(i)
+					else:
+						results[i] = SheetResult(args[i][0]["id"], _describe(e), {})
+				except Exception as e:
+					results[i] = SheetResult(args[i][0]["id"], _describe(e), {})
+				# Results are yielded in the order of sheets as soon as they're ready
+				while nextIndex in results:
+					yield results.pop(nextIndex)
+					nextIndex += 1
+		if unfinished:
+			half = (len(unfinished) + 1) // 2
+			groups[:0] = [unfinished[:half], unfinished[half:]]
+
+def planSheet(sheet, directory, svg = False, lang = None, precision = 2, optimization = TWO_OPT):
+	"""Plans one sheet and writes its results to directory/<id>/.
+	Args:
+		sheet -- sheet from readManifest().
+		lang -- language of the report. English by default.
+		Others are the same as in runBatch().
+	Returns:
+		Dict with time of every finished stage.
+	Raises:
+		PlannerError -- if grid can't be generated or nothing is selected.
+		ValueError, KeyError -- if fields of the sheet are wrong or missing.
+		OSError -- if image can't be read or results can't be written.
+	"""
+	if lang == None:
+		lang = getRegistry().get("English")
+	id = sheet["id"]
+	if id in ("", ".", "..") or os.sep in id or (os.altsep != None and os.altsep in id):
+		raise ValueError(f"Invalid id: {id!r}")
+
+	timings = {}
+	start = time.perf_counter()
+	def finish(stage):
+		nonlocal start
+		now = time.perf_counter()
+		timings[stage] = now - start
+		start = now
+
+	if "image" in sheet:
+		size = getImageSize(sheet["image"])
+		if size == None:
+			raise PlannerError("invalidImage")
+	else:
+		size = (float(sheet["width"]), float(sheet["height"]))
+	# Grids of sheets are different, so caching planners would only keep them in memory of workers
+	planner = Planner(_getCorners(sheet), _getDelimiters(sheet), *size, sheet.get("lengthMethod", HAVERSINE))
+	selection = Selection(*planner.getShape())
+	_select(selection, sheet.get("select", "all"))
+	if len(selection) == 0:
+		raise PlannerError("errEmptySelection")
+	finish("grid")
+
+	plan = planner.plan(selection.getCells(), float(sheet.get("camRatio", 0)), float(sheet.get("flightHeight", 0)))
+	plan.getArrays()
+	finish("paths")
+
+	route = PathOptimizer(planner, optimization).optimize(selection)
+	finish("route")
+
+	sheetDirectory = os.path.join(directory, id)
+	os.makedirs(sheetDirectory, exist_ok=True)
+	with open(os.path.join(sheetDirectory, "report.csv"), "w", encoding="utf-8", newline="") as file:
+		writeReport(file, planner, plan, lang, route)
+	finish("report")
+
+	writeColumns(os.path.join(sheetDirectory, "paths"), plan)
+	writeColumns(os.path.join(sheetDirectory, "paths"), route)
+	finish("arrays")
+
+	if svg:
+		path = os.path.join(sheetDirectory, "paths.svg")
+		with open(path, "w", encoding="utf-8") as file:
+			_writeSvg(file, path, planner, plan, selection, size, sheet.get("image"), precision)
+		finish("svg")
+	return timings
+
+def main(args = None):
+	"""Runs batch planning from command line.
+	Returns:
+		Exit code: 0 if every sheet has been planned, 1 otherwise.
+	"""
+	parser = argparse.ArgumentParser(prog="python -m core.batch", description="Plans flights over many sheets without GUI.")
+	parser.add_argument("manifest", help="CSV or JSON file with sheets")
+	parser.add_argument("output", help="directory for results")
+	parser.add_argument("-j", "--jobs", type=int, default=None, help="number of processes, number of CPUs by default")
+	parser.add_argument("--svg", action="store_true", help="also write SVG with grid and paths")
+	parser.add_argument("--precision", type=int, default=2, help="number of digits after decimal point in SVG")
+	parser.add_argument("--lang", default="English", help="language of reports")
+	parser.add_argument("--optimization", choices=(BOUSTROPHEDON, GREEDY, TWO_OPT), default=TWO_OPT, help="method of finding recommended route, 2-opt by default")
+	args = parser.parse_args(args)
+
+	if args.lang not in getRegistry().getNames():
+		parser.error(f"unknown language {args.lang!r}, available languages: {', '.join(getRegistry().getNames())}")
+	sheets = readManifest(args.manifest)
+	failed = 0
+	os.makedirs(args.output, exist_ok=True)
+	with open(os.path.join(args.output, "summary.csv"), "w", encoding="utf-8", newline="") as file:
+		writer = csv.writer(file, lineterminator="\n")
+		writer.writerow(("id", "status", "total", *STAGES, "error"))
+		for result in runBatch(sheets, args.output, args.jobs, args.svg, args.lang, args.precision, args.optimization):
+			status = "failed" if result.error != None else "ok"
+			failed += result.error != None
+			times = [f"{result.timings[stage]:.3f}" if stage in result.timings else "" for stage in STAGES]
+			writer.writerow((result.id, status, f"{result.getTotalTime():.3f}", *times, result.error or ""))
+			file.flush()
+			print(f"{result.id}: {status} in {result.getTotalTime():.3f} s" + (f" -- {result.error}" if result.error != None else ""), flush=True)
+	print(f"Planned {len(sheets) - failed} of {len(sheets)} sheets")
+	return 1 if failed else 0
+
+
+def _planSheet(sheet, directory, svg, langName, precision, optimization, isDuplicate):
+	"""Runs planSheet() in worker process. Never raises, errors are returned in SheetResult.
+	"""
+	timings = {}
+	try:
+		lang = getRegistry().get(langName)
+		if isDuplicate:
+			raise ValueError(f"Duplicate id: {sheet['id']!r}")
+		timings = planSheet(sheet, directory, svg, lang, precision, optimization)
+		return SheetResult(sheet["id"], None, timings)
+	except PlannerError as e:
+		return SheetResult(sheet["id"], lang.errData.rstrip() + ": " + " ".join(getattr(lang, code, code) for code in e.codes), timings)
+	except Exception as e:
+		return SheetResult(sheet["id"], _describe(e), timings)
+
+def _describe(error):
+	return f"{type(error).__name__}: {error}"
+
+def _getCorners(sheet):
+	if "corners" in sheet:
+		corners = tuple((float(x), float(y)) for x, y in sheet["corners"])
+		if len(corners) != 4:
+			raise ValueError("There should be 4 corners")
+		return corners
+	return tuple((float(sheet["x" + corner]), float(sheet["y" + corner])) for corner in ("TL", "TR", "BL", "BR"))
+
+def _getDelimiters(sheet):
+	if "delimiters" in sheet:
+		xD, yD = sheet["delimiters"]
+		return float(xD), float(yD)
+	return float(sheet["xD"]), float(sheet["yD"])
+
+def _select(selection, rule):
+	"""Selects cells by the rule from manifest
+	"""
+	if isinstance(rule, str):
+		if rule.strip().lower() == "all":
+			selection.selectAll()
+			return
+		rule = [rect.split() for rect in rule.split(";") if rect.strip()]
+	for rect in rule:
+		row1, col1, row2, col2 = (int(value) for value in rect)
+		if min(row1, row2) < 0 or min(col1, col2) < 0 or max(row1, row2) >= selection.rows or max(col1, col2) >= selection.cols:
+			raise ValueError(f"Rectangle {row1} {col1} {row2} {col2} is out of the grid of {selection.rows}x{selection.cols} cells")
+		selection.selectRect(row1, col1, row2, col2)
+
+def _writeSvg(file, path, planner, plan, selection, size, imagePath, precision):
+	"""Writes the same vector SVG as AerialWareWidget does
+	"""
+	image = None
+	if imagePath != None:
+		image = (getImageHref(imagePath, path), *size)
+	# Path by horizontals is path by rows
+	paths = [(plan.getArray(name + "LinesWithTurnsPx"), plan.getArray(name + "IsTurn")) for name in ("horizontal", "meridian")]
+	writeFlightPaths(file, (0, 0, *size), planner.getGrid(), selection.mask, paths, image, precision)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+AerialWare binary export of paths
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import numpy as np
+
+# Names of columns of each array from Plan.getArrays() by the end of the array's name
+_COMPONENTS = {
+	"PointsPx": (("x", "y"),),
+	"PointsDeg": (("long", "lat"),),
+	"LinesPx": (("x1", "y1"), ("x2", "y2")),
+	"LinesDeg": (("long1", "lat1"), ("long2", "lat2")),
+	"LinesWithTurnsPx": (("x1", "y1"), ("x2", "y2")),
+	"LinesWithTurnsDeg": (("long1", "lat1"), ("long2", "lat2")),
+	"Lengths": None,
+	"IsTurn": None
+}
+
+
+def writeColumns(directory, plan):
+	"""Writes paths of the plan or points of the route as columns, one .npy file per column, i.e. "meridianPointsDeg.long.npy" or "routePointsDeg.long.npy".
+	Coordinates and lengths are float64, IsTurn columns are boolean. Read them with readColumns() or numpy.load(path, mmap_mode="r").
+	Args:
+		directory -- directory to write to. Will be created, if needed.
+		plan -- Plan or Route to write.
+	"""
+	os.makedirs(directory, exist_ok=True)
+	for name, column in _iterColumns(plan.getArrays()):
+		np.save(os.path.join(directory, name + ".npy"), np.ascontiguousarray(column))
+
+def readColumns(directory, mmap = True):
+	"""Reads columns written by writeColumns().
+	Args:
+		directory -- directory with columns.
+		mmap -- if True, columns are memory-mapped instead of being read, so you can work with paths bigger than RAM.
+	Returns:
+		Dictionary where keys are names of columns, i.e. "meridianPointsDeg.long", and values are read-only arrays.
+	"""
+	columns = {}
+	for file in sorted(os.listdir(directory)):
+		name, ext = os.path.splitext(file)
+		if ext == ".npy":
+			columns[name] = np.load(os.path.join(directory, file), mmap_mode="r" if mmap else None)
+	return columns
+
+def _iterColumns(arrays):
+	"""Yields (name, column) of every column of given arrays. Columns are views, not copies.
+	"""
+	for name, array in arrays.items():
+		# Names are "meridian" or "horizontal" followed by capitalized kind of array
+		kind = name[next(i for i, char in enumerate(name) if char.isupper()):]
+		components = _COMPONENTS[kind]
+		if components == None:
+			yield name, array
+			continue
+		for point, names in enumerate(components):
+			for axis, component in enumerate(names):
+				yield f"{name}.{component}", array[:, point, axis] if array.ndim == 3 else array[:, axis]
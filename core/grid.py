@@ -0,0 +1,58 @@
+"""
+AerialWare grid generation
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import math
+import numpy as np
+
+
+def getLineCount(size, delimiter1, delimiter2):
+	"""Returns number of grid lines crossing one side of the image.
+	Args:
+		size -- width or height of the image.
+		delimiter1, delimiter2 -- delimiters in pixels at both ends of the lines, i.e. xDTop and xDBottom.
+	"""
+	# Lines are moved until both of their ends go past half of delimiter behind the image.
+	return max(math.floor((size + delimiter1 / 2) / delimiter1), math.floor((size + delimiter2 / 2) / delimiter2)) + 1
+
+def generateGrid(width, height, xDTop, xDBottom, yDLeft, yDRight):
+	"""Generates points of the grid in one pass.
+	Args:
+		width, height -- size of the image in pixels.
+		xDTop, xDBottom, yDLeft, yDRight -- delimiters in pixels at each side of the image. Should be positive.
+	Returns:
+		Array of shape (rows + 1, cols + 1, 2), where [row, col] is (x, y) of a point.
+	"""
+	# Let x1, y1; x2, y2 be vertical line and x3, y3; x4, y4 be horizontal line.
+	# Every vertical line goes from (x1, 0) to (x2, height), every horizontal line goes from (0, y3) to (width, y4).
+	# So we need to find intersections of every vertical line with every horizontal line.
+	cols = np.arange(getLineCount(width, xDTop, xDBottom), dtype=np.float64)
+	rows = np.arange(getLineCount(height, yDLeft, yDRight), dtype=np.float64)[:, None]
+	x1, x2 = cols * xDTop, cols * xDBottom
+	y3, y4 = rows * yDLeft, rows * yDRight
+
+	# Same math as in QLineF.intersect() but for whole lattice at once.
+	# Lines can't be parallel because one of them is always "vertical" and another is always "horizontal".
+	ax = x2 - x1
+	by = y3 - y4
+	na = (by * x1 - width * y3) / (-height * width - ax * by)
+
+	points = np.empty((rows.shape[0], cols.shape[0], 2))
+	points[..., 0] = x1 + ax * na
+	points[..., 1] = height * na
+	return points
@@ -0,0 +1,87 @@
+"""
+AerialWare reading of image headers
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import struct
+
+# JPEG markers which don't have length
+_JPEG_STANDALONE = {0x01, *range(0xD0, 0xDA)}
+# Start of frame markers. C4, C8 and CC are other markers with the same prefix.
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def getImageSize(path):
+	"""Reads size of image from its header without decoding pixels. Supports JPEG, PNG, BMP and GIF.
+	Args:
+		path -- path to image.
+	Returns:
+		(width, height) or None, if format is not supported or header is broken.
+	Raises:
+		OSError -- if file can't be read.
+	"""
+	with open(path, "rb") as file:
+		header = file.read(26)
+		try:
+			if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+				return struct.unpack(">II", header[16:24])
+			if header.startswith((b"GIF87a", b"GIF89a")):
+				return struct.unpack("<HH", header[6:10])
+			if header.startswith(b"BM"):
+				return _getBmpSize(header)
+			if header.startswith(b"\xff\xd8"):
+				file.seek(2)
+				return _getJpegSize(file)
+		except struct.error:
+			pass
+	return None
+
+def _getBmpSize(header):
+	# Old OS/2 header stores size as unsigned shorts, others -- as signed ints
+	if struct.unpack("<I", header[14:18])[0] == 12:
+		return struct.unpack("<HH", header[18:22])
+	width, height = struct.unpack("<ii", header[18:26])
+	# Negative height means that rows are stored from top to bottom
+	return width, abs(height)
+
+def _getJpegSize(file):
+	# Go through segments until start of frame which contains size of the image
+	while True:
+		byte = file.read(1)
+		if byte == b"":
+			return None
+		if byte != b"\xff":
+			continue
+		marker = file.read(1)
+		# Markers may be padded with any number of 0xFF
+		while marker == b"\xff":
+			marker = file.read(1)
+		if marker == b"":
+			return None
+		marker = marker[0]
+		# It's an escaped 0xFF, not a marker
+		if marker == 0 or marker in _JPEG_STANDALONE:
+			continue
+		# Image data starts here, so there's no start of frame
+		if marker == 0xDA:
+			return None
+		length = struct.unpack(">H", file.read(2))[0]
+		if marker in _JPEG_SOF:
+			# Segment starts with precision, then goes height and width
+			height, width = struct.unpack(">xHH", file.read(5))
+			return width, height
+		file.seek(length - 2, 1)
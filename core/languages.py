@@ -0,0 +1,146 @@
+"""
+AerialWare languages
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import ast
+import os
+import threading
+
+# Directory with language files which comes with the program
+LANG_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lang")
+# Name of the file of language which is used for strings missing in other languages
+FALLBACK_FILE = "english.py"
+
+_registries = {}
+_registriesLock = threading.Lock()
+
+
+def getRegistry(directory = LANG_DIRECTORY):
+	"""Returns LanguageRegistry for given directory. Registries are shared by the whole process, so every language file is read only once.
+	"""
+	directory = os.path.abspath(directory)
+	with _registriesLock:
+		registry = _registries.get(directory)
+		if registry == None:
+			registry = _registries[directory] = LanguageRegistry(directory)
+		return registry
+
+
+class Language():
+	"""Frozen table of language strings. Strings are attributes, i.e. lang.lblZoom.
+	Please refer to any default language as an example if you want to make translations.
+
+	Constructor args:
+		strings -- dict of strings, names of strings are keys.
+	"""
+	def __init__(self, strings):
+		self.__dict__.update(strings)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Language is immutable")
+
+	def __delattr__(self, name):
+		raise AttributeError("Language is immutable")
+
+	def __repr__(self):
+		return f"Language({self.name!r})"
+
+
+class LanguageRegistry():
+	"""Finds languages in a directory and loads them on demand. Every language is merged over the fallback language once,
+	so missing strings are taken from the fallback, and switching languages is just taking another Language. Thread-safe.
+	Please use getRegistry() to create it.
+
+	Constructor args:
+		directory -- directory with language files.
+	"""
+	def __init__(self, directory):
+		self.directory = directory
+		self.__lock = threading.RLock()
+		self.__paths = None # Name of language: path to its file
+		self.__languages = {} # Name of language: Language
+
+	def getNames(self):
+		"""Returns names of every language in the directory. Only names are read from files here.
+		"""
+		return list(self.__getPaths())
+
+	def getFallbackName(self):
+		"""Returns name of the fallback language or None, if its file can't be found.
+		"""
+		path = os.path.join(self.directory, FALLBACK_FILE)
+		for name, langPath in self.__getPaths().items():
+			if langPath == path:
+				return name
+		return None
+
+	def get(self, name):
+		"""Returns Language with given name.
+		Raises:
+			KeyError -- if there's no such language.
+		"""
+		lang = self.__languages.get(name)
+		if lang != None:
+			return lang
+
+		with self.__lock:
+			lang = self.__languages.get(name)
+			if lang == None:
+				strings = {}
+				fallback = self.getFallbackName()
+				if fallback != None and fallback != name:
+					strings.update(self.get(fallback).__dict__)
+				strings.update(_readStrings(self.__getPaths()[name]))
+				lang = self.__languages[name] = Language(strings)
+			return lang
+
+	def __getPaths(self):
+		with self.__lock:
+			if self.__paths == None:
+				paths = {}
+				for file in os.listdir(self.directory):
+					path = os.path.join(self.directory, file)
+					if os.path.isfile(path) and os.path.splitext(file)[1] == ".py":
+						paths[_readName(path)] = path
+				self.__paths = paths
+			return self.__paths
+
+
+def _readName(path):
+	"""Returns name of the language in given file without executing whole file. Executes it, if name can't be found otherwise.
+	"""
+	with open(path, encoding="utf-8") as file:
+		for line in file:
+			if not line.startswith("name"):
+				continue
+			try:
+				statement = ast.parse(line).body[0]
+				if statement.targets[0].id == "name":
+					return ast.literal_eval(statement.value)
+			except (SyntaxError, ValueError, AttributeError, IndexError):
+				pass
+	return _readStrings(path)["name"]
+
+def _readStrings(path):
+	"""Executes language file and returns its strings.
+	"""
+	with open(path, encoding="utf-8") as file:
+		code = compile(file.read(), path, "exec")
+	namespace = {}
+	exec(code, namespace)
+	return {k: v for k, v in namespace.items() if k[0] != "_"}
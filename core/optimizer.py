@@ -0,0 +1,416 @@
+"""
+AerialWare optimization of flight paths
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+import numpy as np
+from .geo import lineLengths
+
+# Methods of optimization
+# Runs are flown one by one in order of rows or columns, every second run is flown backwards. The same path as Planner.getPath() gives.
+BOUSTROPHEDON = "boustrophedon"
+# After each run plane flies to the nearest end of a run which hasn't been flown yet.
+GREEDY = "greedy"
+# Shortest of the above is improved by reversing parts of the route while it gets shorter or until time is out.
+TWO_OPT = "2-opt"
+
+
+class Route():
+	"""Route over all runs of one direction. Created by PathOptimizer.
+
+	Fields:
+		useRows -- True if route goes by rows, False if by columns.
+		method -- method which has found the route.
+		pointsPx, pointsDeg -- arrays of shape (n, 2) with points in order of flight. Every even point is start of a run, every odd point is its end.
+		length, lengthWithTurns -- length in meters without and with turns.
+		order -- array with numbers of runs given to PathOptimizer.optimizeRuns() in order of flight.
+		backwards -- boolean array which shows whether each run in order of flight is flown from its end to its start.
+	"""
+	def __init__(self, useRows, method, pointsPx, pointsDeg, length, lengthWithTurns, order, backwards):
+		self.useRows = useRows
+		self.method = method
+		self.pointsPx = pointsPx
+		self.pointsDeg = pointsDeg
+		self.length = length
+		self.lengthWithTurns = lengthWithTurns
+		self.order = order
+		self.backwards = backwards
+
+	def getLines(self, deg = False):
+		"""Returns lines of the route in order of flight: [(p1, p2, isTurn), ...]. Plane flies each line from p1 to p2.
+		Args:
+			deg -- if True, points are in degrees, in pixels otherwise.
+		"""
+		points = (self.pointsDeg if deg else self.pointsPx).tolist()
+		return [(tuple(points[i]), tuple(points[i + 1]), i % 2 == 1) for i in range(len(points) - 1)]
+
+	def getArrays(self):
+		"""Returns points of the route in the same format as Plan.getArrays(), so it can be written by writeColumns().
+		"""
+		return {"routePointsPx": self.pointsPx, "routePointsDeg": self.pointsDeg}
+
+
+class PathOptimizer():
+	"""Finds short routes over selected cells. Picks direction and order of runs, so total length with turns is as short as possible.
+	Route consists of runs -- lines through segments of selected cells of one row or column, see Selection.getSegments() -- and turns between them.
+	Unlike PathRuns, runs are split at unselected cells, so plane doesn't fly over gaps.
+	Found routes are cached by selection, so asking again for the same selection costs nothing. Use RouteUpdater to keep route up to date while cells are being toggled.
+
+	Constructor args:
+		planner -- Planner of the grid.
+		method -- BOUSTROPHEDON, GREEDY or TWO_OPT.
+		timeBudget -- maximum time in seconds for improving route with TWO_OPT for each direction.
+		cacheSize -- maximum number of cached routes.
+	"""
+	def __init__(self, planner, method = TWO_OPT, timeBudget = 0.2, cacheSize = 32):
+		self.planner = planner
+		self.method = method
+		self.timeBudget = timeBudget
+		self.cacheSize = cacheSize
+		self.cache = OrderedDict()
+
+	def optimize(self, selection):
+		"""Finds the shortest route over selected cells by rows or by columns.
+		Args:
+			selection -- Selection of cells.
+		Returns:
+			Route or None, if nothing is selected.
+		"""
+		if len(selection) == 0:
+			return None
+		return _getShortest(self.getRoutes(selection))
+
+	def getRoutes(self, selection):
+		"""Finds route over selected cells by rows and by columns.
+		Args are the same as of optimize().
+		Returns:
+			(route by rows, route by columns)
+		"""
+		key = self.getCacheKey(selection)
+		routes = self.getCached(key)
+		if routes == None:
+			routes = tuple(self.optimizeRuns(self.__getRunLines(selection, useRows), useRows) for useRows in (True, False))
+			self.addToCache(key, routes)
+		return routes
+
+	def getCacheKey(self, selection):
+		"""Returns key of cached routes for given selection. Selection is identified by hash of its mask.
+		"""
+		return (self.method, self.timeBudget, selection.mask.shape, hashlib.blake2b(np.packbits(selection.mask)).digest())
+
+	def getCached(self, key):
+		"""Returns cached (route by rows, route by columns) or None, if there're no routes for given key.
+		Order of each route is given for runs sorted by rows or columns as Selection.getAllSegments() returns them.
+		"""
+		routes = self.cache.get(key)
+		if routes != None:
+			self.cache.move_to_end(key)
+		return routes
+
+	def addToCache(self, key, routes):
+		"""Caches (route by rows, route by columns) found for runs sorted by rows or columns. The least recently used routes are dropped when cache is full.
+		"""
+		self.cache[key] = routes
+		if len(self.cache) > self.cacheSize:
+			self.cache.popitem(last=False)
+
+	def optimizeRuns(self, lines, useRows, start = None):
+		"""Finds order and directions of given runs.
+		Args:
+			lines -- lines of runs in pixels: [(p1, p2), ...] sorted by rows or columns.
+			useRows -- whether runs are in rows or columns. Only stored in the route.
+			start -- (order, backwards) of route which TWO_OPT should improve instead of finding a new one. Lines may be in any order then. Ignored by other methods.
+		Returns:
+			Route
+		"""
+		linesPx = np.array(lines, dtype=np.float64).reshape(-1, 2, 2)
+		linesDeg = self.planner.pxToDegArray(linesPx)
+		if self.method == BOUSTROPHEDON:
+			order, backwards = self.__boustrophedon(len(linesPx))
+		elif self.method == GREEDY:
+			order, backwards = self.__greedy(linesDeg)[1:]
+		elif self.method == TWO_OPT:
+			order, backwards = self.__twoOpt(linesDeg, start)
+		else:
+			raise ValueError(f"Unknown method of optimization: {self.method}")
+		return self.__getRoute(useRows, linesPx, linesDeg, order, backwards)
+
+	def __getRunLines(self, selection, useRows):
+		positions, firsts, lasts = selection.getAllSegments(useRows)
+		return [self.planner.getRunLine(pos, first, last, useRows) for pos, first, last in zip(positions, firsts, lasts)]
+
+	def __getRoute(self, useRows, linesPx, linesDeg, order, backwards):
+		"""Creates Route from order and directions of runs
+		"""
+		def orient(lines):
+			lines = lines[order]
+			lines[backwards] = lines[backwards, ::-1]
+			return lines.reshape(-1, 2)
+
+		pointsPx, pointsDeg = orient(linesPx), orient(linesDeg)
+		lengths = lineLengths(pointsDeg[:-1], pointsDeg[1:], self.planner.lengthMethod)
+		# Runs are summed one by one as in Plan
+		return Route(useRows, self.method, pointsPx, pointsDeg, sum(lengths[::2].tolist()), sum(lengths.tolist()), order, backwards)
+
+	def __distances(self, point, points):
+		"""Returns lengths in meters from point to each of points
+		"""
+		return lineLengths(np.broadcast_to(point, points.shape), points, self.planner.lengthMethod)
+
+	def __turnsLength(self, linesDeg, order, backwards):
+		"""Returns total length of turns of the route
+		"""
+		lines = linesDeg[order]
+		lines[backwards] = lines[backwards, ::-1]
+		return float(lineLengths(lines[:-1, 1], lines[1:, 0], self.planner.lengthMethod).sum())
+
+	def __boustrophedon(self, count):
+		order = np.arange(count)
+		return order, order % 2 == 1
+
+	def __greedy(self, linesDeg, deadline = None):
+		"""Starts from every end of the first and the last runs and returns the shortest of found routes.
+		Args:
+			linesDeg -- lines of runs in degrees.
+			deadline -- time.perf_counter() value after which search is stopped. Routes which haven't been finished by then are dropped.
+		Returns:
+			(length of turns, order, backwards) or None, if no route has been finished before the deadline.
+		"""
+		count = len(linesDeg)
+		if count < 2:
+			return (0.0,) + self.__boustrophedon(count)
+		best = None
+		for first in (0, count - 1):
+			for firstBackwards in (False, True):
+				if deadline != None and time.perf_counter() >= deadline:
+					return best
+				order = np.empty(count, dtype=np.intp)
+				backwards = np.zeros(count, dtype=bool)
+				left = np.ones(count, dtype=bool)
+				order[0], backwards[0], left[first] = first, firstBackwards, False
+				point = linesDeg[first, 0 if firstBackwards else 1]
+				for k in range(1, count):
+					if deadline != None and time.perf_counter() >= deadline:
+						return best
+					indices = np.flatnonzero(left)
+					# Distances to both ends of every run which is left
+					distances = self.__distances(point, linesDeg[indices].reshape(-1, 2))
+					nearest = int(np.argmin(distances))
+					run, isBackwards = int(indices[nearest // 2]), nearest % 2 == 1
+					order[k], backwards[k], left[run] = run, isBackwards, False
+					point = linesDeg[run, 0 if isBackwards else 1]
+				length = self.__turnsLength(linesDeg, order, backwards)
+				if best == None or length < best[0]:
+					best = (length, order, backwards)
+		return best
+
+	def __twoOpt(self, linesDeg, start):
+		"""Improves given route or the shortest of boustrophedon and greedy routes.
+		Reversing part of the route from run i to run j also reverses direction of each run in it, so only turns at the ends of the part are changed.
+		Time budget covers search of greedy route too. If greedy route can't be found in time, boustrophedon is used.
+		"""
+		deadline = time.perf_counter() + self.timeBudget
+		count = len(linesDeg)
+		if start == None:
+			start = self.__boustrophedon(count)
+			greedy = self.__greedy(linesDeg, deadline)
+			if greedy != None and greedy[0] < self.__turnsLength(linesDeg, *start):
+				start = greedy[1:]
+		order, backwards = np.array(start[0], dtype=np.intp), np.array(start[1], dtype=bool)
+		if count < 2:
+			return order, backwards
+
+		method = self.planner.lengthMethod
+		def getEnds():
+			lines = linesDeg[order]
+			lines[backwards] = lines[backwards, ::-1]
+			return lines[:, 0].copy(), lines[:, 1].copy()
+		starts, ends = getEnds()
+
+		improved = True
+		while improved and time.perf_counter() < deadline:
+			improved = False
+			for i in range(count):
+				j = np.arange(i, count)
+				# Turn into the part: from end of run i - 1 to start of run i becomes turn to end of run j
+				delta = np.zeros(len(j))
+				if i > 0:
+					delta += lineLengths(np.broadcast_to(ends[i - 1], (len(j), 2)), ends[j], method) - lineLengths(ends[i - 1], starts[i], method)
+				# Turn out of the part: from end of run j to start of run j + 1 becomes turn from start of run i
+				inner = j[j < count - 1]
+				delta[:len(inner)] += lineLengths(np.broadcast_to(starts[i], (len(inner), 2)), starts[inner + 1], method) - lineLengths(ends[inner], starts[inner + 1], method)
+				best = int(np.argmin(delta))
+				# Ignore changes which are smaller than errors of floating point numbers
+				if delta[best] < -1e-6:
+					last = i + best
+					order[i:last + 1] = order[i:last + 1][::-1]
+					backwards[i:last + 1] = ~backwards[i:last + 1][::-1]
+					starts, ends = getEnds()
+					improved = True
+				if time.perf_counter() >= deadline:
+					break
+		return order, backwards
+
+
+class RouteUpdater():
+	"""Keeps routes over selected cells up to date while cells are being toggled one by one.
+	When cell is toggled, only segments of its row and column are recalculated. Removed runs are cut out of the routes and new runs are inserted where they add the least length,
+	so TWO_OPT only improves previous routes instead of finding new ones. After reset() it improves boustrophedon. Other methods find routes from scratch.
+	Routes are looked up in and added to the cache of PathOptimizer, so toggling a cell back costs nothing.
+	Not thread-safe: call update() and optimize() from the same thread which changes the selection.
+
+	Constructor args:
+		optimizer -- PathOptimizer which finds routes.
+		selection -- Selection of cells.
+	"""
+	def __init__(self, optimizer, selection):
+		self.optimizer = optimizer
+		self.selection = selection
+		self.reset()
+
+	def reset(self):
+		"""Finds routes from scratch on next call of optimize(). Call it after bulk changes of the selection.
+		"""
+		self.segments = {} # (pos, useRows): runs of that row or column. Each run is (pos, first, last, useRows).
+		for useRows in (True, False):
+			for pos, first, last in zip(*self.selection.getAllSegments(useRows)):
+				self.segments.setdefault((pos, useRows), []).append((pos, first, last, useRows))
+		# Routes are built on first call of optimize(), there's no need to update them before
+		self.lines = {} # Run: its line in pixels and in degrees
+		self.runs = {True: [], False: []} # useRows: runs in order of flight
+		self.backwards = {True: [], False: []} # useRows: whether each run in order of flight is flown backwards
+		self.isReset = True
+		self.routes = None
+
+	def update(self, row, col):
+		"""Updates runs after given cell has been toggled in the selection. Routes are found on next call of optimize().
+		"""
+		for pos, useRows in ((row, True), (col, False)):
+			oldRuns = self.segments.pop((pos, useRows), [])
+			newRuns = [(pos, first, last, useRows) for first, last in self.selection.getSegments(pos, useRows)]
+			if newRuns:
+				self.segments[(pos, useRows)] = newRuns
+			if self.isReset:
+				continue
+			for run in set(oldRuns) - set(newRuns):
+				k = self.runs[useRows].index(run)
+				del self.runs[useRows][k], self.backwards[useRows][k], self.lines[run]
+			added = [run for run in newRuns if run not in oldRuns]
+			self.__addLines(added)
+			for run in added:
+				self.__insert(run)
+		self.routes = None
+
+	def optimize(self):
+		"""Returns the shortest route over selected cells or None, if nothing is selected. Routes are found only if the selection has been changed.
+		"""
+		if len(self.selection) == 0:
+			return None
+		if self.routes == None:
+			key = self.optimizer.getCacheKey(self.selection)
+			routes = self.optimizer.getCached(key)
+			if routes == None:
+				routes = tuple(self.__getRoute(useRows) for useRows in (True, False))
+				self.optimizer.addToCache(key, routes)
+			else:
+				for route in routes:
+					self.__setRoute(self.__getRuns(route.useRows), route)
+			self.routes = routes
+			self.isReset = False
+		return _getShortest(self.routes)
+
+	def __getRuns(self, useRows):
+		"""Returns runs of given direction sorted by rows or columns, so routes can be cached
+		"""
+		return sorted(run for key in self.segments if key[1] == useRows for run in self.segments[key])
+
+	def __getRoute(self, useRows):
+		runs = self.__getRuns(useRows)
+		start = None
+		if self.optimizer.method == TWO_OPT:
+			if self.isReset:
+				# Greedy route would take too long on big selections, so boustrophedon is improved instead
+				order = np.arange(len(runs))
+				start = (order, order % 2 == 1)
+			else:
+				index = {run: i for i, run in enumerate(runs)}
+				start = ([index[run] for run in self.runs[useRows]], self.backwards[useRows])
+		self.__addLines([run for run in runs if run not in self.lines])
+		route = self.optimizer.optimizeRuns([self.lines[run][0] for run in runs], useRows, start)
+		self.__setRoute(runs, route)
+		return route
+
+	def __setRoute(self, runs, route):
+		"""Makes given route current one, so next updates change it
+		Args:
+			runs -- runs of the route sorted by rows or columns.
+			route -- Route found for these runs.
+		"""
+		self.__addLines([run for run in runs if run not in self.lines])
+		self.runs[route.useRows] = [runs[i] for i in route.order.tolist()]
+		self.backwards[route.useRows] = route.backwards.tolist()
+
+	def __addLines(self, runs):
+		"""Finds lines of given runs in pixels and degrees
+		"""
+		if not runs:
+			return
+		planner = self.optimizer.planner
+		linesPx = [planner.getRunLine(pos, first, last, useRows) for pos, first, last, useRows in runs]
+		linesDeg = planner.pxToDegArray(np.array(linesPx, dtype=np.float64)).tolist()
+		for run, linePx, lineDeg in zip(runs, linesPx, linesDeg):
+			self.lines[run] = (linePx, lineDeg)
+
+	def __insert(self, run):
+		"""Inserts run into the route of its direction where it adds the least length
+		"""
+		useRows = run[3]
+		runs, backwards = self.runs[useRows], self.backwards[useRows]
+		line = np.array(self.lines[run][1])
+		if not runs:
+			runs.append(run)
+			backwards.append(False)
+			return
+		lines = np.array([self.lines[other][1] for other in runs])
+		isBackwards = np.array(backwards, dtype=bool)
+		lines[isBackwards] = lines[isBackwards, ::-1]
+		starts, ends = lines[:, 0], lines[:, 1]
+		method = self.optimizer.planner.lengthMethod
+
+		# Run is inserted before k-th run, so turn from end of run k - 1 to start of run k is replaced with turns into and out of the new run
+		old = np.zeros(len(runs) + 1)
+		old[1:-1] = lineLengths(ends[:-1], starts[1:], method)
+		best = None
+		for reverse in (False, True):
+			start, end = line[::-1] if reverse else line
+			added = np.zeros(len(runs) + 1)
+			added[1:] += lineLengths(ends, start, method)
+			added[:-1] += lineLengths(end, starts, method)
+			k = int(np.argmin(added - old))
+			if best == None or added[k] - old[k] < best[0]:
+				best = (added[k] - old[k], k, reverse)
+		runs.insert(best[1], run)
+		backwards.insert(best[1], best[2])
+
+
+def _getShortest(routes):
+	"""Returns route with the least length with turns
+	"""
+	return min(routes, key=lambda route: route.lengthWithTurns)
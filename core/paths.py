@@ -0,0 +1,104 @@
+"""
+AerialWare incremental flight paths
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+from bisect import bisect_left
+
+# Kinds of changes returned by PathRuns.update()
+RUN_CHANGED = "changed"
+RUN_ADDED = "added"
+RUN_REMOVED = "removed"
+
+
+class PathRuns():
+	"""Keeps one flight path up to date while cells are being selected one by one. Gives the same lines as Planner.getPath().
+	Path consists of runs -- lines through selected cells of one row or column -- and turns between neighbouring runs.
+	When cell is toggled, only its run is recalculated. Turn k goes from run k - 1 to run k and its ends depend on whether k is odd or even,
+	so when run is added or removed, all turns after it should be updated too.
+
+	Constructor args:
+		planner -- Planner which generates lines.
+		selection -- Selection of cells to go through.
+		useRows:
+			True -- go by rows
+			False -- go by cols
+	"""
+	def __init__(self, planner, selection, useRows):
+		self.planner = planner
+		self.selection = selection
+		self.useRows = useRows
+		self.reset()
+
+	def reset(self):
+		"""Rebuilds whole path from the selection. Call it after bulk changes of the selection.
+		"""
+		positions, firsts, lasts = self.selection.getRanges(self.useRows)
+		self.positions = positions # Sorted numbers of rows or cols which have selected cells
+		self.bounds = dict(zip(positions, zip(firsts, lasts))) # Number of row or col: numbers of its first and last selected cells
+		self.lines = [self.__getLine(pos) for pos in positions] # Line of each run in the same order as positions
+
+	def update(self, row, col):
+		"""Updates path after given cell has been toggled in the selection.
+		Returns:
+			(k, kind) -- number of changed run and kind of change: RUN_CHANGED, RUN_ADDED or RUN_REMOVED. None, if path hasn't been changed.
+		"""
+		pos = row if self.useRows else col
+		bounds = self.selection.getRange(pos, self.useRows)
+		oldBounds = self.bounds.get(pos)
+		# I.e. when cell in the middle of a run has been toggled
+		if bounds == oldBounds:
+			return None
+
+		k = bisect_left(self.positions, pos)
+		if bounds == None:
+			del self.bounds[pos]
+			self.positions.pop(k)
+			self.lines.pop(k)
+			return k, RUN_REMOVED
+
+		self.bounds[pos] = bounds
+		if oldBounds == None:
+			self.positions.insert(k, pos)
+			self.lines.insert(k, self.__getLine(pos))
+			return k, RUN_ADDED
+
+		self.lines[k] = self.__getLine(pos)
+		return k, RUN_CHANGED
+
+	def getTurn(self, k):
+		"""Returns turn from run k - 1 to run k.
+		"""
+		prevLine, line = self.lines[k - 1], self.lines[k]
+		# Odd turns connect ends of runs, even turns connect their starts
+		if k % 2:
+			return prevLine[1], line[1]
+		return prevLine[0], line[0]
+
+	def getLines(self):
+		"""Returns lines in the same format and order as Planner.getPath() does.
+		"""
+		lines = []
+		for k in range(len(self.lines)):
+			lines.append((*self.lines[k], False))
+			if k > 0:
+				lines.append((*self.getTurn(k), True))
+		return lines
+
+	def __getLine(self, pos):
+		first, last = self.bounds[pos]
+		return self.planner.getRunLine(pos, first, last, self.useRows)
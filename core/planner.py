@@ -0,0 +1,533 @@
+"""
+AerialWare planning core
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import math
+from functools import lru_cache
+import numpy as np
+from .grid import generateGrid
+from .transform import getTransform
+from .geo import lineLengths, HAVERSINE
+from .imageinfo import getImageSize
+
+# Number of cells processed at once by Planner.getMaxArea()
+_CHUNK_SIZE = 65536
+# Kinds of arrays of each path in Plan
+_ARRAYS = ("PointsPx", "PointsDeg", "LinesPx", "LinesDeg", "LinesWithTurnsPx", "LinesWithTurnsDeg", "Lengths", "IsTurn")
+
+
+def getPlanner(corners, delimiters, width, height, lengthMethod = HAVERSINE):
+	"""Returns Planner for given data. Planners are cached, so grid for the same data is generated only once.
+	Cached planners are shared, so don't modify them.
+	Args and exceptions are the same as Planner's.
+	"""
+	corners = tuple((x, y) for x, y in corners)
+	return _getPlanner(corners, tuple(delimiters), width, height, lengthMethod)
+
+@lru_cache(maxsize=8)
+def _getPlanner(corners, delimiters, width, height, lengthMethod):
+	return Planner(corners, delimiters, width, height, lengthMethod)
+
+
+class PlannerError(Exception):
+	"""Raised when planner can't work with given data.
+
+	Fields:
+		codes -- names of language strings describing the error. First one is the error itself, others are details, if any.
+	"""
+	def __init__(self, *codes):
+		super().__init__(", ".join(codes))
+		self.codes = list(codes)
+
+
+class _View():
+	"""Field of Plan which is derived from its arrays on first access and then cached.
+	"""
+	def __init__(self, derive):
+		self.derive = derive
+
+	def __set_name__(self, owner, name):
+		self.name = name
+
+	def __get__(self, plan, owner = None):
+		if plan == None:
+			return self
+		value = self.derive(plan)
+		# Instance dictionary takes precedence over this descriptor, so next time cached value will be returned right away
+		plan.__dict__[self.name] = value
+		return value
+
+
+class Plan():
+	"""Results of planning. Created by Planner.plan(). Plan is immutable.
+	Only selected cells are stored. Paths and everything else are calculated on first access and cached, so you pay only for what you use.
+	Points are tuples (x, y) in pixels or (long, lat) in degrees. Lines are tuples of two points.
+	The same data is available as NumPy arrays, check getArrays().
+
+	Fields:
+		meridianPointsPx, meridianPointsDeg -- points of path by meridians sorted as a plane should fly.
+		meridianLinesPx, meridianLinesDeg -- lines of path by meridians without turns.
+		meridianLinesWithTurnsPx, meridianLinesWithTurnsDeg -- lines of path by meridians with turns.
+		lenMeridian, lenMeridianWithTurns -- lengths of path by meridians in meters.
+		horizontal... -- the same for path by horizontals.
+		maxHorizontal, maxVertical -- maximum area in meters to be captured.
+		camRatio, camWidth, camHeight, flightHeight, focalLength -- aerial parameters.
+
+	Constructor args:
+		planner -- Planner which creates the plan.
+		cells -- (row, col) of selected cells.
+		camRatio -- m/px ratio of camera.
+		flightHeight -- flight height in meters.
+	"""
+	def __init__(self, planner, cells, camRatio, flightHeight):
+		setField = super().__setattr__
+		setField("planner", planner)
+		setField("cells", tuple(map(tuple, cells)))
+		setField("camRatio", camRatio)
+		setField("flightHeight", flightHeight)
+		setField("_Plan__arrays", {})
+
+	def __setattr__(self, name, value):
+		raise AttributeError("Plan is immutable")
+
+	def __delattr__(self, name):
+		raise AttributeError("Plan is immutable")
+
+	meridianPointsPx = _View(lambda plan: _points(plan.getArray("meridianPointsPx")))
+	meridianPointsDeg = _View(lambda plan: _points(plan.getArray("meridianPointsDeg")))
+	meridianLinesPx = _View(lambda plan: _lines(plan.getArray("meridianLinesPx")))
+	meridianLinesDeg = _View(lambda plan: _lines(plan.getArray("meridianLinesDeg")))
+	meridianLinesWithTurnsPx = _View(lambda plan: _lines(plan.getArray("meridianLinesWithTurnsPx")))
+	meridianLinesWithTurnsDeg = _View(lambda plan: _lines(plan.getArray("meridianLinesWithTurnsDeg")))
+	lenMeridian = _View(lambda plan: plan.__getLength("meridian", False))
+	lenMeridianWithTurns = _View(lambda plan: plan.__getLength("meridian", True))
+
+	horizontalPointsPx = _View(lambda plan: _points(plan.getArray("horizontalPointsPx")))
+	horizontalPointsDeg = _View(lambda plan: _points(plan.getArray("horizontalPointsDeg")))
+	horizontalLinesPx = _View(lambda plan: _lines(plan.getArray("horizontalLinesPx")))
+	horizontalLinesDeg = _View(lambda plan: _lines(plan.getArray("horizontalLinesDeg")))
+	horizontalLinesWithTurnsPx = _View(lambda plan: _lines(plan.getArray("horizontalLinesWithTurnsPx")))
+	horizontalLinesWithTurnsDeg = _View(lambda plan: _lines(plan.getArray("horizontalLinesWithTurnsDeg")))
+	lenHorizontal = _View(lambda plan: plan.__getLength("horizontal", False))
+	lenHorizontalWithTurns = _View(lambda plan: plan.__getLength("horizontal", True))
+
+	maxHorizontal = _View(lambda plan: plan.maxArea[0])
+	maxVertical = _View(lambda plan: plan.maxArea[1])
+	maxArea = _View(lambda plan: plan.planner.getMaxArea(plan.cells))
+	camWidth = _View(lambda plan: plan.camResolution[0])
+	camHeight = _View(lambda plan: plan.camResolution[1])
+	camResolution = _View(lambda plan: Planner.getCameraResolution(plan.maxHorizontal, plan.maxVertical, plan.camRatio))
+	focalLength = _View(lambda plan: Planner.getFocalLength(plan.flightHeight, plan.camRatio))
+
+	def getArray(self, name):
+		"""Returns read-only NumPy array of one of the paths without copying it. Check getArrays() for names of arrays.
+		"""
+		array = self.__arrays.get(name)
+		if array is None:
+			if name.startswith("meridian"):
+				path, kind = "meridian", name[len("meridian"):]
+			elif name.startswith("horizontal"):
+				path, kind = "horizontal", name[len("horizontal"):]
+			else:
+				raise KeyError(name)
+			array = self.__deriveArray(path, kind)
+			array.flags.writeable = False
+			self.__arrays[name] = array
+		return array
+
+	def getArrays(self):
+		"""Returns read-only NumPy arrays of both paths. Arrays are not copied.
+		Returns:
+			Dictionary where keys are "meridian" or "horizontal" followed by:
+				PointsPx, PointsDeg -- arrays of shape (n, 2) with points sorted as a plane should fly.
+				LinesPx, LinesDeg -- arrays of shape (n, 2, 2) with lines without turns.
+				LinesWithTurnsPx, LinesWithTurnsDeg -- arrays of shape (n, 2, 2) with lines with turns.
+				Lengths -- array of shape (n) with lengths in meters of lines with turns.
+				IsTurn -- boolean array of shape (n) showing which of lines with turns are turns.
+		"""
+		return {path + kind: self.getArray(path + kind) for path in ("meridian", "horizontal") for kind in _ARRAYS}
+
+	def __deriveArray(self, path, kind):
+		"""Calculates array from other arrays of the same path
+		"""
+		def get(kind):
+			return self.getArray(path + kind)
+
+		if kind in ("LinesWithTurnsPx", "IsTurn"):
+			# Path by meridians goes by columns
+			lines = self.planner.getPath(self.cells, path == "horizontal")
+			isTurn = np.array([isTurn for p1, p2, isTurn in lines], dtype=bool)
+			isTurn.flags.writeable = False
+			self.__arrays[path + "IsTurn"] = isTurn
+			if kind == "IsTurn":
+				return isTurn
+			return np.array([(p1, p2) for p1, p2, isTurn in lines], dtype=np.float64).reshape(-1, 2, 2)
+		if kind == "LinesWithTurnsDeg":
+			return self.planner.pxToDegArray(get("LinesWithTurnsPx"))
+		if kind == "Lengths":
+			lines = get("LinesWithTurnsDeg")
+			return lineLengths(lines[:, 0], lines[:, 1], self.planner.lengthMethod)
+		if kind in ("LinesPx", "LinesDeg"):
+			return get(kind.replace("Lines", "LinesWithTurns"))[~get("IsTurn")]
+		if kind in ("PointsPx", "PointsDeg"):
+			# Plane flies every second line backwards
+			points = get(kind.replace("Points", "Lines")).copy()
+			points[1::2] = points[1::2, ::-1]
+			return points.reshape(-1, 2)
+		raise KeyError(path + kind)
+
+	def __getLength(self, path, withTurns):
+		"""Returns length of path. Lines are summed one by one, so results don't depend on NumPy summation order.
+		"""
+		lengths = self.getArray(path + "Lengths")
+		if not withTurns:
+			lengths = lengths[~self.getArray(path + "IsTurn")]
+		return sum(lengths.tolist())
+
+
+class Planner():
+	"""Qt-free core of AerialWare. Generates grid and flight paths and does all the calculations.
+	AerialWareWidget is just a client of this class, so you can use it to plan flights without GUI.
+
+	Constructor args:
+		corners -- longitude and latitude of image corners: ((xTL, yTL), (xTR, yTR), (xBL, yBL), (xBR, yBR)).
+		delimiters -- longitude and latitude delimiters of grid: (xD, yD).
+		width, height -- size of image in pixels.
+		lengthMethod -- how to calculate lengths: geo.HAVERSINE or faster geo.EQUIRECTANGULAR. Check geo module to find out precision of the latter.
+	Raises:
+		PlannerError -- if grid can't be generated from given data.
+	"""
+	def __init__(self, corners, delimiters, width, height, lengthMethod = HAVERSINE):
+		self.lengthMethod = lengthMethod
+		(self.xTL, self.yTL), (self.xTR, self.yTR), (self.xBL, self.yBL), (self.xBR, self.yBR) = corners
+		self.xD, self.yD = delimiters
+		self.width, self.height = width, height
+
+		# Convert delimiters to pixels.
+		# Value of another coordinate doesn't matter.
+		# If you'll draw a random line and draw crossing lines parallel to one of axes with same distance between these lines by another axis, you'll split your random line into equal pieces.
+		# See for yourself:
+		# Y
+		# ^ ___\_____
+		# | ____\____
+		# | _____\___
+		# |       \
+		# |-----------> X
+		# You can try it on paper or prove this "theorem" doing some math.
+		try:
+			self.xDTop = self.width / abs(self.xTL - self.xTR) * self.xD
+			self.xDBottom = self.width / abs(self.xBL - self.xBR) * self.xD
+			self.yDLeft = self.height / abs(self.yTL - self.yBL) * self.yD
+			self.yDRight = self.height / abs(self.yTR - self.yBR) * self.yD
+		except ZeroDivisionError:
+			raise PlannerError("errCorners")
+
+		errors = []
+		if self.xDTop > self.width:
+			errors.append("errLongTop")
+		if self.xDBottom > self.width:
+			errors.append("errLongBottom")
+		if self.yDLeft > self.height:
+			errors.append("errLatLeft")
+		if self.yDRight > self.height:
+			errors.append("errLatRight")
+
+		if errors:
+			raise PlannerError("errSides", *errors)
+
+		# Grid lines would never move otherwise
+		if self.xD <= 0 or self.yD <= 0:
+			raise PlannerError("errPoints")
+
+		self.points = generateGrid(self.width, self.height, self.xDTop, self.xDBottom, self.yDLeft, self.yDRight)
+		# If nothing has been added
+		if self.points.size == 0:
+			raise PlannerError("errPoints")
+		self.rows = self.points.shape[0] - 1
+		self.cols = self.points.shape[1] - 1
+
+		# Coefficients for transforming coordinates are calculated only once
+		self.transform = getTransform(corners, self.width, self.height)
+
+	@classmethod
+	def fromImage(cls, path, corners, delimiters, lengthMethod = HAVERSINE):
+		"""Creates planner for image file. Only header of the image is read, so it's fast even for huge images.
+		Args:
+			path -- path to JPEG, PNG, BMP or GIF image. Use constructor with size of image for other formats.
+			Others are the same as constructor's.
+		Raises:
+			PlannerError -- if size of image can't be read or grid can't be generated from given data.
+			OSError -- if file can't be read.
+		"""
+		size = getImageSize(path)
+		if size == None:
+			raise PlannerError("invalidImage")
+		return cls(corners, delimiters, *size, lengthMethod)
+
+	def isEightShaped(self):
+		"""Checks if given coordinates form 8-shaped figure. You may get wrong results in this case.
+		"""
+		return (self.xTL > self.xTR and self.xBL < self.xBR) or (self.xTL < self.xTR and self.xBL > self.xBR) or (self.yTL > self.yBL and self.yTR < self.yBR) or (self.yTL < self.yBL and self.yTR > self.yTL)
+
+	def getGrid(self):
+		"""Returns points of the grid in pixels as array of shape (rows + 1, cols + 1, 2), where [row, col] is (x, y) of a point.
+		"""
+		return self.points
+
+	def getShape(self):
+		"""Returns number of rows and columns of cells in the grid.
+		"""
+		return self.rows, self.cols
+
+	def getCellAt(self, x, y):
+		"""Finds cell which contains given point.
+		Grid is a lattice of straight lines, so we don't need to check every cell. We just find between which lines point lies.
+		Args:
+			x, y -- coordinates of point in pixels.
+		Returns:
+			(row, col) of found cell or None, if point is outside of the grid.
+		"""
+		indices = self.__getLineIndices(x, y)
+		if indices == None:
+			return None
+		row, col = math.floor(indices[0]), math.floor(indices[1])
+		if 0 <= row < self.rows and 0 <= col < self.cols:
+			return row, col
+		return None
+
+	def getCellRange(self, left, top, right, bottom):
+		"""Finds cells which may intersect given rectangle.
+		Args:
+			left, top, right, bottom -- sides of rectangle in pixels.
+		Returns:
+			(row1, col1, row2, col2) -- cells from row1 to row2 and from col1 to col2, excluding the last ones.
+		"""
+		corners = [self.__getLineIndices(x, y) for x, y in ((left, top), (right, top), (left, bottom), (right, bottom))]
+		if None in corners:
+			return 0, 0, self.rows, self.cols
+		# Numbers of lines change monotonically, so the lines nearest to the rectangle are at its corners
+		rows = [corner[0] for corner in corners]
+		cols = [corner[1] for corner in corners]
+		return (
+			min(max(math.floor(min(rows)), 0), self.rows),
+			min(max(math.floor(min(cols)), 0), self.cols),
+			min(max(math.floor(max(rows)) + 1, 0), self.rows),
+			min(max(math.floor(max(cols)) + 1, 0), self.cols)
+		)
+
+	def __getLineIndices(self, x, y):
+		"""Returns (row, col) -- numbers of horizontal and vertical lines of the grid going through given point. Numbers are fractional.
+		Returns None if there's no such lines, i.e. if lines cross each other before given point.
+		"""
+		# Vertical line number i goes from (i * xDTop, 0) to (i * xDBottom, height). At given y it's at x = i * (distance between lines at y).
+		# So i = x / (distance between lines at y). Same for horizontal lines.
+		xStep = self.xDTop + (self.xDBottom - self.xDTop) * y / self.height
+		yStep = self.yDLeft + (self.yDRight - self.yDLeft) * x / self.width
+		if xStep <= 0 or yStep <= 0:
+			return None
+		return y / yStep, x / xStep
+
+	def getCellPolygon(self, row, col):
+		"""Returns points of cell in following order: top left, top right, bottom right, bottom left.
+		"""
+		(tl, tr), (bl, br) = self.points[row:row + 2, col:col + 2].tolist()
+		return [tl, tr, br, bl]
+
+	def getCellSides(self, row, col):
+		"""Returns dictionary of centers of cell's sides.
+		"""
+		left, right, top, bottom = self.__getSides(row, col)
+		return {
+			"left": left,
+			"right": right,
+			"top": top,
+			"bottom": bottom
+		}
+
+	def __getSides(self, row, col):
+		"""Returns centers of cell's sides: left, right, top, bottom.
+		"""
+		tl, tr, br, bl = self.getCellPolygon(row, col)
+		return _middle(tl, bl), _middle(tr, br), _middle(tl, tr), _middle(bl, br)
+
+	def getRunLine(self, pos, first, last, useRows):
+		"""Returns line through selected cells of one row or column: from the side of the first cell to the opposite side of the last cell.
+		Args:
+			pos -- number of row or column.
+			first, last -- numbers of the first and the last selected cells in it.
+			useRows -- True if pos is a row, False if it's a column.
+		"""
+		if useRows:
+			return self.__getSides(pos, first)[0], self.__getSides(pos, last)[1]
+		return self.__getSides(first, pos)[2], self.__getSides(last, pos)[3]
+
+	def getPath(self, cells, useRows):
+		"""Generates one flight path
+		Args:
+			cells -- (row, col) of selected cells.
+			useRows:
+				True -- go by rows
+				False -- go by cols
+		Returns:
+			List of lines in pixels: [(p1, p2, isTurn), ...]. Each turn follows the line it leads to.
+		"""
+		if useRows:
+			way, sortFirst = 0, 1
+			oldSide, newSide = 0, 1 # Left, right
+		else:
+			way, sortFirst = 1, 0
+			oldSide, newSide = 2, 3 # Top, bottom
+
+		cells = sorted(cells, key=lambda cell: (cell[way], cell[sortFirst]))
+
+		lines = []
+		side1 = None # Start of current line. None shows that we're at new col/row.
+		prevLine = None # Previously drawn line
+		isLastPointReversed = False # Shows from which end draw turning line
+		for i in range(len(cells)):
+			cell = cells[i]
+			if side1 == None:
+				side1 = self.__getSides(*cell)[oldSide]
+			pos = cell[way]
+			try:
+				nextPos = cells[i + 1][way]
+			except IndexError:
+				nextPos = pos + 1
+			if pos != nextPos:
+				side2 = self.__getSides(*cell)[newSide]
+				lines.append((side1, side2, False))
+				if prevLine != None:
+					if isLastPointReversed:
+						start = prevLine[1]
+						end = side2
+					else:
+						start = prevLine[0]
+						end = side1
+					lines.append((start, end, True))
+				isLastPointReversed = not isLastPointReversed
+				prevLine = (side1, side2)
+				side1 = None
+		return lines
+
+	def getMaxArea(self, cells):
+		"""Finds biggest vertical and horizontal lines of bounding rect of every given cell.
+		Returns:
+			(width, height) in meters
+		"""
+		cells = np.array(list(cells), dtype=np.intp).reshape(-1, 2)
+		# Cells are processed in chunks, so temporary arrays don't grow with number of cells
+		maxHorizontal = maxVertical = 0.0
+		for start in range(0, len(cells), _CHUNK_SIZE):
+			horizontal, vertical = self.__getMaxArea(cells[start:start + _CHUNK_SIZE])
+			maxHorizontal, maxVertical = max(maxHorizontal, horizontal), max(maxVertical, vertical)
+		return maxHorizontal, maxVertical
+
+	def __getMaxArea(self, cells):
+		rows, cols = cells[:, 0], cells[:, 1]
+		# Corners of every cell in degrees
+		points = self.transform.pxToDegArray(np.stack((
+			self.points[rows, cols],
+			self.points[rows, cols + 1],
+			self.points[rows + 1, cols + 1],
+			self.points[rows + 1, cols]
+		), axis=1))
+		left, top = points.min(axis=1).T
+		right, bottom = points.max(axis=1).T
+
+		# Because top = bottom and left = right we can use only one of each side for comparison.
+		topRight = np.stack((right, top), axis=1)
+		lenTop = lineLengths(np.stack((left, top), axis=1), topRight, self.lengthMethod)
+		lenRight = lineLengths(topRight, np.stack((right, bottom), axis=1), self.lengthMethod)
+		return float(lenTop.max(initial=0)), float(lenRight.max(initial=0))
+
+	@staticmethod
+	def getCameraResolution(maxHorizontal, maxVertical, camRatio):
+		"""Calculates camera resolution based on given m/px ratio.
+		Returns:
+			(width, height) in pixels
+		"""
+		try:
+			return int(maxHorizontal / camRatio), int(maxVertical / camRatio)
+		except ZeroDivisionError:
+			return 0, 0
+
+	@staticmethod
+	def getFocalLength(flightHeight, camRatio):
+		"""Calculates focal length in mm based on given flight height.
+		"""
+		try:
+			return flightHeight / (camRatio * 1000)
+		except ZeroDivisionError:
+			return 0
+
+	def plan(self, cells, camRatio = 0, flightHeight = 0):
+		"""Plans flight over given cells.
+		Args:
+			cells -- (row, col) of selected cells.
+			camRatio -- m/px ratio of camera.
+			flightHeight -- flight height in meters.
+		Returns:
+			Plan
+		"""
+		return Plan(self, cells, camRatio, flightHeight)
+
+	def pxToDeg(self, x, y):
+		"""Transforms pixel coordinates of point to Geographic coordinate system.
+		Args:
+			x, y -- X and Y coordinates of point to process.
+		Returns:
+			(long, lat) -- longitude and latitude coordinates of given point
+		"""
+		return self.transform.pxToDeg(x, y)
+
+	def pxToDegArray(self, xy):
+		"""Transforms pixel coordinates of points to Geographic coordinate system.
+		Args:
+			xy -- array of shape (..., 2) with (x, y) of points.
+		Returns:
+			Array of the same shape with (long, lat) of points.
+		"""
+		return self.transform.pxToDegArray(xy)
+
+	def degToPx(self, long, lat):
+		"""Transforms point in Geographic coordinate system to pixel coordinates.
+		Returns:
+			(x, y)
+		"""
+		return self.transform.degToPx(long, lat)
+
+	def degToPxArray(self, deg):
+		"""Transforms points in Geographic coordinate system to pixel coordinates.
+		Args:
+			deg -- array of shape (..., 2) with (long, lat) of points.
+		Returns:
+			Array of the same shape with (x, y) of points.
+		"""
+		return self.transform.degToPxArray(deg)
+
+
+def _points(array):
+	return list(map(tuple, array.tolist()))
+
+def _lines(array):
+	return [(tuple(p1), tuple(p2)) for p1, p2 in array.tolist()]
+
+def _middle(p1, p2):
+	"""Returns center of line p1-p2.
+	"""
+	return ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
@@ -0,0 +1,101 @@
+"""
+AerialWare report
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import csv
+
+# Number of points converted to Python numbers at once
+_CHUNK_SIZE = 10000
+
+
+def writeReport(file, planner, plan, lang, route = None):
+	"""Writes CSV report to given file row by row, so memory usage doesn't depend on number of points.
+	Args:
+		file -- text file opened for writing.
+		planner -- Planner which has created the plan.
+		plan -- Plan to write.
+		lang -- object with language strings as attributes, i.e. language module.
+		route -- optional Route from PathOptimizer. Its lengths and points are written after points of the plan.
+	"""
+	writer = csv.writer(file, quoting=csv.QUOTE_ALL, lineterminator="\n")
+	writer.writerows((
+		(lang.repCornersDescription,),
+		(lang.lblCorner, lang.lblLongitude, lang.lblLatitude),
+		(lang.lblTopLeft, planner.xTL, planner.yTL),
+		(lang.lblTopRight, planner.xTR, planner.yTR),
+		(lang.lblBottomLeft, planner.xBL, planner.yBL),
+		(lang.lblBottomRight, planner.xBR, planner.yBR),
+		(lang.lblDelimiters, planner.xD, planner.yD),
+		(),
+		(lang.repTotalWithTurns,),
+		(lang.repByMeridians, plan.lenMeridianWithTurns),
+		(lang.repByHorizontals, plan.lenHorizontalWithTurns),
+		(lang.repBetterFlyBy, getDirection(plan.lenMeridianWithTurns, plan.lenHorizontalWithTurns, lang)),
+		(),
+		(lang.repTotalWithoutTurns,),
+		(lang.repByMeridians, plan.lenMeridian),
+		(lang.repByHorizontals, plan.lenHorizontal),
+		(lang.repBetterFlyBy, getDirection(plan.lenMeridian, plan.lenHorizontal, lang)),
+		(),
+		(lang.repAerialParams,),
+		(lang.repArea, plan.maxHorizontal, "x", plan.maxVertical),
+		(lang.lblDesiredRes, plan.camRatio),
+		(lang.lblRes, plan.camWidth, "x", plan.camHeight),
+		(lang.lblHeight, plan.flightHeight),
+		(lang.lblFocal, plan.focalLength),
+		(),
+	))
+	pointHeader = (lang.repPoint, lang.lblLatitude, lang.lblLongitude)
+
+	writer.writerow((lang.repMeridianPoints,))
+	writer.writerow(pointHeader)
+	writer.writerows(_numberPoints(plan.getArray("meridianPointsDeg")))
+	writer.writerow(())
+	writer.writerow((lang.repHorizontalPoints,))
+	writer.writerow(pointHeader)
+	writer.writerows(_numberPoints(plan.getArray("horizontalPointsDeg")))
+	if route == None:
+		return
+
+	writer.writerows((
+		(),
+		(lang.repRoute,),
+		(lang.repRouteBy, lang.repFlyHorizontals if route.useRows else lang.repFlyMeridians),
+		(lang.repRouteWithTurns, route.lengthWithTurns),
+		(lang.repRouteWithoutTurns, route.length),
+		(),
+		(lang.repRoutePoints,),
+		pointHeader,
+	))
+	writer.writerows(_numberPoints(route.pointsDeg))
+
+def getDirection(lenMeridian, lenHorizontal, lang):
+	"""Returns language string saying which path is shorter.
+	"""
+	if lenHorizontal > lenMeridian:
+		return lang.repFlyMeridians
+	if lenHorizontal < lenMeridian:
+		return lang.repFlyHorizontals
+	return lang.repFlyEqual
+
+def _numberPoints(points):
+	"""Yields (number, x, y) of every point of array. Points are converted to Python numbers in chunks, so lists of all points aren't created.
+	"""
+	for start in range(0, len(points), _CHUNK_SIZE):
+		for i, (x, y) in enumerate(points[start:start + _CHUNK_SIZE].tolist(), start + 1):
+			yield i, x, y
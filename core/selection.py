@@ -0,0 +1,158 @@
+"""
+AerialWare selection of cells
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import numpy as np
+
+
+class Selection():
+	"""Selected cells of the grid. Stored as boolean mask, so toggling a cell costs nothing.
+	Also counts selected cells in every row and column.
+
+	Constructor args:
+		rows, cols -- size of the grid in cells.
+	"""
+	def __init__(self, rows, cols):
+		self.rows, self.cols = rows, cols
+		self.mask = np.zeros((rows, cols), dtype=bool)
+		self.rowCounts = np.zeros(rows, dtype=np.intp)
+		self.colCounts = np.zeros(cols, dtype=np.intp)
+		self.count = 0
+
+	def __len__(self):
+		return self.count
+
+	def __contains__(self, cell):
+		return bool(self.mask[cell])
+
+	def isSelected(self, row, col):
+		"""Returns True if given cell is selected.
+		"""
+		return bool(self.mask[row, col])
+
+	def toggle(self, row, col):
+		"""Selects or deselects given cell.
+		Returns:
+			True if cell is selected now, False otherwise.
+		"""
+		selected = not self.mask[row, col]
+		self.mask[row, col] = selected
+		change = 1 if selected else -1
+		self.rowCounts[row] += change
+		self.colCounts[col] += change
+		self.count += change
+		return selected
+
+	def getCells(self):
+		"""Returns (row, col) of every selected cell sorted by rows, then by columns.
+		"""
+		return list(map(tuple, np.argwhere(self.mask).tolist()))
+
+	def getRange(self, pos, isRow):
+		"""Returns numbers of the first and the last selected cells in given row or column or None, if nothing is selected there.
+		Args:
+			pos -- number of row or column.
+			isRow -- True if pos is a row, False if it's a column.
+		"""
+		if isRow:
+			indices = np.flatnonzero(self.mask[pos])
+		else:
+			indices = np.flatnonzero(self.mask[:, pos])
+		if indices.size == 0:
+			return None
+		return int(indices[0]), int(indices[-1])
+
+	def getRanges(self, isRow):
+		"""Returns ranges of every row or column which has selected cells.
+		Returns:
+			(positions, firsts, lasts) -- numbers of rows or columns, numbers of the first and the last selected cells in each of them.
+		"""
+		mask = self.mask if isRow else self.mask.T
+		positions = np.flatnonzero((self.rowCounts if isRow else self.colCounts) > 0)
+		mask = mask[positions]
+		firsts = np.argmax(mask, axis=1)
+		lasts = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+		return positions.tolist(), firsts.tolist(), lasts.tolist()
+
+	def getSegments(self, pos, isRow):
+		"""Returns segments of given row or column. Segment is a sequence of selected cells without gaps.
+		Args are the same as of getRange().
+		Returns:
+			List of (first, last) -- numbers of the first and the last cells of each segment.
+		"""
+		line = self.mask[pos] if isRow else self.mask[:, pos]
+		return [(first, last) for row, first, last in _findSegments(line[np.newaxis]).tolist()]
+
+	def getAllSegments(self, isRow):
+		"""Returns segments of every row or column sorted by rows or columns, then by their first cells.
+		Returns:
+			(positions, firsts, lasts) -- numbers of rows or columns, numbers of the first and the last cells of each segment.
+		"""
+		segments = _findSegments(self.mask if isRow else self.mask.T)
+		return segments[:, 0].tolist(), segments[:, 1].tolist(), segments[:, 2].tolist()
+
+	def setMask(self, mask):
+		"""Replaces whole selection with given boolean mask of shape (rows, cols).
+		Returns:
+			Mask of cells which have been changed.
+		"""
+		mask = np.asarray(mask, dtype=bool)
+		changed = mask ^ self.mask
+		self.mask = mask.copy()
+		self.rowCounts = self.mask.sum(axis=1)
+		self.colCounts = self.mask.sum(axis=0)
+		self.count = int(self.rowCounts.sum())
+		return changed
+
+	def selectAll(self):
+		"""Selects every cell.
+		Returns:
+			Mask of cells which have been changed.
+		"""
+		return self.setMask(np.ones_like(self.mask))
+
+	def clear(self):
+		"""Deselects every cell.
+		Returns:
+			Mask of cells which have been changed.
+		"""
+		return self.setMask(np.zeros_like(self.mask))
+
+	def invert(self):
+		"""Selects every deselected cell and deselects every selected one.
+		Returns:
+			Mask of cells which have been changed.
+		"""
+		return self.setMask(~self.mask)
+
+	def selectRect(self, row1, col1, row2, col2, select = True):
+		"""Selects or deselects every cell in rectangle between given cells, including them.
+		Returns:
+			Mask of cells which have been changed.
+		"""
+		mask = self.mask.copy()
+		mask[min(row1, row2):max(row1, row2) + 1, min(col1, col2):max(col1, col2) + 1] = select
+		return self.setMask(mask)
+
+def _findSegments(mask):
+	"""Returns array of (row, first, last) of every sequence of True values in rows of 2D boolean mask
+	"""
+	edges = np.diff(mask.astype(np.int8), axis=1, prepend=0, append=0)
+	starts = np.argwhere(edges == 1)
+	ends = np.argwhere(edges == -1)
+	return np.column_stack((starts[:, 0], starts[:, 1], ends[:, 1] - 1))
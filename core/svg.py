@@ -0,0 +1,203 @@
+"""
+AerialWare vector export
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+import numpy as np
+
+# Number of points written to the file at once
+_CHUNK_SIZE = 10000
+
+_LINE = {"stroke_width": "2", "vector_effect": "non-scaling-stroke"}
+_TURN = {**_LINE, "stroke_dasharray": "8 4", "stroke_dashoffset": "4"}
+
+# Appearance of layers for writeFlightPaths(). Same as on the scene of AerialWareWidget.
+STYLE = {
+	"bounds": {"stroke": "#000000", "stroke_width": "1"},
+	"cells": {"fill": "#8282ff", "fill_opacity": 0.392},
+	"grid": {"stroke": "#1e1eff", **_LINE},
+	# Attributes of lines and turns of path by rows and path by columns
+	"paths": (({"stroke": "#ff0a0a", **_LINE}, {"stroke": "#ff0a0a", **_TURN}), ({"stroke": "#0aff0a", **_LINE}, {"stroke": "#0aff0a", **_TURN})),
+}
+
+
+class SvgWriter():
+	"""Writes SVG where every layer is a single <path>. Data of paths is streamed to the file, so memory usage doesn't depend on its size.
+	Raster image is not embedded, only referenced.
+
+	Constructor args:
+		file -- text file opened for writing.
+		left, top, width, height -- view box.
+		precision -- number of digits after decimal point in coordinates.
+		title -- title of the image.
+		progress -- function which is called with number of shapes written to all layers so far after every chunk of them.
+	"""
+	def __init__(self, file, left, top, width, height, precision = 2, title = "", progress = None):
+		self.file = file
+		self.precision = precision
+		self.progress = progress
+		self.clipPaths = 0
+		self.written = 0
+		viewBox = self.__numbers((left, top, width, height))
+		file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+			f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1" width={quoteattr(self.__number(width))} height={quoteattr(self.__number(height))} viewBox="{viewBox}">\n'
+			f'<title>{escape(title)}</title>\n')
+
+	def addImage(self, href, width, height):
+		"""Adds reference to raster image placed at (0, 0).
+		Args:
+			href -- URL or path to image, preferably relative to SVG.
+		"""
+		self.file.write(f'<image x="0" y="0" width={quoteattr(self.__number(width))} height={quoteattr(self.__number(height))} preserveAspectRatio="none" xlink:href={quoteattr(href)} href={quoteattr(href)}/>\n')
+
+	def addClipRect(self, left, top, width, height):
+		"""Adds rect to clip layers with.
+		Returns:
+			Value for "clip-path" attribute of layers.
+		"""
+		self.clipPaths += 1
+		id = f"clip{self.clipPaths}"
+		x, y, w, h = (self.__number(value) for value in (left, top, width, height))
+		self.file.write(f'<clipPath id="{id}"><rect x="{x}" y="{y}" width="{w}" height="{h}"/></clipPath>\n')
+		return f"url(#{id})"
+
+	def addLines(self, lines, **attributes):
+		"""Adds layer of straight lines.
+		Args:
+			lines -- array of shape (n, 2, 2) or iterable of ((x1, y1), (x2, y2)).
+			attributes -- attributes of the path. Underscores in names are replaced with dashes, i.e. stroke_width="2".
+		"""
+		lines = np.asarray(lines, dtype=np.float64).reshape(-1, 4)
+		self.__addPath(lines, "M{} {}L{} {}", attributes)
+
+	def addPolygons(self, polygons, **attributes):
+		"""Adds layer of closed polygons with 4 points each.
+		Args:
+			polygons -- array of shape (n, 4, 2).
+			attributes -- same as in addLines().
+		"""
+		polygons = np.asarray(polygons, dtype=np.float64).reshape(-1, 8)
+		self.__addPath(polygons, "M{} {}L{} {}L{} {}L{} {}Z", attributes)
+
+	def close(self):
+		"""Finishes SVG. Doesn't close the file.
+		"""
+		self.file.write("</svg>\n")
+
+	def __addPath(self, data, template, attributes):
+		attributes = {"fill": "none", **attributes}
+		self.file.write("<path " + "".join(f"{name.replace('_', '-')}={quoteattr(str(value))} " for name, value in attributes.items()) + 'd="')
+		# Numbers are rounded by numpy. Python only removes trailing zeros.
+		data = np.round(data, self.precision)
+		for start in range(0, len(data), _CHUNK_SIZE):
+			chunk = data[start:start + _CHUNK_SIZE].tolist()
+			self.file.write("".join(template.format(*map(_format, row)) for row in chunk))
+			self.written += len(chunk)
+			if self.progress != None:
+				self.progress(self.written)
+		self.file.write('"/>\n')
+
+	def __number(self, value):
+		return _format(round(float(value), self.precision))
+
+	def __numbers(self, values):
+		return " ".join(self.__number(value) for value in values)
+
+
+def writeFlightPaths(file, rect, points, mask, paths, image = None, precision = 2, style = STYLE, progress = None):
+	"""Writes SVG with everything AerialWareWidget draws on the scene: image, bounds of the image, selected cells, grid clipped by the bounds and flight paths.
+	Args:
+		file -- text file opened for writing.
+		rect -- (left, top, width, height) of the bounds.
+		points -- points of the grid from Planner.getGrid().
+		mask -- boolean mask of selected cells, i.e. Selection.mask.
+		paths -- path by rows and path by columns. Each one is (lines, isTurn) where lines is array of shape (n, 2, 2) and isTurn is boolean array of shape (n,). Path by columns is drawn above path by rows.
+		image -- (href, width, height) of the image or None. See getImageHref().
+		precision -- number of digits after decimal point.
+		style -- attributes of layers, see STYLE.
+		progress -- function which is called with percent of written shapes every time it changes.
+	"""
+	left, top, width, height = rect
+	right, bottom = left + width, top + height
+	writeProgress = None
+	if progress != None:
+		# Bounds, cells, grid lines and lines of paths
+		total = 1 + int(np.count_nonzero(mask)) + points.shape[0] + points.shape[1] + sum(len(isTurn) for lines, isTurn in paths)
+		lastPercent = 0
+		def writeProgress(written):
+			nonlocal lastPercent
+			percent = written * 100 // total
+			if percent != lastPercent:
+				lastPercent = percent
+				progress(percent)
+	writer = SvgWriter(file, left, top, width, height, precision, "Flight paths generated by AerialWare", writeProgress)
+	if image != None:
+		writer.addImage(*image)
+
+	writer.addPolygons([((left, top), (right, top), (right, bottom), (left, bottom))], **style["bounds"])
+	clip = writer.addClipRect(left, top, width, height)
+	writer.addPolygons(getCellPolygons(points, mask), **style["cells"], clip_path=clip)
+	writer.addLines(getGridLines(points), clip_path=clip, **style["grid"])
+
+	for (lines, isTurn), (lineStyle, turnStyle) in zip(paths, style["paths"]):
+		lines = np.asarray(lines, dtype=np.float64).reshape(-1, 2, 2)
+		isTurn = np.asarray(isTurn, dtype=bool)
+		writer.addLines(lines[~isTurn], **lineStyle)
+		writer.addLines(lines[isTurn], **turnStyle)
+	writer.close()
+
+def getImageHref(imagePath, svgPath):
+	"""Returns href of image for SVG. Relative path will work when both files are moved together.
+	If it can't be built (i.e. files are on different drives), returns file URL.
+	"""
+	try:
+		href = os.path.relpath(imagePath, os.path.dirname(os.path.abspath(svgPath)))
+	except ValueError:
+		return Path(os.path.abspath(imagePath)).as_uri()
+	return href.replace(os.sep, "/")
+
+def getGridLines(points):
+	"""Returns lines of the grid. Lines are straight, so only their ends are needed.
+	Args:
+		points -- points of the grid from Planner.getGrid().
+	Returns:
+		Array of shape (n, 2, 2).
+	"""
+	vertical = np.stack((points[0], points[-1]), axis=1)
+	horizontal = np.stack((points[:, 0], points[:, -1]), axis=1)
+	return np.concatenate((vertical, horizontal))
+
+def getCellPolygons(points, mask):
+	"""Returns polygons of given cells of the grid.
+	Args:
+		points -- points of the grid from Planner.getGrid().
+		mask -- boolean mask of cells, i.e. Selection.mask.
+	Returns:
+		Array of shape (n, 4, 2) with top left, top right, bottom right and bottom left corners of cells.
+	"""
+	rows, cols = np.nonzero(mask)
+	return np.stack((points[rows, cols], points[rows, cols + 1], points[rows + 1, cols + 1], points[rows + 1, cols]), axis=1)
+
+def _format(value):
+	# Shortest representation of already rounded number. Adding zero turns -0.0 into 0.0.
+	text = repr(value + 0.0)
+	if text.endswith(".0"):
+		return text[:-2]
+	return text
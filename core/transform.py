@@ -0,0 +1,163 @@
+"""
+AerialWare coordinate transformation
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+from functools import lru_cache
+import numpy as np
+
+
+def getTransform(corners, width, height):
+	"""Returns CornersTransform for given corners and size of the image.
+	Transforms are cached, so same georeferencing is calculated only once.
+	Args:
+		corners -- longitude and latitude of image corners: ((xTL, yTL), (xTR, yTR), (xBL, yBL), (xBR, yBR)).
+		width, height -- size of image in pixels.
+	"""
+	corners = tuple((float(x), float(y)) for x, y in corners)
+	return _getTransform(corners, float(width), float(height))
+
+@lru_cache(maxsize=256)
+def _getTransform(corners, width, height):
+	return CornersTransform(corners, width, height)
+
+
+class CornersTransform():
+	"""Transforms pixel coordinates to Geographic coordinate system and back.
+	Coefficients are calculated once, so you can transform as many points as you want.
+	Transform is immutable and can be pickled, i.e. to pass it to worker processes. Please use getTransform() to create it.
+
+	How it works:
+		To transform a point we find a point on each side of the image (in degrees) which lies at the same fraction of the side as given point.
+		Then we draw lines through points on opposite sides. Their intersection is the point we need.
+		Points on top and bottom sides are TL + (TR - TL) * u and BL + (BR - BL) * u, where u = x / width.
+		Points on left and right sides are TL + (BL - TL) * v and TR + (BR - TR) * v, where v = y / height.
+		Both lines pass through point TL + (TR - TL) * u + (BL - TL) * v + (TL - TR - BL + BR) * u * v, so it is the intersection.
+		Thus we only need to calculate coefficients of this formula.
+
+	Constructor args:
+		corners -- longitude and latitude of image corners: ((xTL, yTL), (xTR, yTR), (xBL, yBL), (xBR, yBR)).
+		width, height -- size of image in pixels.
+	"""
+	__slots__ = ("corners", "width", "height", "a", "b", "c", "d", "__coefficients")
+
+	def __init__(self, corners, width, height):
+		setField = super().__setattr__
+		setField("corners", tuple(tuple(corner) for corner in corners))
+		setField("width", width)
+		setField("height", height)
+		tl, tr, bl, br = (np.array(corner, dtype=np.float64) for corner in self.corners)
+		# Coefficients for u and v
+		for name, value in (("a", tl), ("b", tr - tl), ("c", bl - tl), ("d", tl - tr - bl + br)):
+			value.flags.writeable = False
+			setField(name, value)
+		# Coefficients for pixels. Used for transforming single points, so let's use Python floats.
+		setField("_CornersTransform__coefficients", (
+			tuple(self.a.tolist()),
+			tuple((self.b / width).tolist()),
+			tuple((self.c / height).tolist()),
+			tuple((self.d / (width * height)).tolist())
+		))
+
+	def __setattr__(self, name, value):
+		raise AttributeError("CornersTransform is immutable")
+
+	def __delattr__(self, name):
+		raise AttributeError("CornersTransform is immutable")
+
+	def __reduce__(self):
+		# Unpickled transform will be taken from cache, if possible
+		return (getTransform, (self.corners, self.width, self.height))
+
+	def __eq__(self, other):
+		if not isinstance(other, CornersTransform):
+			return NotImplemented
+		return (self.corners, self.width, self.height) == (other.corners, other.width, other.height)
+
+	def __hash__(self):
+		return hash((self.corners, self.width, self.height))
+
+	def __repr__(self):
+		return f"CornersTransform({self.corners}, {self.width}, {self.height})"
+
+	def pxToDeg(self, x, y):
+		"""Transforms pixel coordinates of point to Geographic coordinate system.
+		Returns:
+			(long, lat)
+		"""
+		a, b, c, d = self.__coefficients
+		xy = x * y
+		return (
+			a[0] + b[0] * x + c[0] * y + d[0] * xy,
+			a[1] + b[1] * x + c[1] * y + d[1] * xy
+		)
+
+	def degToPx(self, long, lat):
+		"""Transforms point in Geographic coordinate system to pixel coordinates.
+		Returns:
+			(x, y)
+		"""
+		return tuple(self.degToPxArray((long, lat)).tolist())
+
+	def pxToDegArray(self, xy):
+		"""Transforms pixel coordinates of points to Geographic coordinate system.
+		Args:
+			xy -- array of shape (..., 2) with (x, y) of points.
+		Returns:
+			Array of the same shape with (long, lat) of points.
+		"""
+		xy = np.asarray(xy, dtype=np.float64)
+		u = xy[..., 0:1] / self.width
+		v = xy[..., 1:2] / self.height
+		return self.a + self.b * u + self.c * v + self.d * (u * v)
+
+	def degToPxArray(self, deg):
+		"""Transforms points in Geographic coordinate system to pixel coordinates.
+		Outside of the image transformation may be ambiguous. In this case point closest to the image is returned.
+		Args:
+			deg -- array of shape (..., 2) with (long, lat) of points.
+		Returns:
+			Array of the same shape with (x, y) of points.
+		"""
+		# We need to solve q = b * u + c * v + d * u * v for u and v.
+		# Cross product of both parts of q - b * u = v * (c + d * u) with (c + d * u) gives us quadratic equation for u.
+		q = np.asarray(deg, dtype=np.float64) - self.a
+		A = _cross(self.b, self.d)
+		B = _cross(self.b, self.c) - _cross(q, self.d)
+		C = -_cross(q, self.c)
+
+		# Use numerically stable form which also works when A = 0, i.e. when image is a parallelogram.
+		sqrt = np.sqrt(np.maximum(B * B - 4 * A * C, 0))
+		k = -0.5 * (B + np.where(B < 0, -sqrt, sqrt))
+		# Equation has two roots. Find v for both of them and pick the pair closest to the image.
+		with np.errstate(divide="ignore", invalid="ignore"):
+			u = np.stack((k / A, C / k))[..., None]
+			# Now find v by projecting q - b * u onto c + d * u
+			side = self.c + self.d * u
+			v = np.sum((q - self.b * u) * side, axis=-1, keepdims=True) / np.sum(side * side, axis=-1, keepdims=True)
+			distance = np.maximum(np.abs(u - 0.5), np.abs(v - 0.5))
+		distance = np.where(np.isfinite(distance), distance, np.inf)
+		isFirst = distance[0] < distance[1]
+		u = np.where(isFirst, u[0], u[1])
+		v = np.where(isFirst, v[0], v[1])
+		return np.concatenate((u * self.width, v * self.height), axis=-1)
+
+
+def _cross(p1, p2):
+	"""Returns z-coordinate of cross product of 2D vectors.
+	"""
+	return p1[..., 0] * p2[..., 1] - p1[..., 1] * p2[..., 0]
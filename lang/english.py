@@ -12,6 +12,7 @@ name = 					"English" # Name of this language
 lblZoom =				"Zoom (%):"
 btnNext =				"Next >>"
 btnOpenImage =			"Open image"
+btnCancelLoading =		"Cancel"
 lblCorner =				"Corner"
 lblLongitude =			"Longitude"
 lblLatitude =			"Latitude"
@@ -45,6 +46,7 @@ saveFile =				"Save file"
 errEmptySelection =		"You haven't selected any square. Please select something."
 errSaveBoth =			"You need to save both files. Please select where you want to save the report."
 vectorImage =			"Vector image"
+vectorImageOnly =		"Vector image without raster, it will be linked"
 table =					"Simple Table"
 save =					"Save"
 done =					"Done"
@@ -102,3 +104,8 @@ repAerialParams =		"Aerial parameters"
 repArea =				"Maximum area to be captured (m):"
 repMeridianPoints =		"Flight points by meridians:"
 repHorizontalPoints =	"Flight points by horizontals:"
+repRoute =				"Recommended route (runs are flown in the shortest found order, gaps between selected squares are skipped):"
+repRouteBy =			"Runs go by:"
+repRouteWithTurns =		"Approximate length (including turns), m:"
+repRouteWithoutTurns =	"Length (without turns), m:"
+repRoutePoints =		"Flight points of recommended route:"
@@ -12,6 +12,7 @@ name = 					"Русский" # Название языка
 lblZoom =				"Масштаб (%):"
 btnNext =				"Далее >>"
 btnOpenImage =			"Открыть изображение"
+btnCancelLoading =		"Отмена"
 lblCorner =				"Угол"
 lblLongitude =			"Долгота"
 lblLatitude =			"Широта"
@@ -45,6 +46,7 @@ saveFile =				"Сохранить файл"
 errEmptySelection =		"Вы не выбрали ни одной трапеции. Пожалуйста, сделайте выбор."
 errSaveBoth =			"Вам нужно сохранить оба файла. Пожалуйста, выберете, куда сохранить отчет."
 vectorImage =			"Векторное изображение"
+vectorImageOnly =		"Векторное изображение без растра, он будет подключен ссылкой"
 table =					"Простая таблица"
 save =					"Сохранить"
 done =					"Закончить"
@@ -102,3 +104,8 @@ repAerialParams = 		"Параметры аэрофотосъемки"
 repArea =				"Максимальная площадь, которую придется заснять (м):"
 repMeridianPoints =		"Точки полета по меридианам:"
 repHorizontalPoints =	"Точки полета по горизонталям:"
+repRoute =				"Рекомендуемый маршрут (проходы в кратчайшем найденном порядке, промежутки между выбранными квадратами пропускаются):"
+repRouteBy =			"Проходы по:"
+repRouteWithTurns =		"Приблизительная длина (с поворотами), м:"
+repRouteWithoutTurns =	"Длина (без поворотов), м:"
+repRoutePoints =		"Точки полета по рекомендуемому маршруту:"
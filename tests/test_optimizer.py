@@ -0,0 +1,161 @@
+"""
+AerialWare tests of path optimization
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import random
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import Planner, Selection, PathOptimizer, RouteUpdater, BOUSTROPHEDON, GREEDY, TWO_OPT
+
+
+def getRuns(route):
+	"""Returns lines of runs of the route regardless of their order and directions
+	"""
+	return sorted(tuple(sorted(map(tuple, line))) for line in route.pointsPx.reshape(-1, 2, 2).tolist())
+
+
+class TimeBudgetTest(unittest.TestCase):
+	"""Checks that TWO_OPT doesn't take much longer than its time budget on big selections
+	"""
+	def testBigSelection(self):
+		planner = Planner(((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05)), (0.005, 0.005), 4000, 3000)
+		selection = Selection(*planner.getShape())
+		rnd = random.Random(0)
+		for i in range(3000):
+			selection.toggle(rnd.randrange(planner.rows), rnd.randrange(planner.cols))
+		optimizer = PathOptimizer(planner, TWO_OPT, 0.5)
+		start = time.perf_counter()
+		routes = optimizer.getRoutes(selection)
+		# Budget is given for each direction. Margin is left for finding runs and building routes.
+		self.assertLess(time.perf_counter() - start, 2 * optimizer.timeBudget + 1)
+		for route in routes:
+			self.assertEqual(len(route.pointsPx), 2 * len(route.order))
+
+
+class RouteUpdaterTest(unittest.TestCase):
+	"""Checks that routes updated incrementally go over the same runs as routes found from scratch
+	"""
+	def setUp(self):
+		self.planner = Planner(((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05)), (0.02, 0.02), 1000, 1000)
+		self.rnd = random.Random(0)
+
+	def assertRoutes(self, updater, selection, message):
+		route = updater.optimize()
+		if len(selection) == 0:
+			self.assertIsNone(route, message)
+			return
+		expected = PathOptimizer(self.planner, BOUSTROPHEDON).getRoutes(selection)
+		for route, expectedRoute in zip(updater.routes, expected):
+			self.assertEqual(route.useRows, expectedRoute.useRows, message)
+			self.assertEqual(getRuns(route), getRuns(expectedRoute), message)
+
+	def testUpdates(self):
+		for method in (BOUSTROPHEDON, GREEDY, TWO_OPT):
+			selection = Selection(*self.planner.getShape())
+			updater = RouteUpdater(PathOptimizer(self.planner, method, 0.05), selection)
+			selection.selectRect(5, 5, 30, 30)
+			updater.reset()
+			for i in range(150):
+				# Most clicks make gaps in the rectangle
+				if self.rnd.random() < 0.7:
+					cell = self.rnd.randrange(5, 31), self.rnd.randrange(5, 31)
+				else:
+					cell = self.rnd.randrange(self.planner.rows), self.rnd.randrange(self.planner.cols)
+				selection.toggle(*cell)
+				updater.update(*cell)
+				# Routes should also be right when several cells are toggled between optimizations
+				if i % 10 == 0:
+					self.assertRoutes(updater, selection, f"{method}: click {i} on {cell}")
+
+	def testCache(self):
+		selection = Selection(*self.planner.getShape())
+		optimizer = PathOptimizer(self.planner, TWO_OPT, 0.05)
+		selection.selectRect(2, 2, 20, 20)
+		# Routes found by PathOptimizer are used by RouteUpdater too
+		routes = optimizer.getRoutes(selection)
+		updater = RouteUpdater(optimizer, selection)
+		updater.optimize()
+		self.assertIs(updater.routes, routes)
+		selection.toggle(5, 5)
+		updater.update(5, 5)
+		updater.optimize()
+		self.assertIsNot(updater.routes, routes)
+		# Toggling cell back gives cached routes
+		selection.toggle(5, 5)
+		updater.update(5, 5)
+		updater.optimize()
+		self.assertIs(updater.routes, routes)
+		# Next updates start from cached routes
+		selection.toggle(6, 7)
+		updater.update(6, 7)
+		self.assertRoutes(updater, selection, "after cached routes")
+
+	def testRunsAreSplitAtGaps(self):
+		selection = Selection(*self.planner.getShape())
+		selection.selectRect(0, 0, 0, 9)
+		selection.toggle(0, 4)
+		route = RouteUpdater(PathOptimizer(self.planner), selection).optimize()
+		self.assertTrue(route.useRows)
+		self.assertEqual(getRuns(route), sorted(tuple(sorted(self.planner.getRunLine(0, first, last, True))) for first, last in ((0, 3), (5, 9))))
+
+	def testEmptySelection(self):
+		selection = Selection(*self.planner.getShape())
+		updater = RouteUpdater(PathOptimizer(self.planner), selection)
+		self.assertIsNone(updater.optimize())
+		selection.toggle(3, 3)
+		updater.update(3, 3)
+		self.assertEqual(len(updater.optimize().pointsPx), 2)
+		selection.toggle(3, 3)
+		updater.update(3, 3)
+		self.assertIsNone(updater.optimize())
+
+
+class SceneRouteTest(unittest.TestCase):
+	"""Checks that route is drawn on the scene
+	"""
+	def setUp(self):
+		os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+		from PyQt5.QtWidgets import QApplication
+		self.app = QApplication.instance() or QApplication([])
+
+	def testDrawing(self):
+		import AerialWare
+		planner = Planner(((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05)), (0.07, 0.09), 800, 600)
+		scene = AerialWare._QCustomScene()
+		scene.setPlanner(planner)
+		scene.setGridItem(AerialWare._QGridItem(planner, scene.selection))
+		scene.setOptimizer(PathOptimizer(planner))
+		scene.selectRect(1, 1, 5, 7)
+		scene.selectRect(3, 3, 3, 4, False)
+		self.assertTrue(scene.routeTimer.isActive())
+		# Route is found in background and drawn when event loop gets it
+		route = scene.getRoute()
+		self.assertFalse(scene.routeTimer.isActive())
+		self.app.processEvents()
+		scene.stopOptimizer()
+		self.assertEqual(len(route.pointsPx), 2 * len(route.order))
+		path = scene.routeItem.path()
+		self.assertEqual([(path.elementAt(i).x, path.elementAt(i).y) for i in range(path.elementCount())], list(map(tuple, route.pointsPx.tolist())))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,125 @@
+"""
+AerialWare tests of flight paths
+Copyright (C) 2019 matafokka
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication, QGraphicsLineItem
+from PyQt5.QtCore import Qt, QPointF
+from core import Planner
+from core.paths import PathRuns
+from core.selection import Selection
+import AerialWare
+
+app = QApplication.instance() or QApplication([])
+
+
+class _Click():
+	"""Right click at the center of given cell for _QCustomScene.mousePressEvent()
+	"""
+	def __init__(self, planner, row, col):
+		polygon = planner.getCellPolygon(row, col)
+		self.pos = QPointF(sum(p[0] for p in polygon) / 4, sum(p[1] for p in polygon) / 4)
+
+	def button(self):
+		return Qt.RightButton
+
+	def scenePos(self):
+		return self.pos
+
+
+class PathsTest(unittest.TestCase):
+	"""Checks that incrementally updated paths are the same as paths generated from scratch by Planner.getPath()
+	"""
+	def setUp(self):
+		# Grid is skewed, so every line and turn has its own coordinates
+		self.planner = Planner(((10, 50), (11, 50.1), (10.05, 49), (11.1, 49.05)), (0.07, 0.09), 800, 600)
+		self.rnd = random.Random(0)
+
+	def newScene(self):
+		scene = AerialWare._QCustomScene()
+		scene.setPlanner(self.planner)
+		scene.setGridItem(AerialWare._QGridItem(self.planner, scene.selection))
+		return scene
+
+	def randomCell(self):
+		return self.rnd.randrange(self.planner.rows), self.rnd.randrange(self.planner.cols)
+
+	def assertPath(self, path, useRows, message):
+		expected = self.planner.getPath(self.scene.selectedCells(), useRows)
+		lines = [((item.line().x1(), item.line().y1()), (item.line().x2(), item.line().y2()), item.pen() == path.turnPen) for item in path.getItems()]
+		self.assertEqual(lines, expected, message)
+
+	def assertScene(self, message):
+		self.assertPath(self.scene.rowPath, True, message)
+		self.assertPath(self.scene.colPath, False, message)
+		# Removed lines shouldn't stay on the scene
+		items = [item for item in self.scene.items() if isinstance(item, QGraphicsLineItem)]
+		self.assertEqual(len(items), len(self.scene.rowPath.getItems()) + len(self.scene.colPath.getItems()), message)
+
+	def testPathRuns(self):
+		selection = Selection(self.planner.rows, self.planner.cols)
+		runs = (PathRuns(self.planner, selection, True), PathRuns(self.planner, selection, False))
+		for i in range(500):
+			cell = self.randomCell()
+			selection.toggle(*cell)
+			for path in runs:
+				path.update(*cell)
+				self.assertEqual(path.getLines(), self.planner.getPath(selection.getCells(), path.useRows), f"Click {i} on {cell}")
+
+	def testFlightPathItems(self):
+		self.scene = self.newScene()
+		self.scene.drawPaths()
+		for i in range(500):
+			row, col = self.randomCell()
+			self.scene.mousePressEvent(_Click(self.planner, row, col))
+			self.assertScene(f"Click {i} on {(row, col)}")
+			# Bulk changes redraw paths, incremental updates should work after them too
+			if i % 100 == 99:
+				row2, col2 = self.randomCell()
+				self.scene.selectRect(row, col, row2, col2, self.rnd.random() < 0.5)
+				self.assertScene(f"Rectangle after click {i}")
+
+	def testRemovingEveryCell(self):
+		self.scene = self.newScene()
+		self.scene.selectAll()
+		cells = self.scene.selectedCells()
+		self.rnd.shuffle(cells)
+		for cell in cells:
+			self.scene.mousePressEvent(_Click(self.planner, *cell))
+			self.assertScene(f"Removing {cell}")
+		self.assertEqual(self.scene.rowPath.getItems(), [])
+
+	def testSelectedItems(self):
+		self.scene = self.newScene()
+		self.scene.selectRect(2, 3, 4, 5)
+		self.scene.mousePressEvent(_Click(self.planner, 3, 4))
+		items = self.scene.selectedItems()
+		self.assertEqual([(item.row, item.col) for item in items], self.scene.selectedCells())
+		for item in items:
+			polygon = item.polygon()
+			self.assertEqual([(polygon[k].x(), polygon[k].y()) for k in range(4)], [tuple(point) for point in self.planner.getCellPolygon(item.row, item.col)])
+
+
+if __name__ == '__main__':
+	unittest.main()